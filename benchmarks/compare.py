@@ -0,0 +1,65 @@
+"""
+Compare two load_test.py reports endpoint by endpoint.
+
+    python benchmarks/compare.py benchmarks/results/before.json benchmarks/results/after.json
+
+Prints RPS and p50/p95/p99 for each scenario and endpoint in both
+reports, with the change from the first to the second. Latency changes
+within --noise percent are left unmarked. Outside it, a slower result is
+marked "-" and a faster one "+".
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before: float | None, after: float | None) -> float | None:
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def _cell(metric: str, before, after, noise: float) -> str:
+    change = _change(before, after)
+    if change is None:
+        return f"{after if after is not None else '—':>9}          "
+    # Higher is better for rps, lower for latency
+    worse = change < -noise if metric == "rps" else change > noise
+    better = change > noise if metric == "rps" else change < -noise
+    mark = "-" if worse else "+" if better else " "
+    return f"{after:>9} {change:+6.1f}%{mark} "
+
+
+def compare(before: dict, after: dict, noise: float) -> list[str]:
+    lines = [
+        f"before: {before['meta'].get('commit', '?')[:12]}  after: {after['meta'].get('commit', '?')[:12]}",
+    ]
+    for scenario, result in after["scenarios"].items():
+        old = before["scenarios"].get(scenario)
+        lines.append("")
+        lines.append(f"=== {scenario} ===")
+        lines.append(f"  {'endpoint':42}" + "".join(f"{m:>19}" for m in METRICS))
+        rows = {"(all)": result["total"], **result["endpoints"]}
+        old_rows = {"(all)": old["total"], **old["endpoints"]} if old else {}
+        for endpoint, stats in rows.items():
+            prev = old_rows.get(endpoint, {})
+            cells = "".join(_cell(m, prev.get(m), stats.get(m), noise) for m in METRICS)
+            lines.append(f"  {endpoint:42}{cells}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    parser.add_argument("--noise", type=float, default=5.0, help="Percent change to ignore (default 5)")
+    args = parser.parse_args()
+    before = json.loads(args.before.read_text())
+    after = json.loads(args.after.read_text())
+    print("\n".join(compare(before, after, args.noise)))
+
+
+if __name__ == "__main__":
+    main()
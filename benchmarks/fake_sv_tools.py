@@ -0,0 +1,104 @@
+"""
+Stand-in for sv-tools during load tests.
+
+Serves the endpoints sv_site proxies (ideas, artifacts, projects) from
+synthetic data, each answer delayed by --latency-ms ± --jitter-ms so the
+proxy routes see a realistic upstream. Idea ids run 1..--ideas, matching
+the ids seed.py votes and favorites on.
+
+    python benchmarks/fake_sv_tools.py --port 8712 --ideas 200 --latency-ms 40
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+STATUSES = ("new", "planned", "in_progress", "done")
+PROJECTS = ("sv-site", "sv-tools", "book-club", "meandering-muck", "patt")
+
+
+def make_ideas(count: int) -> list[dict]:
+    rng = random.Random(7)
+    now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "title": f"Idea {i}: {rng.choice(['batch', 'cache', 'index', 'stream'])} the "
+                     f"{rng.choice(['feedback', 'ideas', 'export', 'login'])} path",
+            "description": " ".join(rng.choice(["Users", "report", "that", "the", "page", "is",
+                                                "slow", "when", "many", "ideas", "load."])
+                                    for _ in range(rng.randint(30, 120))),
+            "status": rng.choice(STATUSES),
+            "public": rng.random() < 0.6,
+            "tags": rng.sample(["infra", "ux", "feedback", "auth", "perf"], k=2),
+            "created_at": (now - timedelta(days=rng.randint(0, 400))).isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def create_app(ideas: int, latency_ms: float, jitter_ms: float) -> FastAPI:
+    app = FastAPI()
+    data = make_ideas(ideas)
+    by_id = {idea["id"]: idea for idea in data}
+
+    async def upstream_delay() -> None:
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    @app.get("/")
+    async def root() -> dict:
+        return {"ok": True}
+
+    @app.get("/api/v1/ideas")
+    async def list_ideas(limit: int = 50, status: Optional[str] = None) -> dict:
+        await upstream_delay()
+        rows = [i for i in data if status is None or i["status"] == status]
+        return {"ideas": rows[:limit]}
+
+    @app.get("/api/v1/ideas/{idea_id}")
+    async def get_idea(idea_id: int) -> dict:
+        await upstream_delay()
+        if idea_id not in by_id:
+            raise HTTPException(status_code=404)
+        return {"idea": by_id[idea_id]}
+
+    @app.get("/api/v1/ideas/{idea_id}/artifacts")
+    async def list_artifacts(idea_id: int) -> dict:
+        await upstream_delay()
+        return {"artifacts": [{"id": f"{idea_id}-{n}", "kind": "plan"} for n in range(3)]}
+
+    @app.get("/api/v1/projects")
+    async def list_projects(active_only: bool = False) -> list[dict]:
+        await upstream_delay()
+        return [{"name": name, "active": True, "phase": "build"} for name in PROJECTS]
+
+    @app.get("/api/v1/projects/{name}/{kind}")
+    async def project_children(name: str, kind: str) -> list[dict]:
+        await upstream_delay()
+        if name not in PROJECTS or kind not in ("documents", "phases"):
+            raise HTTPException(status_code=404)
+        return [{"name": f"{name} {kind} {n}", "order": n} for n in range(8)]
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--port", type=int, default=8712)
+    parser.add_argument("--ideas", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=15.0)
+    args = parser.parse_args()
+    app = create_app(args.ideas, args.latency_ms, args.jitter_ms)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
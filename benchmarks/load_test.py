@@ -0,0 +1,441 @@
+"""
+End-to-end load test for the sv_site API.
+
+Seeds a local Postgres (benchmarks/seed.py — this DROPS the shadowedvaca
+schema), starts a fake sv-tools (benchmarks/fake_sv_tools.py) and the app
+under uvicorn, then drives each traffic mix for --duration seconds with
+--concurrency virtual users and writes a JSON report: requests, errors,
+RPS and p50/p95/p99 latency per endpoint, per scenario.
+
+Run from the repo root:
+    python benchmarks/load_test.py --database-url postgresql+asyncpg://localhost/sv_bench
+    python benchmarks/load_test.py --database-url ... --scenarios ideas_board,voting_burst \\
+        --concurrency 50 --env DB_POOL_SIZE=10
+    python benchmarks/compare.py benchmarks/results/before.json benchmarks/results/after.json
+
+Scenarios:
+
+  ideas_board      what the ideas page fires: ideas list, reactions, projects,
+                   idea detail — mostly regular users, some admins
+  voting_burst     votes, unvotes and favorites with the reactions refresh
+                   that follows each one
+  feedback_ingest  client apps posting feedback (AI processing is skipped:
+                   no ANTHROPIC_API_KEY)
+  admin_feedback   the Hub: feedback pages, stats, programs, and a full
+                   NDJSON export of one program
+
+The load generator is one asyncio process using closed-loop users (each
+sends its next request when the last one answers), so numbers compare
+across commits on the same machine and settings; they are not a capacity
+figure for production. Requests in the first --warmup seconds of each
+scenario are not counted.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+# Bulk seeding inserts are slow by design; don't log each one
+logging.getLogger("sv_site.slow_query").disabled = True
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from seed import PROGRAMS, check_target, seed  # noqa: E402
+
+from sv_site.auth import create_access_token  # noqa: E402
+from sv_site.config import Settings, get_settings  # noqa: E402
+
+BENCH_SETTINGS = {
+    "SECRET_KEY": "bench-only-secret-key-at-least-32-bytes",
+    "JWT_EXPIRE_MINUTES": "240",
+    "ENVIRONMENT": "bench",
+    "LOGIN_RATE_LIMIT": "off",
+    "SV_TOOLS_API_KEY": "bench-sv-tools-key",
+    "SV_TOOLS_CALLBACK_KEY": "bench-callback-key",
+    "FEEDBACK_INGEST_KEY": "bench-ingest-key",
+    "ANTHROPIC_API_KEY": "",
+    "API_CALLS_LOG_PATH": "",
+}
+
+
+# ---------------------------------------------------------------------------
+# Traffic mixes
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Context:
+    users: int
+    admins: int
+    ideas: int
+    tokens: dict[int, str]
+
+    def user(self, rng: random.Random) -> dict:
+        return self._auth(rng.randint(self.admins + 1, self.users))
+
+    def admin(self, rng: random.Random) -> dict:
+        return self._auth(rng.randint(1, self.admins))
+
+    def idea(self, rng: random.Random) -> int:
+        return rng.randint(1, self.ideas)
+
+    def _auth(self, user_id: int) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+
+# (label, weight, build) — build returns (method, url, httpx request kwargs)
+Step = tuple[str, int, Callable[[Context, random.Random], tuple[str, str, dict]]]
+
+
+def _ideas_list(ctx, rng):
+    headers = ctx.admin(rng) if rng.random() < 0.1 else ctx.user(rng)
+    return "GET", "/api/ideas", {"params": {"limit": 200}, "headers": headers}
+
+
+def _reactions(ctx, rng):
+    headers = ctx.admin(rng) if rng.random() < 0.1 else ctx.user(rng)
+    return "GET", "/api/ideas/reactions", {"headers": headers}
+
+
+def _vote(ctx, rng):
+    return "PUT", f"/api/ideas/{ctx.idea(rng)}/vote", {
+        "json": {"vote": rng.choice((1, 1, -1))}, "headers": ctx.user(rng),
+    }
+
+
+def _ingest(ctx, rng):
+    return "POST", "/api/feedback/ingest", {
+        "headers": {"X-Ingest-Key": BENCH_SETTINGS["FEEDBACK_INGEST_KEY"]},
+        "json": {
+            "program_name": rng.choice(PROGRAMS),
+            "score": rng.randint(1, 10),
+            "raw_feedback": "The export takes a long time on big programs. " * rng.randint(1, 20),
+            "is_anonymous": rng.random() < 0.3,
+        },
+    }
+
+
+def _feedback_page(ctx, rng):
+    params = {"view": "summary", "limit": 50}
+    if rng.random() < 0.5:
+        params["program_name"] = rng.choice(PROGRAMS)
+    return "GET", "/api/hub/feedback", {"params": params, "headers": ctx.admin(rng)}
+
+
+SCENARIOS: dict[str, list[Step]] = {
+    "ideas_board": [
+        ("GET /api/ideas", 4, _ideas_list),
+        ("GET /api/ideas/reactions", 4, _reactions),
+        ("GET /api/projects", 1, lambda ctx, rng: ("GET", "/api/projects", {"headers": ctx.user(rng)})),
+        ("GET /api/ideas/{idea_id}", 2,
+         lambda ctx, rng: ("GET", f"/api/ideas/{ctx.idea(rng)}", {"headers": ctx.admin(rng)})),
+    ],
+    "voting_burst": [
+        ("PUT /api/ideas/{idea_id}/vote", 6, _vote),
+        ("DELETE /api/ideas/{idea_id}/vote", 1,
+         lambda ctx, rng: ("DELETE", f"/api/ideas/{ctx.idea(rng)}/vote", {"headers": ctx.user(rng)})),
+        ("PUT /api/ideas/{idea_id}/favorite", 2,
+         lambda ctx, rng: ("PUT", f"/api/ideas/{ctx.idea(rng)}/favorite", {"headers": ctx.user(rng)})),
+        ("DELETE /api/ideas/{idea_id}/favorite", 1,
+         lambda ctx, rng: ("DELETE", f"/api/ideas/{ctx.idea(rng)}/favorite", {"headers": ctx.user(rng)})),
+        ("GET /api/ideas/reactions", 3, _reactions),
+    ],
+    "feedback_ingest": [
+        ("POST /api/feedback/ingest", 1, _ingest),
+    ],
+    "admin_feedback": [
+        ("GET /api/hub/feedback", 6, _feedback_page),
+        ("GET /api/hub/feedback/stats", 2,
+         lambda ctx, rng: ("GET", "/api/hub/feedback/stats", {"headers": ctx.admin(rng)})),
+        ("GET /api/hub/feedback/programs", 1,
+         lambda ctx, rng: ("GET", "/api/hub/feedback/programs", {"headers": ctx.admin(rng)})),
+        ("GET /api/hub/feedback/export", 1,
+         lambda ctx, rng: ("GET", "/api/hub/feedback/export", {
+             "params": {"program_name": rng.choice(PROGRAMS)}, "headers": ctx.admin(rng),
+         })),
+    ],
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, statuses: Counter, seconds: float) -> dict:
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / seconds, 1),
+        "p50_ms": _round(percentile(ms, 50)),
+        "p95_ms": _round(percentile(ms, 95)),
+        "p99_ms": _round(percentile(ms, 99)),
+        "max_ms": _round(ms[-1] if ms else None),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 2)
+
+
+async def run_scenario(
+    base_url: str, steps: list[Step], ctx: Context, concurrency: int, duration: float, warmup: float,
+    random_seed: int,
+) -> dict:
+    labels = [label for label, _, _ in steps]
+    weights = [weight for _, weight, _ in steps]
+    builders = {label: build for label, _, build in steps}
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    statuses: dict[str, Counter] = defaultdict(Counter)
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def virtual_user(client: httpx.AsyncClient, n: int) -> None:
+        rng = random.Random(random_seed * 1000 + n)
+        while time.perf_counter() < stop_at:
+            label = rng.choices(labels, weights)[0]
+            method, url, kwargs = builders[label](ctx, rng)
+            sent = time.perf_counter()
+            try:
+                resp = await client.request(method, url, **kwargs)
+                status = str(resp.status_code)
+                failed = resp.status_code >= 400
+            except httpx.HTTPError as exc:
+                status, failed = type(exc).__name__, True
+            if sent >= measure_from:
+                latencies[label].append(time.perf_counter() - sent)
+                statuses[label][status] += 1
+                errors[label] += failed
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        await asyncio.gather(*(virtual_user(client, n) for n in range(concurrency)))
+
+    # Requests still in flight at stop_at finish late; count the real window
+    seconds = max(time.perf_counter() - measure_from, 1e-9)
+    endpoints = {
+        label: summarize(latencies[label], errors[label], statuses[label], seconds)
+        for label in labels if latencies[label]
+    }
+    every = [value for label in labels for value in latencies[label]]
+    total = summarize(every, sum(errors.values()), Counter(), seconds)
+    total.pop("statuses")
+    return {"seconds": round(seconds, 2), "total": total, "endpoints": endpoints}
+
+
+# ---------------------------------------------------------------------------
+# Processes
+# ---------------------------------------------------------------------------
+
+
+def _app_env(database_url: str, sv_tools_url: str, extra: dict, metrics_dir: str) -> dict:
+    # Settings come from here only: drop any the caller's shell has set
+    fields = {name.upper() for name in Settings.model_fields}
+    env = {k: v for k, v in os.environ.items() if k.upper() not in fields}
+    env.update(BENCH_SETTINGS)
+    env.update({
+        "DATABASE_URL": database_url,
+        "SV_TOOLS_URL": sv_tools_url,
+        "PYTHONPATH": str(ROOT / "src"),
+        "PROMETHEUS_MULTIPROC_DIR": metrics_dir,
+    })
+    env.update(extra)
+    return env
+
+
+def _start(cmd: list[str], env: dict, cwd: str, log_path: Path) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(cmd, env=env, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+
+
+def _wait_until_up(url: str, proc: subprocess.Popen, log_path: Path, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"{url} exited with {proc.returncode}; see {log_path}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:g}s; see {log_path}")
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _mint_tokens(users: int, admins: int) -> dict[int, str]:
+    os.environ.update({k: BENCH_SETTINGS[k] for k in ("SECRET_KEY", "JWT_EXPIRE_MINUTES")})
+    get_settings.cache_clear()
+    return {
+        u: create_access_token(user_id=u, username=f"bench{u}", is_admin=u <= admins)
+        for u in range(1, users + 1)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def _parse_env(pairs: list[str]) -> dict:
+    extra = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--env expects KEY=VALUE, got {pair!r}")
+        extra[key] = value
+    return extra
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", default=os.environ.get("SV_BENCH_DATABASE_URL"),
+                        help="postgresql+asyncpg URL of a throwaway database (or SV_BENCH_DATABASE_URL)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users (default 20)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Uncounted seconds before each")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers (production runs 2)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--ideas", type=int, default=200)
+    parser.add_argument("--feedback", type=int, default=20000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse data from an earlier run")
+    parser.add_argument("--force", action="store_true", help="Seed even if the database name lacks bench/test")
+    parser.add_argument("--sv-tools-latency-ms", type=float, default=40.0)
+    parser.add_argument("--sv-tools-jitter-ms", type=float, default=15.0)
+    parser.add_argument("--app-port", type=int, default=8711)
+    parser.add_argument("--sv-tools-port", type=int, default=8712)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra app setting, e.g. --env DB_POOL_SIZE=10 (repeatable)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for data and traffic")
+    parser.add_argument("--out", type=Path, help="Report path (default benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or SV_BENCH_DATABASE_URL) is required")
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    extra_env = _parse_env(args.env)
+    started_at = datetime.now(timezone.utc)
+
+    seeded = None
+    if not args.skip_seed:
+        check_target(args.database_url, args.force)
+        print(f"Seeding {args.users} users, {args.ideas} ideas, {args.feedback} feedback rows…")
+        seeded = asyncio.run(seed(
+            args.database_url, users=args.users, admins=args.admins, ideas=args.ideas,
+            feedback=args.feedback, random_seed=args.seed, force=args.force,
+        ))
+        for error in seeded["migration_errors"]:
+            print(f"  migration statement failed: {error}")
+
+    ctx = Context(args.users, args.admins, args.ideas, _mint_tokens(args.users, args.admins))
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    sv_tools_url = f"http://127.0.0.1:{args.sv_tools_port}"
+
+    with tempfile.TemporaryDirectory(prefix="sv-bench-") as tmp:
+        tmp_path = Path(tmp)
+        metrics_dir = tmp_path / "metrics"
+        metrics_dir.mkdir()
+        sv_tools = _start(
+            [sys.executable, str(Path(__file__).parent / "fake_sv_tools.py"),
+             "--port", str(args.sv_tools_port), "--ideas", str(args.ideas),
+             "--latency-ms", str(args.sv_tools_latency_ms), "--jitter-ms", str(args.sv_tools_jitter_ms)],
+            env=dict(os.environ), cwd=tmp, log_path=tmp_path / "sv_tools.log",
+        )
+        # cwd is the temp dir so the app doesn't pick up the repo's .env
+        app = _start(
+            [sys.executable, "-m", "uvicorn", "sv_site.main:app", "--host", "127.0.0.1",
+             "--port", str(args.app_port), "--workers", str(args.workers), "--log-level", "warning"],
+            env=_app_env(args.database_url, sv_tools_url, extra_env, str(metrics_dir)),
+            cwd=tmp, log_path=tmp_path / "app.log",
+        )
+        try:
+            _wait_until_up(sv_tools_url + "/", sv_tools, tmp_path / "sv_tools.log")
+            _wait_until_up(base_url + "/api/health", app, tmp_path / "app.log")
+            results = {}
+            for name in names:
+                print(f"  {name}: {args.concurrency} users, {args.warmup:g}s warmup + {args.duration:g}s")
+                results[name] = asyncio.run(run_scenario(
+                    base_url, SCENARIOS[name], ctx, args.concurrency, args.duration, args.warmup, args.seed,
+                ))
+                total = results[name]["total"]
+                print(f"    {total['rps']:8.1f} rps  p50 {total['p50_ms']} ms  p95 {total['p95_ms']} ms  "
+                      f"p99 {total['p99_ms']} ms  errors {total['errors']}")
+        finally:
+            _stop(app)
+            _stop(sv_tools)
+
+    commit = _git("rev-parse", "HEAD")
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "started_at": started_at.isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+                     if k != "database_url"},
+            "seeded": seeded,
+        },
+        "scenarios": results,
+    }
+    out = args.out or ROOT / "benchmarks" / "results" / (
+        f"{started_at:%Y%m%d-%H%M%S}-{(commit or 'nogit')[:8]}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Report: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Synthetic data for load tests.
+
+DROPS and recreates the shadowedvaca schema in the target database, then
+fills it with users, idea votes, favorites, access overrides and customer
+feedback. The ORM models only describe tables, so scripts/migrations/*.sql
+is then applied on top for the indexes and functions production has; the
+rollups are rebuilt and everything ANALYZEd. Refuses databases whose name
+doesn't contain "bench" or "test" unless force=True.
+
+    python benchmarks/seed.py postgresql+asyncpg://localhost/sv_bench --feedback 50000
+"""
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Ensure src/ is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sv_site import feedback_rollups  # noqa: E402
+from sv_site.models import (  # noqa: E402
+    Base,
+    CustomerFeedback,
+    IdeaAccessOverride,
+    IdeaFavorite,
+    IdeaVote,
+    User,
+)
+
+MIGRATIONS = Path(__file__).parent.parent / "scripts" / "migrations"
+
+PROGRAMS = ("meandering-muck", "book-club", "patt", "sv-tools", "hub", "site")
+SENTIMENTS = ("positive", "neutral", "negative")
+TAGS = ("bug", "performance", "ui", "praise", "feature-request", "export", "login")
+WORDS = ("the", "export", "is", "slow", "when", "I", "open", "a", "large", "program",
+         "and", "login", "works", "great", "but", "page", "takes", "seconds", "to", "load")
+_BATCH = 2000
+
+
+def check_target(url: str, force: bool = False) -> None:
+    name = make_url(url).database or ""
+    if not force and "bench" not in name and "test" not in name:
+        raise SystemExit(
+            f"refusing to reset database {name!r}: seeding drops the shadowedvaca schema. "
+            "Use a *bench* or *test* database, or pass --force."
+        )
+
+
+def _statements(sql: str) -> list[str]:
+    """Split a migration file into statements; $$-quoted bodies may contain ';'."""
+    statements, current, in_body = [], [], False
+    for line in sql.splitlines():
+        if not in_body and line.lstrip().startswith("--"):
+            continue
+        current.append(line)
+        if line.count("$$") % 2:
+            in_body = not in_body
+        if not in_body and line.rstrip().endswith(";"):
+            statements.append("\n".join(current).strip().rstrip(";"))
+            current = []
+    return [stmt for stmt in statements if stmt]
+
+
+async def apply_migrations(engine) -> list[str]:
+    """Run every migration statement in autocommit, so CONCURRENTLY works and
+    one failure doesn't stop the rest. Returns the failures, e.g. pg_trgm on
+    a server without the extension. GRANTs are skipped: they name the
+    production role, and the benchmark connects as whoever owns the schema."""
+    failed = []
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for path in sorted(MIGRATIONS.glob("*.sql")):
+            for stmt in _statements(path.read_text()):
+                if stmt.upper().startswith("GRANT"):
+                    continue
+                try:
+                    await conn.exec_driver_sql(stmt)
+                except DBAPIError as exc:
+                    failed.append(f"{path.name}: {stmt.splitlines()[0]} ({type(exc.orig).__name__})")
+    return failed
+
+
+def _rows(users: int, admins: int, ideas: int, feedback: int, rng: random.Random) -> dict:
+    now = datetime.now(timezone.utc)
+    idea_ids = range(1, ideas + 1)
+    user_rows = [
+        {"id": u, "username": f"bench{u}", "password_hash": "x", "is_admin": u <= admins}
+        for u in range(1, users + 1)
+    ]
+    votes, favorites, overrides = [], [], []
+    for u in range(1, users + 1):
+        for idea in rng.sample(idea_ids, k=max(1, ideas // 5)):
+            votes.append({"user_id": u, "idea_id": idea, "vote": rng.choice((1, 1, 1, -1))})
+        for idea in rng.sample(idea_ids, k=max(1, ideas // 12)):
+            favorites.append({"user_id": u, "idea_id": idea})
+    for idea in rng.sample(idea_ids, k=max(1, ideas // 10)):
+        for u in rng.sample(range(1, users + 1), k=min(users, 5)):
+            overrides.append({"idea_id": idea, "user_id": u, "can_view": rng.random() < 0.8})
+
+    feedback_rows = []
+    for n in range(feedback):
+        received = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        anonymous = rng.random() < 0.3
+        feedback_rows.append({
+            "program_name": rng.choice(PROGRAMS),
+            "received_at": received,
+            "is_authenticated_user": not anonymous and rng.random() < 0.5,
+            "is_anonymous": anonymous,
+            "privacy_token": None if anonymous else f"{rng.getrandbits(128):032x}",
+            "score": rng.randint(1, 10),
+            "raw_feedback": " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 200))),
+            "summary": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "sentiment": rng.choice(SENTIMENTS),
+            "tags": rng.sample(TAGS, k=rng.randint(0, 3)),
+            "processed_at": received + timedelta(seconds=2),
+        })
+    return {
+        User: user_rows,
+        IdeaVote: votes,
+        IdeaFavorite: favorites,
+        IdeaAccessOverride: overrides,
+        CustomerFeedback: feedback_rows,
+    }
+
+
+async def seed(
+    url: str,
+    *,
+    users: int = 200,
+    admins: int = 5,
+    ideas: int = 200,
+    feedback: int = 20000,
+    random_seed: int = 1,
+    force: bool = False,
+) -> dict:
+    """Reset and fill the database; returns row counts per table and any
+    migration statements that failed."""
+    check_target(url, force)
+    rows = _rows(users, admins, ideas, feedback, random.Random(random_seed))
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP SCHEMA IF EXISTS shadowedvaca CASCADE"))
+            await conn.execute(text("CREATE SCHEMA shadowedvaca"))
+            await conn.run_sync(Base.metadata.create_all)
+            for model, table_rows in rows.items():
+                for start in range(0, len(table_rows), _BATCH):
+                    await conn.execute(insert(model), table_rows[start:start + _BATCH])
+            # Explicit ids above; move the sequence past them
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('shadowedvaca.users', 'id'), :n)"
+            ), {"n": users})
+        migration_errors = await apply_migrations(engine)
+        async with async_sessionmaker(engine)() as session:
+            await feedback_rollups.rebuild(session)
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("ANALYZE"))
+    finally:
+        await engine.dispose()
+    return {
+        "rows": {model.__tablename__: len(table_rows) for model, table_rows in rows.items()},
+        "migration_errors": migration_errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("database_url")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--ideas", type=int, default=200)
+    parser.add_argument("--feedback", type=int, default=20000)
+    parser.add_argument("--force", action="store_true", help="Allow any database name")
+    args = parser.parse_args()
+    seeded = asyncio.run(seed(
+        args.database_url, users=args.users, ideas=args.ideas, feedback=args.feedback, force=args.force,
+    ))
+    for table, count in seeded["rows"].items():
+        print(f"  {table:24} {count:>8}")
+    for error in seeded["migration_errors"]:
+        print(f"  migration statement failed: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ CREATE TABLE IF NOT EXISTS shadowedvaca.users (
     password_hash VARCHAR(255) NOT NULL,
     is_admin      BOOLEAN NOT NULL DEFAULT FALSE,
     is_active     BOOLEAN NOT NULL DEFAULT TRUE,
-    created_at    TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    created_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    permissions_version INTEGER NOT NULL DEFAULT 1
 );
 
 CREATE TABLE IF NOT EXISTS shadowedvaca.invite_codes (
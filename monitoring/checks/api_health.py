@@ -0,0 +1,103 @@
+"""sv_site API dependency checks, read from GET /api/health/deep."""
+from __future__ import annotations
+
+import json
+import logging
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+    import urllib.error
+    import urllib.request
+
+from .base_check import BaseCheck, CheckResult
+
+log = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://127.0.0.1:8055/api/health/deep"
+
+# Probes in the deep health response that report a latency, and the
+# thresholds.yaml prefix for each
+_LATENCY_PROBES = {
+    "database": "db",
+    "database_replica": "db",
+    "sv_tools": "sv_tools",
+}
+
+
+class ApiHealthCheck(BaseCheck):
+    """Database, replica, sv-tools and pool health as the API itself sees them."""
+
+    def __init__(self, config: dict):
+        self._cfg = config.get("api", {})
+
+    @property
+    def name(self) -> str:
+        return "api_health"
+
+    def _run(self) -> list[CheckResult]:
+        url = self._cfg.get("health_url", DEFAULT_URL)
+        try:
+            body = self._fetch(url)
+        except Exception as e:
+            return [CheckResult(self.name, "api_reachable", 0.0, "", "critical",
+                                f"Deep health check failed at {url}: {e}")]
+
+        results = [CheckResult(self.name, "api_reachable", 1.0, "", "ok",
+                               f"API answered deep health check (cached={body.get('cached')})")]
+        checks = body.get("checks", {})
+        for probe, prefix in _LATENCY_PROBES.items():
+            if probe in checks:
+                results.append(self._latency_result(probe, prefix, checks[probe]))
+        if "db_pool" in checks:
+            results.append(self._pool_result(checks["db_pool"]))
+        return results
+
+    # ------------------------------------------------------------------
+
+    def _fetch(self, url: str) -> dict:
+        # 503 still carries the per-dependency JSON body
+        if REQUESTS_AVAILABLE:
+            resp = requests.get(url, timeout=10)
+            return resp.json()
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read())
+
+    def _latency_result(self, probe: str, prefix: str, check: dict) -> CheckResult:
+        latency = float(check.get("latency_ms", 0.0))
+        metric = f"{probe}_latency_ms"
+        if not check.get("ok"):
+            return CheckResult(self.name, metric, latency, "ms", "critical",
+                               f"{probe} probe failed: {check.get('error', 'unknown error')}")
+
+        warn = self._cfg.get(f"{prefix}_latency_warning_ms", 250)
+        crit = self._cfg.get(f"{prefix}_latency_critical_ms", 1000)
+        if latency >= crit:
+            sev = "critical"
+        elif latency >= warn:
+            sev = "warning"
+        else:
+            sev = "ok"
+        return CheckResult(self.name, metric, latency, "ms", sev,
+                           f"{probe} answered in {latency:.1f}ms")
+
+    def _pool_result(self, pool: dict) -> CheckResult:
+        pct = float(pool.get("saturation", 0.0)) * 100
+        warn = self._cfg.get("pool_saturation_warning_pct", 70)
+        crit = self._cfg.get("pool_saturation_critical_pct", 90)
+        if pct >= crit:
+            sev = "critical"
+        elif pct >= warn:
+            sev = "warning"
+        else:
+            sev = "ok"
+        return CheckResult(
+            self.name, "db_pool_saturation_pct", pct, "%", sev,
+            f"{pool.get('checked_out', 0)}/{pool.get('capacity', 0)} pooled connections in use "
+            f"(one worker's view)",
+        )
@@ -29,6 +29,7 @@ import yaml
 
 from monitoring.checks.server_health import ServerHealthCheck
 from monitoring.checks.nginx_status import NginxStatusCheck
+from monitoring.checks.api_health import ApiHealthCheck
 from monitoring.alerting.alerts import AlertDispatcher
 
 # ------------------------------------------------------------------
@@ -223,6 +224,7 @@ def main() -> int:
     checks = [
         ServerHealthCheck(config),
         NginxStatusCheck(config),
+        ApiHealthCheck(config),
     ]
 
     all_results = []
@@ -15,20 +15,8 @@ var projectsLoaded = false;
 // ---- Auth gate ----
 
 function getToken() {
-  try {
-    var raw = localStorage.getItem(JWT_KEY);
-    if (!raw) return null;
-    var data = JSON.parse(raw);
-    if (!data.token) return null;
-    var parts = data.token.split('.');
-    if (parts.length !== 3) return null;
-    var payload = JSON.parse(atob(parts[1].replace(/-/g, '+').replace(/_/g, '/')));
-    if (payload.exp && payload.exp * 1000 < Date.now()) {
-      localStorage.removeItem(JWT_KEY);
-      return null;
-    }
-    return data.token;
-  } catch (e) { return null; }
+  var session = svSession.get();
+  return session ? session.token : null;
 }
 
 // ---- Data ----
@@ -0,0 +1,141 @@
+/* ============================================================
+   session.js — shared sign-in state for sv_site pages
+   Load before any page script that reads sv_site_jwt.
+
+   Access tokens are short-lived; the stored refresh token renews them.
+   Page code keeps passing 'Authorization: Bearer <session.token>' to
+   fetch() as before — the wrapper below swaps in a fresh token before
+   the request goes out, and retries once after a refresh on 401.
+   ============================================================ */
+
+(function () {
+  var STORAGE_KEY = 'sv_site_jwt';
+  var REFRESH_MARGIN_MS = 30 * 1000;  // renew a little before expiry
+  var nativeFetch = window.fetch.bind(window);
+  var inflight = null;
+
+  function read() {
+    try {
+      var raw = localStorage.getItem(STORAGE_KEY);
+      return raw ? JSON.parse(raw) : null;
+    } catch (e) { return null; }
+  }
+
+  function tokenExp(token) {
+    try {
+      var parts = token.split('.');
+      if (parts.length !== 3) return null;
+      var payload = JSON.parse(atob(parts[1].replace(/-/g, '+').replace(/_/g, '/')));
+      return payload.exp || Infinity;
+    } catch (e) { return null; }
+  }
+
+  function canRefresh(data) {
+    return !!(data && data.refreshToken &&
+      (!data.refreshExpiresAt || data.refreshExpiresAt * 1000 > Date.now()));
+  }
+
+  /** Stored session if it is usable (live access token or renewable), else null. */
+  function get() {
+    var data = read();
+    if (!data || !data.token) return null;
+    var exp = tokenExp(data.token);
+    if (exp === null) return null;
+    if (exp * 1000 > Date.now() || canRefresh(data)) return data;
+    localStorage.removeItem(STORAGE_KEY);
+    return null;
+  }
+
+  /** Store a login / register / refresh response. */
+  function save(body) {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify({
+      token: body.token,
+      refreshToken: body.refreshToken,
+      refreshExpiresAt: body.refreshExpiresAt,
+      username: body.username,
+      isAdmin: body.isAdmin || false
+    }));
+  }
+
+  /** Rotate the refresh token. Resolves to the new access token, or null if signed out. */
+  function refresh() {
+    if (inflight) return inflight;
+    var data = read();
+    if (!canRefresh(data)) return Promise.resolve(null);
+
+    inflight = nativeFetch('/api/auth/refresh', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: data.refreshToken })
+    })
+      .then(function (resp) { return resp.ok ? resp.json() : null; })
+      .then(function (body) {
+        if (body) { save(body); return body.token; }
+        // Another tab may have rotated first — use its token if it did
+        var now = read();
+        if (now && now.refreshToken !== data.refreshToken) return now.token;
+        localStorage.removeItem(STORAGE_KEY);
+        return null;
+      })
+      .catch(function () { return null; })
+      .then(function (token) { inflight = null; return token; });
+    return inflight;
+  }
+
+  /** A non-expiring access token, refreshing first if needed. */
+  function freshToken() {
+    var data = get();
+    if (!data) return Promise.resolve(null);
+    var exp = tokenExp(data.token);
+    if (exp * 1000 - REFRESH_MARGIN_MS > Date.now()) return Promise.resolve(data.token);
+    return refresh();
+  }
+
+  function logout() {
+    var data = read();
+    localStorage.removeItem(STORAGE_KEY);
+    if (data && data.refreshToken) {
+      return nativeFetch('/api/auth/logout', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: data.refreshToken }),
+        keepalive: true
+      }).catch(function () {});
+    }
+    return Promise.resolve();
+  }
+
+  function bearerHeaders(init) {
+    var headers = init && init.headers;
+    if (!headers || headers instanceof Headers || Array.isArray(headers)) return null;
+    var auth = headers.Authorization || headers.authorization;
+    return auth && auth.indexOf('Bearer ') === 0 ? headers : null;
+  }
+
+  function withToken(init, headers, token) {
+    var copy = {};
+    for (var k in headers) {
+      if (k.toLowerCase() !== 'authorization') copy[k] = headers[k];
+    }
+    copy.Authorization = 'Bearer ' + token;
+    return Object.assign({}, init, { headers: copy });
+  }
+
+  window.fetch = async function (input, init) {
+    var url = typeof input === 'string' ? input : (input && input.url) || '';
+    var headers = bearerHeaders(init);
+    var isApi = url.indexOf('/api/') === 0 || url.indexOf(location.origin + '/api/') === 0;
+    if (!headers || !isApi || url.indexOf('/api/auth/refresh') !== -1) {
+      return nativeFetch(input, init);
+    }
+
+    var token = await freshToken();
+    var resp = await nativeFetch(input, token ? withToken(init, headers, token) : init);
+    if (resp.status !== 401 || !canRefresh(read())) return resp;
+
+    var renewed = await refresh();
+    return renewed ? nativeFetch(input, withToken(init, headers, renewed)) : resp;
+  };
+
+  window.svSession = { get: get, save: save, refresh: refresh, logout: logout };
+})();
@@ -0,0 +1,137 @@
+"""
+Compare the ways an API response can become JSON bytes, on payloads shaped
+like the real ones.
+
+Run from the repo root:
+    python scripts/bench_json_serialization.py
+    python scripts/bench_json_serialization.py --items 500 --repeat 200
+
+Paths timed, per payload:
+
+  jsonable+json   route with no return type: FastAPI walks the value with
+                  jsonable_encoder, then json.dumps
+  pydantic        route declaring `-> dict` with the default response class:
+                  validate, then pydantic-core dumps straight to bytes
+  orjson class    `-> dict` plus an orjson default_response_class: FastAPI
+                  drops to python-mode serialization, then orjson
+  json_bytes      sv_site.responses.json_bytes on the value directly
+  cached bytes    a JSONBytesResponse around bytes encoded earlier — what a
+                  cache hit or an sv-tools passthrough costs
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# Ensure src/ is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sv_site.responses import JSONBytesResponse, json_bytes  # noqa: E402
+
+_DICT = TypeAdapter(dict)
+_NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _feedback_page(n: int) -> dict:
+    """GET /api/hub/feedback?view=summary"""
+    return {"ok": True, "data": {
+        "feedback": [
+            {
+                "id": i,
+                "program_name": f"program-{i % 6}",
+                "received_at": (_NOW - timedelta(minutes=i)).isoformat(),
+                "is_authenticated_user": i % 3 == 0,
+                "is_anonymous": i % 4 == 0,
+                "privacy_token": "a1b2c3d4…",
+                "score": i % 10 + 1,
+                "summary": "User reports the export button times out on large programs. " * 2,
+                "sentiment": ("positive", "neutral", "negative")[i % 3],
+                "tags": ["export", "performance", "ui"][: i % 3 + 1],
+                "processed_at": (_NOW - timedelta(minutes=i - 1)).isoformat(),
+                "processing_error": None,
+            }
+            for i in range(n)
+        ],
+        "total": n * 40,
+        "total_is_estimate": False,
+        "next_cursor": f"{_NOW.isoformat()},{n}",
+    }}
+
+
+def _ideas(n: int) -> dict:
+    """GET /api/ideas as sv-tools returns it"""
+    return {"ideas": [
+        {
+            "id": i,
+            "title": f"Idea {i}: batch the nightly reprocess job",
+            "description": "Longer free-text description of the idea. " * 12,
+            "status": ("new", "planned", "in_progress", "done")[i % 4],
+            "public": i % 2 == 0,
+            "tags": ["infra", "feedback"],
+            "created_at": (_NOW - timedelta(days=i)).isoformat(),
+            "updated_at": _NOW.isoformat(),
+            "owner": {"id": 1, "name": "Mike"},
+        }
+        for i in range(n)
+    ]}
+
+
+def _reactions(n: int) -> dict:
+    """GET /api/ideas/reactions, admin view"""
+    return {"reactions": {
+        str(i): {
+            "score": i % 7 - 2, "ups": i % 5, "downs": i % 3, "favorites": i % 4,
+            "my_vote": (1, -1, None)[i % 3], "my_favorite": i % 2 == 0,
+            "voters": [{"username": f"user{u}", "vote": 1 if u % 2 else -1} for u in range(i % 6)],
+            "favorited_by": [f"user{u}" for u in range(i % 4)],
+        }
+        for i in range(n)
+    }}
+
+
+def _paths(payload: dict) -> dict:
+    cached = json_bytes(payload)
+    return {
+        "jsonable+json": lambda: json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+            separators=(",", ":"),
+        ).encode(),
+        "pydantic": lambda: _DICT.dump_json(_DICT.validate_python(payload)),
+        "orjson class": lambda: orjson.dumps(
+            _DICT.dump_python(_DICT.validate_python(payload), mode="json")
+        ),
+        "json_bytes": lambda: json_bytes(payload),
+        "cached bytes": lambda: JSONBytesResponse(cached).body,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--items", type=int, default=200, help="Rows per payload (default 200)")
+    parser.add_argument("--repeat", type=int, default=100, help="Encodes per timing (default 100)")
+    args = parser.parse_args()
+
+    payloads = {
+        "feedback page": _feedback_page(args.items),
+        "ideas list": _ideas(args.items),
+        "reactions": _reactions(args.items),
+    }
+    for name, payload in payloads.items():
+        size_kb = len(json_bytes(payload)) / 1024
+        print(f"=== {name}: {args.items} items, {size_kb:.0f} KB ===")
+        baseline = None
+        for path, fn in _paths(payload).items():
+            per_call = min(timeit.repeat(fn, number=args.repeat, repeat=5)) / args.repeat
+            baseline = baseline or per_call
+            print(f"  {path:14} {per_call * 1000:8.3f} ms  {baseline / per_call:7.1f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Show how much a burst of logins stalls the event loop, sync vs async bcrypt.
+
+Run from the repo root:
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --logins 20 --rounds 12
+
+A "heartbeat" task wakes every 5 ms, standing in for the other requests a
+uvicorn worker is serving. For each mode we fire --logins concurrent
+password verifications and report how late the heartbeat ran: with the sync
+call the loop is blocked for the whole burst, with the async variant it
+barely notices.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bcrypt
+
+# Ensure src/ is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sv_common.auth.passwords import verify_password, verify_password_async  # noqa: E402
+
+TICK = 0.005
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _burst(mode: str, logins: int, hashed: str) -> dict:
+    async def sync_login() -> bool:
+        return verify_password("correct horse", hashed)
+
+    async def async_login() -> bool:
+        return await verify_password_async("correct horse", hashed)
+
+    login = sync_login if mode == "sync" else async_login
+    stop = asyncio.Event()
+    lags: list[float] = []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(TICK * 4)  # let the heartbeat settle
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    return {
+        "mode": mode,
+        "burst_s": elapsed,
+        "max_lag_ms": max(lags) * 1000,
+        "p50_lag_ms": statistics.median(lags) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--logins", type=int, default=10, help="Concurrent verifications (default 10)")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor (default 12)")
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(args.rounds)).decode()
+
+    print(f"=== bcrypt login burst: {args.logins} concurrent, cost {args.rounds} ===\n")
+    print(f"  {'mode':6}  {'burst':>8}  {'max loop lag':>13}  {'p50 loop lag':>13}")
+    for mode in ("sync", "async"):
+        r = asyncio.run(_burst(mode, args.logins, hashed))
+        print(f"  {r['mode']:6}  {r['burst_s']:7.2f}s  {r['max_lag_ms']:10.1f} ms  {r['p50_lag_ms']:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
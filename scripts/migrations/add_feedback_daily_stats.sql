@@ -0,0 +1,71 @@
+-- Pre-aggregated feedback analytics for GET /api/hub/feedback/stats
+-- One row per (program_name, UTC day), maintained incrementally by sv_site.feedback_rollups.
+-- Run once against the Hub's PostgreSQL database; the final INSERT backfills existing feedback.
+-- Re-sync later with: python -m sv_site.feedback_rollups rebuild
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_daily_stats.sql
+
+CREATE TABLE IF NOT EXISTS shadowedvaca.feedback_daily_stats (
+    program_name     VARCHAR(80) NOT NULL,
+    day              DATE        NOT NULL,
+    feedback_count   INTEGER     NOT NULL DEFAULT 0,
+    score_sum        BIGINT      NOT NULL DEFAULT 0,
+    score_count      INTEGER     NOT NULL DEFAULT 0,
+    sentiment_counts JSONB       NOT NULL DEFAULT '{}'::jsonb,   -- {"positive": 12, ...}
+    tag_counts       JSONB       NOT NULL DEFAULT '{}'::jsonb,   -- {"bug report": 3, ...}
+    updated_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (program_name, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fds_day
+    ON shadowedvaca.feedback_daily_stats (day);
+
+-- Sum two {key: count} maps, dropping keys that net to zero
+CREATE OR REPLACE FUNCTION shadowedvaca.jsonb_counts_merge(a JSONB, b JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(jsonb_object_agg(key, total) FILTER (WHERE total <> 0), '{}'::jsonb)
+    FROM (
+        SELECT key, sum(value::int) AS total
+        FROM (
+            SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+            UNION ALL
+            SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+        ) kv
+        GROUP BY key
+    ) t
+$$;
+
+-- Backfill
+INSERT INTO shadowedvaca.feedback_daily_stats
+    (program_name, day, feedback_count, score_sum, score_count, sentiment_counts, tag_counts)
+SELECT b.program_name, b.day, b.n, b.score_sum, b.score_count,
+       COALESCE(s.counts, '{}'), COALESCE(t.counts, '{}')
+FROM (
+    SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day,
+           count(*) AS n, COALESCE(sum(score), 0) AS score_sum, count(score) AS score_count
+    FROM shadowedvaca.customer_feedback
+    GROUP BY 1, 2
+) b
+LEFT JOIN (
+    SELECT program_name, day, jsonb_object_agg(sentiment, n) AS counts
+    FROM (
+        SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day, sentiment, count(*) AS n
+        FROM shadowedvaca.customer_feedback
+        WHERE sentiment IS NOT NULL
+        GROUP BY 1, 2, 3
+    ) x
+    GROUP BY 1, 2
+) s USING (program_name, day)
+LEFT JOIN (
+    SELECT program_name, day, jsonb_object_agg(tag, n) AS counts
+    FROM (
+        SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day, tag, count(*) AS n
+        FROM shadowedvaca.customer_feedback,
+             jsonb_array_elements_text(COALESCE(tags, '[]')) AS tag
+        GROUP BY 1, 2, 3
+    ) x
+    GROUP BY 1, 2
+) t USING (program_name, day)
+ON CONFLICT (program_name, day) DO NOTHING;
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON shadowedvaca.feedback_daily_stats TO sv_site_user;
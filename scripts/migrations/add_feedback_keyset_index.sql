@@ -0,0 +1,16 @@
+-- Keyset pagination for GET /api/hub/feedback
+-- Pages are fetched with WHERE (received_at, id) < (:ts, :id) ORDER BY received_at DESC, id DESC,
+-- which these composite indexes serve as a single range scan at any depth.
+-- CONCURRENTLY avoids locking ingest; run outside a transaction (plain psql -f is fine).
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_keyset_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cf_received_id
+    ON shadowedvaca.customer_feedback (received_at DESC, id DESC);
+
+-- Same ordering within a program (the most common filter); also serves program_name lookups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cf_program_received_id
+    ON shadowedvaca.customer_feedback (program_name, received_at DESC, id DESC);
+
+-- Superseded by the composites above
+DROP INDEX CONCURRENTLY IF EXISTS shadowedvaca.idx_cf_received;
+DROP INDEX CONCURRENTLY IF EXISTS shadowedvaca.idx_cf_program;
@@ -0,0 +1,22 @@
+-- Program registry for the Hub feedback filter dropdown
+-- One row per program_name, upserted by sv_site.feedback_rollups.record_ingest, so
+-- GET /api/hub/feedback/programs no longer scans customer_feedback for DISTINCT names.
+-- Run once against the Hub's PostgreSQL database; the INSERT backfills existing feedback.
+-- Re-sync later with: python -m sv_site.feedback_rollups rebuild
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_programs.sql
+
+CREATE TABLE IF NOT EXISTS shadowedvaca.feedback_programs (
+    program_name   VARCHAR(80) PRIMARY KEY,
+    first_seen     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_seen      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    feedback_count INTEGER     NOT NULL DEFAULT 0
+);
+
+-- Backfill
+INSERT INTO shadowedvaca.feedback_programs (program_name, first_seen, last_seen, feedback_count)
+SELECT program_name, min(received_at), max(received_at), count(*)
+FROM shadowedvaca.customer_feedback
+GROUP BY program_name
+ON CONFLICT (program_name) DO NOTHING;
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON shadowedvaca.feedback_programs TO sv_site_user;
@@ -0,0 +1,18 @@
+-- Feedback re-enrichment: track which prompt produced each row's AI fields.
+-- Run once against the Hub's PostgreSQL database.
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_prompt_version.sql
+
+ALTER TABLE shadowedvaca.customer_feedback
+    ADD COLUMN IF NOT EXISTS prompt_version INTEGER;
+
+-- Everything enriched before this migration used prompt version 1
+UPDATE shadowedvaca.customer_feedback
+   SET prompt_version = 1
+ WHERE processed_at IS NOT NULL
+   AND processing_error IS NULL
+   AND prompt_version IS NULL;
+
+-- Keeps the reprocess CLI's candidate scan small: failed / never-processed rows only
+CREATE INDEX IF NOT EXISTS idx_cf_needs_processing
+    ON shadowedvaca.customer_feedback (id)
+    WHERE processed_at IS NULL OR processing_error IS NOT NULL;
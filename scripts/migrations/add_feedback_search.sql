@@ -0,0 +1,22 @@
+-- Full-text + fuzzy search for GET /api/hub/feedback?q=
+-- search_vector is maintained by Postgres itself: summary weighted A, raw_feedback B.
+-- NOTE: adding a STORED generated column rewrites the table once (ACCESS EXCLUSIVE lock) —
+-- run during a quiet period. The indexes are built CONCURRENTLY; run outside a transaction.
+-- CREATE EXTENSION needs a role with CREATE on the database (pg_trgm is a trusted extension).
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_search.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE shadowedvaca.customer_feedback
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(summary, '')), 'A') ||
+        setweight(to_tsvector('english', raw_feedback), 'B')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cf_search
+    ON shadowedvaca.customer_feedback USING GIN (search_vector);
+
+-- Serves the word-similarity operator (q <% raw_feedback) used for typo-tolerant matches
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cf_raw_trgm
+    ON shadowedvaca.customer_feedback USING GIN (raw_feedback gin_trgm_ops);
@@ -0,0 +1,34 @@
+-- Change counter for cached feedback totals (sv_site.feedback_counts)
+-- A single row whose version moves in the same transaction as any change to
+-- customer_feedback, so every worker sees it exactly when the change becomes visible.
+-- Ingest bumps it explicitly just before committing: an INSERT trigger would hold this
+-- row's lock across the AI call that runs between the insert and the commit. The
+-- statement trigger below covers everything else — re-enrichment, manual edits, deletes.
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_feedback_version.sql
+
+CREATE TABLE IF NOT EXISTS shadowedvaca.feedback_version (
+    id      BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),   -- exactly one row
+    version BIGINT  NOT NULL DEFAULT 0
+);
+
+INSERT INTO shadowedvaca.feedback_version (id, version) VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION shadowedvaca.bump_feedback_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE shadowedvaca.feedback_version SET version = version + 1;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_cf_version ON shadowedvaca.customer_feedback;
+CREATE TRIGGER trg_cf_version
+    AFTER UPDATE OR DELETE OR TRUNCATE ON shadowedvaca.customer_feedback
+    FOR EACH STATEMENT EXECUTE FUNCTION shadowedvaca.bump_feedback_version();
+
+-- Replaces the max(processed_at) probe this counter supersedes
+DROP INDEX IF EXISTS shadowedvaca.idx_cf_processed_at;
+
+GRANT SELECT, UPDATE ON shadowedvaca.feedback_version TO sv_site_user;
@@ -0,0 +1,17 @@
+-- Shared token buckets for login throttling (LOGIN_RATE_LIMIT=postgres)
+-- One row per "<limiter>:<key>" (e.g. login_ip:203.0.113.7, login_user:mike),
+-- updated atomically by sv_site.rate_limit. Idle rows are pruned by the limiter itself.
+-- Only needed when running with LOGIN_RATE_LIMIT=postgres; the default in-memory mode has no table.
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_rate_limit_buckets.sql
+
+CREATE TABLE IF NOT EXISTS shadowedvaca.rate_limit_buckets (
+    bucket_key VARCHAR(200)     PRIMARY KEY,
+    tokens     DOUBLE PRECISION NOT NULL,
+    allowed    BOOLEAN          NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMPTZ      NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rlb_updated
+    ON shadowedvaca.rate_limit_buckets (updated_at);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON shadowedvaca.rate_limit_buckets TO sv_site_user;
@@ -0,0 +1,23 @@
+-- Refresh tokens for short-lived access JWTs (POST /api/auth/refresh)
+-- Only a sha256 of each token is stored. Every refresh marks the presented token
+-- used and issues the next one in the same family; presenting a used token again
+-- revokes the whole family (someone replayed a stolen token).
+-- Expired rows for a user are deleted at their next login.
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_refresh_tokens.sql
+
+CREATE TABLE IF NOT EXISTS shadowedvaca.refresh_tokens (
+    id         SERIAL      PRIMARY KEY,
+    user_id    INTEGER     NOT NULL REFERENCES shadowedvaca.users(id) ON DELETE CASCADE,
+    token_hash VARCHAR(64) NOT NULL UNIQUE,
+    family_id  VARCHAR(32) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    used_at    TIMESTAMPTZ,
+    revoked_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_rt_user   ON shadowedvaca.refresh_tokens (user_id);
+CREATE INDEX IF NOT EXISTS idx_rt_family ON shadowedvaca.refresh_tokens (family_id);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON shadowedvaca.refresh_tokens TO sv_site_user;
+GRANT USAGE, SELECT ON SEQUENCE shadowedvaca.refresh_tokens_id_seq TO sv_site_user;
@@ -0,0 +1,9 @@
+-- Permission claims in JWTs: tokens carry the user's tool slugs plus this version.
+-- Anything that changes a user's access bumps permissions_version, which makes
+-- older tokens fall back to a DB lookup (see sv_site.auth.get_permissions_version).
+-- If you change is_admin / is_active / user_permissions by hand, bump it too:
+--   UPDATE shadowedvaca.users SET permissions_version = permissions_version + 1 WHERE id = ...;
+-- psql -U sv_site_user -d sv_db -f scripts/migrations/add_user_permissions_version.sql
+
+ALTER TABLE shadowedvaca.users
+    ADD COLUMN IF NOT EXISTS permissions_version INTEGER NOT NULL DEFAULT 1;
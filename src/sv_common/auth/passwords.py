@@ -1,14 +1,61 @@
-"""Password hashing and verification using bcrypt."""
+"""Password hashing and verification using bcrypt.
+
+bcrypt is deliberately slow (tens to hundreds of ms per call) and CPU-bound.
+Async code should use the ``*_async`` variants: they run bcrypt on a small
+dedicated thread pool — bcrypt releases the GIL while hashing — so the event
+loop keeps serving other requests. The pool is bounded so a burst of logins
+queues instead of saturating every core.
+
+The work factor is a parameter so the application can set policy (and raise
+it as hardware gets faster); needs_rehash() tells a caller holding the
+plain-text password — i.e. at login — that the stored hash is off-policy.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 import bcrypt
 
+DEFAULT_ROUNDS = 12  # bcrypt.gensalt() default
+
+_MAX_WORKERS = min(4, os.cpu_count() or 1)
+_executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="bcrypt")
 
-def hash_password(plain: str) -> str:
-    """Hash a plain-text password. Returns bcrypt hash string."""
-    salt = bcrypt.gensalt()
+
+def hash_password(plain: str, rounds: int = DEFAULT_ROUNDS) -> str:
+    """Hash a plain-text password at the given cost. Returns bcrypt hash string."""
+    salt = bcrypt.gensalt(rounds)
     return bcrypt.hashpw(plain.encode(), salt).decode()
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Return True if plain matches the stored bcrypt hash."""
     return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
+def hash_rounds(hashed: str) -> int | None:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if unparseable."""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed: str, rounds: int) -> bool:
+    """True if the stored hash wasn't made at the current policy cost."""
+    return hash_rounds(hashed) != rounds
+
+
+async def hash_password_async(plain: str, rounds: int = DEFAULT_ROUNDS) -> str:
+    """hash_password() on the bcrypt thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, hash_password, plain, rounds
+    )
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password() on the bcrypt thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, verify_password, plain, hashed
+    )
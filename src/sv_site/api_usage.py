@@ -0,0 +1,142 @@
+"""
+AI API usage + cost logging.
+
+Every paid AI call appends one JSON line to API_CALLS_LOG_PATH using the
+`api_calls` row shape from docs/MONITORING-PLAN.md (Phase 3), so the monitoring
+cost tracker can ingest it without knowing anything about sv_site.
+Writes happen on a single background thread — callers never wait on disk I/O.
+Empty API_CALLS_LOG_PATH disables the sink (usage is still logged).
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from sv_site.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "sv-site"
+
+# Prices live with the cost alert thresholds so there is one table to update
+DEFAULT_PRICING_PATH = (
+    Path(__file__).resolve().parents[2] / "monitoring" / "config" / "thresholds.yaml"
+)
+
+
+@lru_cache
+def load_pricing(path: str) -> dict[str, dict[str, dict[str, float]]]:
+    """The `pricing:` section of a thresholds file: service -> model -> USD per 1M tokens.
+
+    A missing or unreadable file logs an error and prices every call at 0.0
+    rather than failing the AI call being recorded.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return (yaml.safe_load(fh) or {}).get("pricing") or {}
+    except (OSError, yaml.YAMLError) as exc:
+        logger.error("Could not load AI pricing from %s: %s", path, exc)
+        return {}
+
+
+def pricing() -> dict[str, dict[str, dict[str, float]]]:
+    return load_pricing(get_settings().ai_pricing_path or str(DEFAULT_PRICING_PATH))
+
+
+# One writer thread: appends stay ordered and never interleave within a worker
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-usage")
+_pending: set[asyncio.Future] = set()
+
+
+def _tokens(usage: Any, field: str) -> int:
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else 0
+
+
+def usage_tokens(usage: Any) -> dict[str, int]:
+    """Normalize an SDK usage object (Anthropic naming) to api_calls token columns."""
+    return {
+        "input_tokens":       _tokens(usage, "input_tokens"),
+        "output_tokens":      _tokens(usage, "output_tokens"),
+        "cache_read_tokens":  _tokens(usage, "cache_read_input_tokens"),
+        "cache_write_tokens": _tokens(usage, "cache_creation_input_tokens"),
+    }
+
+
+def estimate_cost(service: str, model: str, tokens: dict[str, int]) -> float:
+    """Estimated USD cost; 0.0 for models missing from the pricing table."""
+    rates = pricing().get(service, {}).get(model)
+    if rates is None:
+        return 0.0
+    return round(
+        (
+            tokens["input_tokens"] * rates["input"]
+            + tokens["output_tokens"] * rates["output"]
+            + tokens["cache_read_tokens"] * rates.get("cache_read", 0.0)
+            + tokens["cache_write_tokens"] * rates.get("cache_write", 0.0)
+        ) / 1_000_000,
+        8,
+    )
+
+
+def _append(path: str, line: str) -> None:
+    try:
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+    except OSError as exc:
+        logger.error("Could not write api_calls log %s: %s", path, exc)
+
+
+def record_api_call(
+    *,
+    service: str,
+    model: str,
+    operation: str,
+    usage: Any,
+    metadata: Optional[dict] = None,
+) -> dict:
+    """Log token usage + estimated cost for one API call. Returns the api_calls row."""
+    tokens = usage_tokens(usage)
+    row = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "service": service,
+        "model": model,
+        "operation": operation,
+        **tokens,
+        "estimated_cost_usd": estimate_cost(service, model, tokens),
+        "source": SOURCE,
+        "metadata": json.dumps(metadata or {}),
+    }
+    logger.info(
+        "AI usage: %s in=%d out=%d cache_r=%d cache_w=%d cost=$%.6f",
+        operation, tokens["input_tokens"], tokens["output_tokens"],
+        tokens["cache_read_tokens"], tokens["cache_write_tokens"], row["estimated_cost_usd"],
+    )
+
+    path = get_settings().api_calls_log_path
+    if not path:
+        return row
+
+    line = json.dumps(row) + "\n"
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _append(path, line)  # CLI / sync context — nothing to block
+        return row
+
+    fut = loop.run_in_executor(_executor, _append, path, line)
+    _pending.add(fut)
+    fut.add_done_callback(_pending.discard)
+    return row
+
+
+async def flush() -> None:
+    """Wait for queued writes — for CLIs and tests before they exit."""
+    if _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
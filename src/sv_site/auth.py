@@ -2,19 +2,39 @@
 
 JWT creation/validation and invite code helpers.
 Uses sv_common.auth.passwords for bcrypt.
+
+Tokens carry the user's tool permissions (`perms`) and the
+users.permissions_version they were issued at (`pv`). Callers that need
+current access compare `pv` against get_permissions_version(), which is
+served from an in-process cache: admin changes bump the version and clear
+this worker's entry; other workers pick it up within
+PERMISSIONS_CACHE_SECONDS.
 """
 
+import hashlib
+import logging
 import random
+import secrets
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
 from fastapi import Header, HTTPException
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from sv_site.cache import TTLCache
 from sv_site.config import get_settings
-from sv_site.models import InviteCode, User
-from sv_common.auth.passwords import hash_password, verify_password  # noqa: F401 (re-exported)
+from sv_site.database import get_session_factory
+from sv_site.models import InviteCode, RefreshToken, User, UserPermission
+from sv_common.auth.passwords import (  # noqa: F401 (re-exported)
+    hash_password,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
+
+logger = logging.getLogger(__name__)
 
 _CHARSET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"  # no 0/O, 1/I/L
 _CODE_LENGTH = 8
@@ -25,8 +45,18 @@ _CODE_LENGTH = 8
 # ---------------------------------------------------------------------------
 
 
-def create_access_token(user_id: int, username: str, is_admin: bool) -> str:
-    """Create a signed JWT for the given user."""
+def create_access_token(
+    user_id: int,
+    username: str,
+    is_admin: bool,
+    permissions: list[str] | None = None,
+    permissions_version: int | None = None,
+) -> str:
+    """Create a signed JWT for the given user.
+
+    Pass permissions + permissions_version to embed access claims; tokens
+    without them are still valid but make /auth/me hit the DB.
+    """
     settings = get_settings()
     payload = {
         "user_id": user_id,
@@ -35,6 +65,9 @@ def create_access_token(user_id: int, username: str, is_admin: bool) -> str:
         "exp": datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_expire_minutes),
         "iat": datetime.now(timezone.utc),
     }
+    if permissions_version is not None:
+        payload["perms"] = sorted(permissions or [])
+        payload["pv"] = permissions_version
     return jwt.encode(payload, settings.secret_key, algorithm=settings.jwt_algorithm)
 
 
@@ -48,6 +81,27 @@ def decode_access_token(token: str) -> dict:
     return jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
 
 
+# sha256(token) -> verified payload, kept until the token's own exp. Keyed on the
+# whole token, so any altered token misses and gets a full signature check.
+_verified_tokens = TTLCache("verified_jwt", maxsize=4096)
+
+
+def decode_access_token_cached(token: str) -> dict:
+    """decode_access_token() with verified payloads cached until they expire.
+
+    Never returns an expired payload: entries lapse at `exp`, after which the
+    full decode runs again and raises ExpiredSignatureError. Returns a copy so
+    callers can't alter the cached claims.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(key)
+    if payload is None:
+        payload = decode_access_token(token)
+        if "exp" in payload:
+            _verified_tokens.set(key, payload, expires_at=float(payload["exp"]))
+    return dict(payload)
+
+
 async def require_auth(
     authorization: str | None = Header(None),
 ) -> dict:
@@ -55,7 +109,7 @@ async def require_auth(
     if authorization and authorization.startswith("Bearer "):
         token = authorization[7:]
         try:
-            return decode_access_token(token)
+            return decode_access_token_cached(token)
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token expired")
         except jwt.InvalidTokenError:
@@ -64,6 +118,132 @@ async def require_auth(
     raise HTTPException(status_code=401, detail="Authentication required")
 
 
+# ---------------------------------------------------------------------------
+# Permission versions
+# ---------------------------------------------------------------------------
+
+# user_id -> permissions_version, or 0 if the user is gone / deactivated
+_permissions_versions = TTLCache("permissions_version", maxsize=4096)
+
+
+async def load_permissions(db: AsyncSession, user_id: int) -> list[str]:
+    """Stored (non-locked) tool slugs for a user."""
+    result = await db.execute(
+        select(UserPermission.tool_slug).where(UserPermission.user_id == user_id)
+    )
+    return sorted(result.scalars().all())
+
+
+async def get_permissions_version(db: AsyncSession, user_id: int) -> int:
+    """Current users.permissions_version; 0 means the user can't hold a valid token."""
+    version = _permissions_versions.get(user_id)
+    if version is None:
+        result = await db.execute(
+            select(User.permissions_version, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        version = row.permissions_version if row is not None and row.is_active else 0
+        _permissions_versions.set(user_id, version, ttl=get_settings().permissions_cache_seconds)
+    return version
+
+
+def invalidate_permissions_version(user_id: int) -> None:
+    """Forget the cached version — call after committing an access change."""
+    _permissions_versions.pop(user_id)
+
+
+# ---------------------------------------------------------------------------
+# Refresh tokens
+# ---------------------------------------------------------------------------
+
+
+class RefreshTokenReused(ValueError):
+    """An already-rotated refresh token was presented; its family is now revoked."""
+
+
+def _refresh_hash(raw: str) -> str:
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def issue_refresh_token(
+    db: AsyncSession,
+    user_id: int,
+    family_id: str | None = None,
+) -> tuple[str, datetime]:
+    """Create a refresh token. Returns (raw token, expires_at); only its hash is stored.
+
+    family_id=None starts a new family (a fresh login) and clears the user's
+    expired tokens while we're here.
+    """
+    now = datetime.now(timezone.utc)
+    if family_id is None:
+        family_id = uuid.uuid4().hex
+        await db.execute(
+            delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now)
+        )
+    raw = secrets.token_urlsafe(32)
+    expires_at = now + timedelta(days=get_settings().refresh_token_days)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_refresh_hash(raw),
+        family_id=family_id,
+        expires_at=expires_at,
+    ))
+    await db.flush()
+    return raw, expires_at
+
+
+async def _revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, raw: str) -> tuple[User, str, datetime]:
+    """Spend a refresh token and issue its successor. Returns (user, raw token, expires_at).
+
+    Raises RefreshTokenReused if the token was already spent — the caller must
+    commit so the family revocation sticks. Raises ValueError for anything else
+    invalid (unknown, expired, revoked, user gone or inactive).
+    """
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == _refresh_hash(raw)).with_for_update()
+    )
+    token = result.scalar_one_or_none()
+    if token is None or token.revoked_at is not None:
+        raise ValueError("Refresh token is invalid or revoked")
+    if token.used_at is not None:
+        await _revoke_family(db, token.family_id)
+        raise RefreshTokenReused("Refresh token reuse detected")
+
+    now = datetime.now(timezone.utc)
+    expires = token.expires_at
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=timezone.utc)
+    if now > expires:
+        raise ValueError("Refresh token expired")
+
+    user = await db.get(User, token.user_id)
+    if user is None or not user.is_active:
+        raise ValueError("Refresh token is invalid or revoked")
+
+    token.used_at = now
+    new_raw, expires_at = await issue_refresh_token(db, user.id, token.family_id)
+    return user, new_raw, expires_at
+
+
+async def revoke_refresh_token(db: AsyncSession, raw: str) -> None:
+    """Log out: revoke the token's whole family. Unknown tokens are ignored."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == _refresh_hash(raw))
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is not None:
+        await _revoke_family(db, family_id)
+
+
 # ---------------------------------------------------------------------------
 # Invite codes
 # ---------------------------------------------------------------------------
@@ -132,3 +312,23 @@ async def consume_invite_code(db: AsyncSession, code: str) -> InviteCode:
 async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
     result = await db.execute(select(User).where(User.username == username.lower().strip()))
     return result.scalar_one_or_none()
+
+
+async def rehash_password(user_id: int, plain: str, old_hash: str, rounds: int) -> None:
+    """Login background task: re-store the password at the policy cost.
+
+    Runs after the response is sent, on its own session. The UPDATE only applies
+    while the stored hash is still old_hash, so a concurrent password change wins.
+    """
+    try:
+        new_hash = await hash_password_async(plain, rounds)
+        async with get_session_factory()() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+            await db.commit()
+        logger.info("Rehashed password for user_id=%d at cost %d", user_id, rounds)
+    except Exception:
+        logger.exception("Password rehash failed for user_id=%d", user_id)
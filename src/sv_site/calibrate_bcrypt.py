@@ -0,0 +1,74 @@
+"""
+Pick a bcrypt cost (BCRYPT_ROUNDS) for this host.
+
+Usage:
+    python -m sv_site.calibrate_bcrypt                  # aim for ~250 ms per hash
+    python -m sv_site.calibrate_bcrypt --target-ms 400 --max-rounds 15
+
+Times hash_password() at each cost factor and recommends the highest one
+whose median stays within --target-ms. Each +1 doubles the time, so the
+sweep stops early once a cost is well past the target. Run it on the
+production host (inside the container) — laptops are not representative.
+Existing hashes are moved to a new cost on each user's next login.
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Optional
+
+from sv_common.auth.passwords import hash_password
+from sv_site.config import get_settings
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median milliseconds for one hash at this cost."""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hash_password("calibration-password", rounds)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def recommend(timings: dict[int, float], target_ms: float) -> Optional[int]:
+    """Highest cost whose median fits the target, or None if even the lowest doesn't."""
+    fitting = [r for r, ms in timings.items() if ms <= target_ms]
+    return max(fitting) if fitting else None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt and recommend BCRYPT_ROUNDS")
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="Acceptable time per hash in milliseconds (default 250)")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Lowest cost to try (default 10)")
+    parser.add_argument("--max-rounds", type=int, default=14, help="Highest cost to try (default 14)")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes per cost (default 3)")
+    args = parser.parse_args(argv)
+
+    current = get_settings().bcrypt_rounds
+    print(f"=== bcrypt calibration (target {args.target_ms:.0f} ms, current BCRYPT_ROUNDS={current}) ===\n")
+
+    timings: dict[int, float] = {}
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        ms = time_rounds(rounds, args.samples)
+        timings[rounds] = ms
+        marker = " <- current" if rounds == current else ""
+        print(f"  cost {rounds:2d}: {ms:8.1f} ms{marker}")
+        if ms > args.target_ms * 2:
+            break  # the next one only doubles
+
+    best = recommend(timings, args.target_ms)
+    print()
+    if best is None:
+        print(f"Even cost {args.min_rounds} exceeds {args.target_ms:.0f} ms; "
+              f"raise --target-ms or lower --min-rounds.")
+        return 1
+    print(f"Recommended: BCRYPT_ROUNDS={best}")
+    if best != current:
+        print("Set it in .env and restart; stored hashes are upgraded as users log in.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
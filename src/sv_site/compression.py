@@ -0,0 +1,138 @@
+"""
+Response compression: brotli or gzip, whichever the client prefers.
+
+CompressionMiddleware compresses a complete response body when
+
+- the client's Accept-Encoding allows br or gzip (br wins a tie; it is only
+  offered when the brotli package is installed)
+- the body is text or JSON and at least COMPRESSION_MIN_BYTES long —
+  below ~1 KB the headers cost more than compression saves
+- the response isn't encoded already and isn't streamed; the feedback
+  export streams and does its own gzip
+
+Every response that could have been compressed carries Vary:
+Accept-Encoding, including the ones this request gets uncompressed.
+
+Cached bodies don't come through here compressed per request:
+responses.CachedBody keeps each compressed variant next to the raw bytes,
+and CachedJSONResponse sends the one the client asked for with
+Content-Encoding already set, so the middleware leaves it alone.
+
+nginx has gzip off for /api/ so the work isn't done twice.
+"""
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from sv_site.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Server preference, best first
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """The supported coding with the highest q-value in an Accept-Encoding
+    header (ties go to ENCODINGS order), or None for identity."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def request_encoding(scope: Scope, size: int) -> str | None:
+    """How to encode a `size`-byte body for this request; None = send as-is."""
+    if size < max(get_settings().compression_min_bytes, 1):
+        return None
+    return choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    settings = get_settings()
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    # mtime=0: the same body always compresses to the same bytes
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+def vary_on_encoding(headers: MutableHeaders) -> None:
+    """Mark a response that could have been sent compressed, whether or not it was.
+
+    Without it a shared cache may hand a gzip body to a client that can't
+    read it, or a small uncompressed one to a client that could have had br.
+    """
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def set_encoding_headers(headers: MutableHeaders, encoding: str, length: int) -> None:
+    headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(length)
+    vary_on_encoding(headers)
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").startswith(_COMPRESSIBLE)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether it's all there is
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            encoding = None
+            if not message.get("more_body") and _compressible(Headers(raw=held["headers"])):
+                # Even when this request gets it as-is, another might not
+                vary_on_encoding(MutableHeaders(scope=held))
+                encoding = request_encoding(scope, len(body))
+            if encoding is not None:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    set_encoding_headers(MutableHeaders(scope=held), encoding, len(compressed))
+                    message = {**message, "body": compressed}
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
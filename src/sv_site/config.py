@@ -1,7 +1,9 @@
 """Application settings loaded from environment variables / .env file."""
 
 from functools import lru_cache
+from typing import Literal
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,23 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     database_url: str = "postgresql+asyncpg://localhost/shadowedvaca"
+
+    # Connection pool (per uvicorn worker) — see sv_site.database
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0     # seconds to wait for a free connection
+    db_pool_recycle: int = 1800       # seconds; replace connections older than this
+    db_pool_pre_ping: bool = True
+    db_pool_warm: bool = True         # open db_pool_size connections at startup
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection; 0 behind pgbouncer
+    db_statement_timeout_ms: int = 0  # server-side statement_timeout; 0 = Postgres default
+    db_application_name: str = "sv-site"
+    slow_query_ms: float = 200.0      # log statements at least this slow to sv_site.slow_query; 0 = off
+
+    # Read replica for read-only routes (get_read_db); empty = use the primary
+    database_read_url: str = ""
+    db_read_pin_seconds: int = 5      # after a write, that client reads from the primary this long; 0 = never
+
     secret_key: str = "dev-secret-key-change-in-production"
     environment: str = "development"
     site_url: str = "https://shadowedvaca.com"
@@ -16,15 +35,47 @@ class Settings(BaseSettings):
     sv_tools_url: str = "https://sv-tools.shadowedvaca.com"
     sv_tools_api_key: str = ""
     sv_tools_callback_key: str = ""  # sv-tools sends this to call back into sv-site
+    sv_tools_cache_seconds: float = 15.0  # reuse ideas/projects responses from sv-tools this long; 0 = off
 
     # JWT settings
     jwt_algorithm: str = "HS256"
-    jwt_expire_minutes: int = 480  # 8 hours
+    jwt_expire_minutes: int = 15  # short-lived; clients renew via POST /api/auth/refresh
+    refresh_token_days: int = 30
+    permissions_cache_seconds: int = 60  # how long another worker may miss a permission change
+
+    # Password hashing — bcrypt cost; calibrate with `python -m sv_site.calibrate_bcrypt`.
+    # Stored hashes at a different cost are rehashed on the user's next login.
+    bcrypt_rounds: int = Field(12, ge=4, le=31)  # bcrypt's own limits
+
+    # Login throttling (see sv_site.rate_limit)
+    login_rate_limit: Literal["memory", "postgres", "off"] = "memory"
+    login_ip_burst: int = 30
+    login_ip_per_minute: float = 20.0
+    login_user_burst: int = 10
+    login_user_per_minute: float = 5.0
+
+    # GET /api/health/deep (see sv_site.health)
+    health_probe_timeout: float = 2.0    # seconds per dependency probe
+    health_cache_seconds: float = 5.0    # reuse a result this long per worker
+    health_pool_saturation: float = 0.9  # fraction of pool capacity in use that fails the check
+
+    # Response compression (see sv_site.compression)
+    compression_min_bytes: int = 1024     # smaller bodies are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5   # 0-11; ~gzip -6 speed, smaller output
 
     # Feedback ingest
     feedback_ingest_key: str = ""    # clients must send this header to POST /api/feedback/ingest
     anthropic_api_key: str = ""      # for AI processing; empty = skip AI gracefully
 
+    # Feedback list totals (see sv_site.feedback_counts)
+    feedback_count_cache_seconds: int = 300  # upper bound; any feedback change invalidates sooner
+    feedback_count_concurrent: bool = False  # count on a second connection alongside the page query
+
+    # AI cost tracking — JSONL in the monitoring api_calls shape; empty = don't write
+    api_calls_log_path: str = ""
+    ai_pricing_path: str = ""     # YAML with a `pricing:` section; empty = monitoring/config/thresholds.yaml
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,42 +1,394 @@
-"""SQLAlchemy async engine and session factory."""
+"""SQLAlchemy async engine and session factory.
 
+Pool sizing, recycling and asyncpg connection options come from Settings
+(DB_POOL_*, DB_STATEMENT_*, DB_APPLICATION_NAME). Every uvicorn worker has
+its own pool, so the most connections one container can hold is
+workers × (db_pool_size + db_max_overflow).
+
+Read-only routes take get_read_db instead of get_db. With DATABASE_READ_URL
+set (a streaming replica) those sessions use a second engine and pool, so
+heavy admin lists and exports don't queue behind writes for primary
+connections; unset, they share the primary. Replicas lag slightly, so after a
+request writes, ReadPinMiddleware sets a short-lived cookie that sends that
+browser's reads to the primary for db_read_pin_seconds — long enough to see
+its own write.
+
+Request sessions are lazy: no connection is checked out until the handler
+first executes something, and the dependency commits only if the session
+has writes that nobody committed yet. Handlers that return before touching
+the database, that only read, or that commit themselves cost no extra
+round trip. Read-only sessions (readonly=True; get_read_db uses one) open
+their transactions READ ONLY, so a stray write fails loudly instead of
+landing on the primary by accident.
+
+Every statement on every engine is timed. The counts and DB time add up per
+request in a QueryStats held in a context variable (see
+sv_site.request_timing), and statements slower than SLOW_QUERY_MS are logged
+to "sv_site.slow_query" with the shapes, never the values, of their
+parameters.
+"""
+
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass
 
+from fastapi import Request
+from sqlalchemy import Engine, event, text
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from sv_site.config import Settings, get_settings
 
-from sv_site.config import get_settings
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("sv_site.slow_query")
 
 _engine = None
 _session_factory = None
+_read_engine = None
+_read_session_factory = None
+_readonly_factories: dict = {}
+
+READ_PIN_COOKIE = "sv_read_pin"
+
+
+def engine_options(settings: Settings, url: str | None = None) -> dict:
+    """create_async_engine() keyword arguments for these settings.
+
+    `url` is the database the engine will connect to (default: database_url).
+    """
+    options: dict = {
+        "echo": False,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if (url or settings.database_url).startswith("postgresql+asyncpg"):
+        server_settings = {"application_name": settings.db_application_name}
+        if settings.db_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "server_settings": server_settings,
+        }
+    return options
 
 
 def get_engine():
     global _engine
     if _engine is None:
         settings = get_settings()
-        _engine = create_async_engine(settings.database_url, echo=False)
+        _engine = create_async_engine(settings.database_url, **engine_options(settings))
     return _engine
 
 
-def get_session_factory() -> async_sessionmaker[AsyncSession]:
+def _readonly(factory: async_sessionmaker[AsyncSession]) -> async_sessionmaker[AsyncSession]:
+    """Same engine and pool, but every transaction begins READ ONLY.
+
+    asyncpg issues the whole thing as one BEGIN READ ONLY, so this costs no
+    round trip over a plain transaction.
+    """
+    readonly = _readonly_factories.get(factory)
+    if readonly is None:
+        engine = factory.kw["bind"].execution_options(postgresql_readonly=True)
+        readonly = _readonly_factories[factory] = async_sessionmaker(engine, expire_on_commit=False)
+    return readonly
+
+
+def get_session_factory(readonly: bool = False) -> async_sessionmaker[AsyncSession]:
     global _session_factory
     if _session_factory is None:
         engine = get_engine()
         _session_factory = async_sessionmaker(engine, expire_on_commit=False)
-    return _session_factory
+    return _readonly(_session_factory) if readonly else _session_factory
+
+
+def read_replica_configured() -> bool:
+    return bool(get_settings().database_read_url)
+
+
+def get_read_engine():
+    """Engine for the read replica; the primary engine when none is configured."""
+    global _read_engine
+    if not read_replica_configured():
+        return get_engine()
+    if _read_engine is None:
+        settings = get_settings()
+        _read_engine = create_async_engine(
+            settings.database_read_url,
+            **engine_options(settings, settings.database_read_url),
+        )
+    return _read_engine
+
+
+def get_read_session_factory(readonly: bool = False) -> async_sessionmaker[AsyncSession]:
+    global _read_session_factory
+    if not read_replica_configured():
+        return get_session_factory(readonly)
+    if _read_session_factory is None:
+        _read_session_factory = async_sessionmaker(get_read_engine(), expire_on_commit=False)
+    return _readonly(_read_session_factory) if readonly else _read_session_factory
+
 
+async def warm_pool(size: int | None = None, timeout: float = 10.0, engine=None) -> int:
+    """Open `size` pooled connections at once so early requests find them ready.
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """FastAPI dependency: yields a database session per request."""
-    factory = get_session_factory()
-    async with factory() as session:
+    Warms the primary unless another `engine` is given. Returns how many
+    opened. Failures are logged, never raised — the app must still start if
+    the database is briefly unavailable.
+    """
+    engine = engine or get_engine()
+    size = get_settings().db_pool_size if size is None else size
+
+    async def _open():
+        conn = await engine.connect().start()
         try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
+            await conn.execute(text("SELECT 1"))
+        except BaseException:
+            # Includes cancellation on timeout: hand the connection back
+            await asyncio.shield(conn.close())
             raise
+        return conn
+
+    tasks = [asyncio.ensure_future(_open()) for _ in range(size)]
+    done, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+    if pending:
+        logger.warning("DB pool warm-up timed out after %.0fs", timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    opened = 0
+    for task in done:
+        if task.exception() is not None:
+            logger.warning("DB pool warm-up connection failed: %s", task.exception())
+            continue
+        await task.result().close()  # back to the pool, still connected
+        opened += 1
+    logger.info("DB pool warmed: %d/%d connection(s)", opened, size)
+    return opened
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections (app shutdown)."""
+    global _engine, _session_factory, _read_engine, _read_session_factory
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            await engine.dispose()
+    _engine = _read_engine = None
+    _session_factory = _read_session_factory = None
+    _readonly_factories.clear()
+
+
+# ---------------------------------------------------------------------------
+# Query instrumentation
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class QueryStats:
+    """Statements run and time spent in them, for one request."""
+    count: int = 0
+    seconds: float = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    """Begin counting for the current request. Tasks spawned from here on
+    (asyncio.gather, the engine's greenlets) share the same QueryStats."""
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+def param_shape(parameters):
+    """Parameter types without their values: (1, 'x') -> ('int', 'str')."""
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} × {param_shape(parameters[0])}"  # executemany
+        return tuple(type(v).__name__ for v in parameters)
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+    threshold_ms = get_settings().slow_query_ms
+    if threshold_ms and elapsed * 1000 >= threshold_ms:
+        slow_query_logger.warning(
+            "Slow query: %.1fms params=%s sql=%s",
+            elapsed * 1000, param_shape(parameters), " ".join(statement.split()),
+            extra={"duration_ms": round(elapsed * 1000, 1), "statement": statement},
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _on_statement_error(context) -> None:
+    started = context.connection.info.get("query_started") if context.connection else None
+    if started:
+        started.pop()
+
+
+# ---------------------------------------------------------------------------
+# Write tracking — session.info["wrote"] is set on a session's first write;
+# session.info["uncommitted"] while writes are waiting for a commit
+# ---------------------------------------------------------------------------
+
+_READ_PREFIXES = ("SELECT", "WITH", "EXPLAIN", "SHOW")
+
+
+def _is_write(state) -> bool:
+    if state.is_insert or state.is_update or state.is_delete:
+        return True
+    # Raw SQL (rollup upserts and the like) only says what it does in its text
+    if isinstance(state.statement, TextClause):
+        return not state.statement.text.lstrip().upper().startswith(_READ_PREFIXES)
+    return False
+
+
+def _mark_written(session: Session) -> None:
+    session.info["uncommitted"] = True
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state) -> None:
+    if _is_write(state):
+        _mark_written(state.session)
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, _flush_context) -> None:
+    _mark_written(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _on_transaction_end(session: Session) -> None:
+    session.info.pop("uncommitted", None)
+
+
+def needs_commit(session: AsyncSession) -> bool:
+    """True if the session holds writes, flushed or not, that aren't committed."""
+    return bool(
+        session.info.get("uncommitted") or session.new or session.dirty or session.deleted
+    )
+
+
+# ---------------------------------------------------------------------------
+# FastAPI dependencies
+# ---------------------------------------------------------------------------
+
+
+_WRITE_SESSIONS = "db_write_sessions"  # request.state attribute
+
+
+def request_wrote(state: dict) -> bool:
+    """True if a read-write session of this request wrote, or holds writes
+    the dependency's exit-time commit is still going to flush."""
+    return any(
+        s.info.get("wrote") or needs_commit(s) for s in state.get(_WRITE_SESSIONS, ())
+    )
+
+
+class ReadPinMiddleware:
+    """Adds READ_PIN_COOKIE to the response of any request that wrote.
+
+    The check runs as the response starts, which covers handlers that
+    return their own Response and writes that only reach the database in
+    the commit after the handler returns — neither can set a cookie
+    through an injected Response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})  # request.state reads and writes this dict
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and request_wrote(state):
+                pin_seconds = get_settings().db_read_pin_seconds
+                if pin_seconds and read_replica_configured():
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{READ_PIN_COOKIE}=1; HttpOnly; Max-Age={pin_seconds}; "
+                        "Path=/api; SameSite=lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+def session_dependency(*, readonly: bool = False, replica: bool = False):
+    """Build a FastAPI dependency yielding one lazy session per request.
+
+    readonly  transactions begin READ ONLY and the session is never committed
+    replica   read from the replica engine unless this client is pinned to
+              the primary by a recent write (see READ_PIN_COOKIE)
+    """
+
+    async def dependency(request: Request) -> AsyncGenerator[AsyncSession, None]:
+        if replica and not request.cookies.get(READ_PIN_COOKIE):
+            factory = get_read_session_factory(readonly)
+        else:
+            factory = get_session_factory(readonly)
+        async with factory() as session:
+            if not readonly:
+                # ReadPinMiddleware checks these when the response starts
+                sessions = getattr(request.state, _WRITE_SESSIONS, None)
+                if sessions is None:
+                    sessions = []
+                    setattr(request.state, _WRITE_SESSIONS, sessions)
+                sessions.append(session)
+            try:
+                yield session
+                if not readonly and needs_commit(session):
+                    await session.commit()
+            except Exception:
+                if session.in_transaction():
+                    await session.rollback()
+                raise
+            # Anything else (reads, nothing at all) ends when the session
+            # closes and hands its connection back to the pool
+
+    return dependency
+
+
+# Read-write session on the primary
+get_db = session_dependency()
+
+# Read-only routes: replica when configured and not pinned, else primary
+get_read_db = session_dependency(readonly=True, replica=True)
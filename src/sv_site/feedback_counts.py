@@ -0,0 +1,101 @@
+"""
+Total-count strategies for GET /api/hub/feedback.
+
+A count(*) over the filtered query is the dominant cost of a feedback page on
+a large table, so the caller picks how much accuracy it needs:
+
+- cached   (default) exact count per filter combination, reused until
+           shadowedvaca.feedback_version moves (or FEEDBACK_COUNT_CACHE_SECONDS
+           pass). The counter changes in the same transaction as any write to
+           customer_feedback, so every worker recounts once a change is visible
+- exact    always run count(*)
+- estimate planner row estimate from EXPLAIN — constant time, approximate
+- none     skip the count entirely; total is null
+"""
+import json
+from typing import Literal, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable, Select
+
+from sv_site.cache import TTLCache
+from sv_site.config import get_settings
+from sv_site.models import FeedbackVersion
+
+CountStrategy = Literal["cached", "exact", "estimate", "none"]
+
+_count_cache = TTLCache("feedback_counts", maxsize=256)
+
+# Ingest calls bump_feedback_version(); a statement trigger bumps it for
+# updates and deletes (scripts/migrations/add_feedback_version.sql)
+_VERSION_Q = select(FeedbackVersion.version)
+
+_BUMP_SQL = text("""
+    INSERT INTO shadowedvaca.feedback_version AS v (id, version) VALUES (TRUE, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1
+""")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <select> — the planner estimate without running the query."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+async def table_version(db: AsyncSession) -> int:
+    """Changes whenever customer_feedback does, in any process."""
+    return (await db.execute(_VERSION_Q)).scalar() or 0
+
+
+async def bump_feedback_version(db: AsyncSession) -> None:
+    """Call in the ingest transaction, as late as possible: the row stays
+    locked until commit, so every ingest waits on it that long."""
+    await db.execute(_BUMP_SQL)
+
+
+async def exact_count(db: AsyncSession, q: Select) -> int:
+    return (await db.execute(select(func.count()).select_from(q.subquery()))).scalar_one()
+
+
+async def estimated_count(db: AsyncSession, q: Select) -> int:
+    plan = (await db.execute(_Explain(q))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_feedback(
+    db: AsyncSession,
+    q: Select,
+    filter_key: tuple,
+    strategy: CountStrategy = "cached",
+) -> tuple[Optional[int], bool]:
+    """Return (total, is_estimate) for the filtered query q using the given strategy."""
+    if strategy == "none":
+        return None, False
+    if strategy == "estimate":
+        return await estimated_count(db, q), True
+    if strategy == "cached":
+        # Read the version before counting: a write in between then shows up
+        # as a new version on the next request instead of being missed
+        version = await table_version(db)
+        cached = _count_cache.get(filter_key)
+        if cached is not None and cached[0] == version:
+            return cached[1], False
+
+    total = await exact_count(db, q)
+    if strategy == "cached":
+        _count_cache.set(
+            filter_key, (version, total), ttl=get_settings().feedback_count_cache_seconds
+        )
+    return total, False
@@ -7,6 +7,8 @@ import json
 import logging
 from typing import Optional
 
+from sv_site.api_usage import record_api_call
+
 logger = logging.getLogger(__name__)
 
 _VALID_TAGS = {
@@ -16,6 +18,13 @@ _VALID_TAGS = {
 }
 _VALID_SENTIMENTS = {"positive", "neutral", "negative", "mixed"}
 
+# Bump whenever _SYSTEM_PROMPT or the output parsing changes meaningfully.
+# Stored on each enriched row so `python -m sv_site.reprocess_feedback
+# --prompt-version N` can find rows produced by an older prompt.
+PROMPT_VERSION = 1
+
+_MODEL = "claude-haiku-4-5-20251001"
+
 _SYSTEM_PROMPT = """\
 You are a feedback analyst. Given raw user feedback about a software product, extract
 structured information and return ONLY a valid JSON object — no markdown, no code fences.
@@ -39,7 +48,7 @@ async def process_feedback(
     api_key: str,
 ) -> dict:
     """
-    Returns dict with keys: summary, sentiment, tags, error.
+    Returns dict with keys: summary, sentiment, tags, prompt_version, error.
     All content fields may be None if processing fails.
     """
     if not api_key:
@@ -57,12 +66,20 @@ async def process_feedback(
 
         client = anthropic.AsyncAnthropic(api_key=api_key)
         message = await client.messages.create(
-            model="claude-haiku-4-5-20251001",
+            model=_MODEL,
             max_tokens=512,
             system=_SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_content}],
         )
 
+        record_api_call(
+            service="anthropic",
+            model=_MODEL,
+            operation="feedback_enrichment",
+            usage=getattr(message, "usage", None),
+            metadata={"program_name": program_name, "prompt_version": PROMPT_VERSION},
+        )
+
         raw_text = message.content[0].text.strip() if message.content else ""
         logger.info("AI raw response: %r (stop_reason=%s)", raw_text[:200], message.stop_reason)
         # Strip markdown code fences if present
@@ -76,7 +93,8 @@ async def process_feedback(
         raw_tags = parsed.get("tags") or []
         tags = [t for t in raw_tags if t in _VALID_TAGS]
 
-        return {"summary": summary, "sentiment": sentiment, "tags": tags, "error": None}
+        return {"summary": summary, "sentiment": sentiment, "tags": tags,
+                "prompt_version": PROMPT_VERSION, "error": None}
 
     except ImportError:
         logger.error("anthropic package not installed")
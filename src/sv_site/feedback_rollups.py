@@ -0,0 +1,228 @@
+"""
+Pre-aggregated customer feedback stats.
+
+shadowedvaca.feedback_daily_stats keeps one row per (program_name, UTC day):
+feedback count, score sum/count, and sentiment/tag frequency maps. It is
+maintained incrementally — ingest adds the new row in the same transaction,
+re-enrichment applies sentiment/tag deltas — so GET /api/hub/feedback/stats
+reads a few hundred small rows regardless of how big customer_feedback gets.
+
+shadowedvaca.feedback_programs is the matching per-program registry
+(first_seen, last_seen, feedback_count) behind the Hub's program dropdown,
+bumped by the same ingest call.
+
+If the rollup ever drifts (manual edits, failed deploys), rebuild it:
+    python -m sv_site.feedback_rollups rebuild
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sv_site.database import get_session_factory
+
+logger = logging.getLogger(__name__)
+
+# jsonb_counts_merge() sums two {key: n} maps and drops zeroed keys
+# (created by scripts/migrations/add_feedback_daily_stats.sql).
+_UPSERT_SQL = text("""
+    INSERT INTO shadowedvaca.feedback_daily_stats AS s
+        (program_name, day, feedback_count, score_sum, score_count,
+         sentiment_counts, tag_counts, updated_at)
+    VALUES (
+        :program_name,
+        COALESCE(CAST(:day AS DATE), (now() AT TIME ZONE 'UTC')::date),
+        :feedback_count, :score_sum, :score_count,
+        shadowedvaca.jsonb_counts_merge('{}', CAST(:sentiments AS JSONB)),
+        shadowedvaca.jsonb_counts_merge('{}', CAST(:tags AS JSONB)),
+        now()
+    )
+    ON CONFLICT (program_name, day) DO UPDATE SET
+        feedback_count   = s.feedback_count + EXCLUDED.feedback_count,
+        score_sum        = s.score_sum + EXCLUDED.score_sum,
+        score_count      = s.score_count + EXCLUDED.score_count,
+        sentiment_counts = shadowedvaca.jsonb_counts_merge(s.sentiment_counts, EXCLUDED.sentiment_counts),
+        tag_counts       = shadowedvaca.jsonb_counts_merge(s.tag_counts, EXCLUDED.tag_counts),
+        updated_at       = now()
+""")
+
+_PROGRAM_UPSERT_SQL = text("""
+    INSERT INTO shadowedvaca.feedback_programs AS p
+        (program_name, first_seen, last_seen, feedback_count)
+    VALUES (:program_name, now(), now(), 1)
+    ON CONFLICT (program_name) DO UPDATE SET
+        last_seen      = EXCLUDED.last_seen,
+        feedback_count = p.feedback_count + 1
+""")
+
+_REBUILD_PROGRAMS_SQL = text("""
+    INSERT INTO shadowedvaca.feedback_programs (program_name, first_seen, last_seen, feedback_count)
+    SELECT program_name, min(received_at), max(received_at), count(*)
+    FROM shadowedvaca.customer_feedback
+    GROUP BY program_name
+""")
+
+_REBUILD_SQL = text("""
+    INSERT INTO shadowedvaca.feedback_daily_stats
+        (program_name, day, feedback_count, score_sum, score_count, sentiment_counts, tag_counts)
+    SELECT b.program_name, b.day, b.n, b.score_sum, b.score_count,
+           COALESCE(s.counts, '{}'), COALESCE(t.counts, '{}')
+    FROM (
+        SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day,
+               count(*) AS n, COALESCE(sum(score), 0) AS score_sum, count(score) AS score_count
+        FROM shadowedvaca.customer_feedback
+        GROUP BY 1, 2
+    ) b
+    LEFT JOIN (
+        SELECT program_name, day, jsonb_object_agg(sentiment, n) AS counts
+        FROM (
+            SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day, sentiment, count(*) AS n
+            FROM shadowedvaca.customer_feedback
+            WHERE sentiment IS NOT NULL
+            GROUP BY 1, 2, 3
+        ) x
+        GROUP BY 1, 2
+    ) s USING (program_name, day)
+    LEFT JOIN (
+        SELECT program_name, day, jsonb_object_agg(tag, n) AS counts
+        FROM (
+            SELECT program_name, (received_at AT TIME ZONE 'UTC')::date AS day, tag, count(*) AS n
+            FROM shadowedvaca.customer_feedback,
+                 jsonb_array_elements_text(COALESCE(tags, '[]')) AS tag
+            GROUP BY 1, 2, 3
+        ) x
+        GROUP BY 1, 2
+    ) t USING (program_name, day)
+""")
+
+
+def _utc_day(ts: Optional[datetime]) -> Optional[date]:
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).date()
+
+
+async def _upsert(
+    db: AsyncSession,
+    program_name: str,
+    day: Optional[date],
+    *,
+    feedback_count: int = 0,
+    score: Optional[int] = None,
+    sentiments: Optional[dict] = None,
+    tags: Optional[dict] = None,
+) -> None:
+    await db.execute(_UPSERT_SQL, {
+        "program_name": program_name,
+        "day": day,
+        "feedback_count": feedback_count,
+        "score_sum": score or 0,
+        "score_count": 1 if score is not None else 0,
+        "sentiments": json.dumps(sentiments or {}),
+        "tags": json.dumps(tags or {}),
+    })
+
+
+async def record_ingest(
+    db: AsyncSession,
+    program_name: str,
+    score: Optional[int],
+    sentiment: Optional[str],
+    tags: Optional[list],
+) -> None:
+    """Count a freshly ingested row (and its enrichment, if any) in the daily
+    rollup and the program registry.
+
+    Call in the ingest transaction: the day comes from now(), which Postgres pins
+    to the transaction start — the same value received_at defaults to.
+    """
+    await db.execute(_PROGRAM_UPSERT_SQL, {"program_name": program_name})
+    await _upsert(
+        db, program_name, None,
+        feedback_count=1,
+        score=score,
+        sentiments={sentiment: 1} if sentiment else None,
+        tags=dict(Counter(tags or [])),
+    )
+
+
+def enrichment_deltas(before: Iterable, updates: Iterable[dict]) -> dict:
+    """Fold old → new sentiment/tags changes into {(program, day): (sentiments, tags)}.
+
+    `before` rows need id, program_name, received_at, sentiment, tags;
+    `updates` are the UPDATE param dicts keyed by id; ones without a
+    sentiment key don't change enrichment and are skipped.
+    """
+    new_by_id = {u["id"]: u for u in updates}
+    deltas: dict = defaultdict(lambda: (Counter(), Counter()))
+    for row in before:
+        new = new_by_id.get(row.id)
+        if new is None or "sentiment" not in new:  # failed re-runs keep their old values
+            continue
+        sentiments, tag_counts = deltas[(row.program_name, _utc_day(row.received_at))]
+        if row.sentiment:
+            sentiments[row.sentiment] -= 1
+        if new.get("sentiment"):
+            sentiments[new["sentiment"]] += 1
+        for t in row.tags or []:
+            tag_counts[t] -= 1
+        for t in new.get("tags") or []:
+            tag_counts[t] += 1
+    return deltas
+
+
+async def apply_enrichment_deltas(db: AsyncSession, deltas: dict) -> None:
+    """Write enrichment_deltas() output — one statement per touched (program, day)."""
+    for (program_name, day), (sentiments, tag_counts) in deltas.items():
+        sentiments = {k: v for k, v in sentiments.items() if v}
+        tag_counts = {k: v for k, v in tag_counts.items() if v}
+        if sentiments or tag_counts:
+            await _upsert(db, program_name, day, sentiments=sentiments, tags=tag_counts)
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """Recompute the rollup and program registry from customer_feedback.
+    Returns daily rows written."""
+    # Block concurrent ingest upserts so none land between the DELETE and INSERT
+    await db.execute(text(
+        "LOCK TABLE shadowedvaca.feedback_programs, shadowedvaca.feedback_daily_stats "
+        "IN EXCLUSIVE MODE"
+    ))
+    await db.execute(text("DELETE FROM shadowedvaca.feedback_programs"))
+    await db.execute(_REBUILD_PROGRAMS_SQL)
+    await db.execute(text("DELETE FROM shadowedvaca.feedback_daily_stats"))
+    result = await db.execute(_REBUILD_SQL)
+    await db.commit()
+    return result.rowcount
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Maintain the feedback_daily_stats rollup and feedback_programs registry"
+    )
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO,
+                        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    async def _run() -> int:
+        async with get_session_factory()() as db:
+            return await rebuild(db)
+
+    written = asyncio.run(_run())
+    print(f"feedback_daily_stats rebuilt: {written} (program, day) row(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Dependency probes behind GET /api/health/deep.
+
+/api/health only proves the process is up. The deep check runs, at the
+same time and each under HEALTH_PROBE_TIMEOUT seconds:
+
+- database          SELECT 1 on a pooled primary connection — slow here
+                    also means the pool had nothing free
+- database_replica  the same on the read replica, when one is configured
+- sv_tools          can we reach sv-tools at all (any non-5xx answer)
+- db_pool           how much of the primary pool is checked out; fails
+                    at HEALTH_POOL_SATURATION or above
+
+The result is cached per worker for HEALTH_CACHE_SECONDS, and callers that
+arrive while a probe is running wait for it rather than starting their
+own, so aggressive polling costs at most one round of probes per worker
+per window. The cached result is encoded (and compressed) once, so a cache
+hit sends stored bytes.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import text
+from starlette.responses import Response
+
+from sv_site.cache import TTLCache
+from sv_site.config import get_settings
+from sv_site.database import get_engine, get_read_engine, read_replica_configured
+from sv_site.metrics import upstream_transport
+from sv_site.responses import CachedBody, CachedJSONResponse, JSONBytesResponse, json_bytes
+
+_result_cache = TTLCache("health_deep", maxsize=1)
+_lock = asyncio.Lock()
+
+
+async def _timed(probe, timeout: float) -> dict:
+    """Run probe() under a timeout; add ok/latency_ms, catch every failure."""
+    started = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(probe(), timeout)
+        result = {"ok": True, **(detail or {})}
+    except asyncio.TimeoutError:
+        result = {"ok": False, "error": f"timed out after {timeout:g}s"}
+    except Exception as exc:
+        # Class name only — messages can carry hostnames and credentials
+        result = {"ok": False, "error": type(exc).__name__}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _select_one(engine):
+    async def probe() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    return probe
+
+
+def _sv_tools(transport: httpx.AsyncBaseTransport | None = None):
+    async def probe() -> dict:
+        url = get_settings().sv_tools_url.rstrip("/") + "/"
+        async with httpx.AsyncClient(transport=upstream_transport("sv-tools", transport)) as client:
+            resp = await client.get(url)
+        if resp.status_code >= 500:
+            raise httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request, response=resp)
+        return {"status": resp.status_code}
+    return probe
+
+
+def pool_status(engine) -> dict:
+    """Checked-out connections against the most the pool will open."""
+    settings = get_settings()
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"ok": True, "pooled": False}
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    checked_out = pool.checkedout()
+    saturation = checked_out / capacity if capacity else 0.0
+    return {
+        "ok": saturation < settings.health_pool_saturation,
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+async def run_probes(sv_tools_transport: httpx.AsyncBaseTransport | None = None) -> dict:
+    settings = get_settings()
+    timeout = settings.health_probe_timeout
+    probes = {
+        "database": _select_one(get_engine()),
+        "sv_tools": _sv_tools(sv_tools_transport),
+    }
+    if read_replica_configured():
+        probes["database_replica"] = _select_one(get_read_engine())
+
+    # Sample the pool before the database probe takes a connection of its own
+    pool = pool_status(get_engine())
+    results = await asyncio.gather(*(_timed(p, timeout) for p in probes.values()))
+    checks = dict(zip(probes, results))
+    checks["db_pool"] = pool
+    return {
+        "ok": all(c["ok"] for c in checks.values()),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "checks": checks,
+    }
+
+
+async def _cached_probes(sv_tools_transport) -> tuple[tuple[dict, CachedBody], bool]:
+    """((result, encoded cache-hit body), served_from_cache)."""
+    entry = _result_cache.get("result")
+    if entry is not None:
+        return entry, True
+    async with _lock:
+        entry = _result_cache.get("result")
+        if entry is not None:
+            return entry, True
+        result = await run_probes(sv_tools_transport)
+        entry = (result, CachedBody.of({**result, "cached": True}))
+        _result_cache.set("result", entry, ttl=get_settings().health_cache_seconds)
+    return entry, False
+
+
+async def deep_health(sv_tools_transport: httpx.AsyncBaseTransport | None = None) -> dict:
+    """run_probes(), served from cache for health_cache_seconds."""
+    (result, _body), cached = await _cached_probes(sv_tools_transport)
+    return {**result, "cached": cached}
+
+
+async def deep_health_response(sv_tools_transport: httpx.AsyncBaseTransport | None = None) -> Response:
+    """deep_health() as a 200/503 response; cache hits reuse the stored body."""
+    (result, body), cached = await _cached_probes(sv_tools_transport)
+    status_code = 200 if result["ok"] else 503
+    if cached:
+        return CachedJSONResponse(body, status_code=status_code)
+    return JSONBytesResponse(json_bytes({**result, "cached": False}), status_code=status_code)
@@ -1,9 +1,29 @@
 """FastAPI application entry point for Shadowedvaca Site API."""
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from sv_site.compression import CompressionMiddleware
 from sv_site.config import get_settings
+from sv_site.database import (
+    ReadPinMiddleware,
+    dispose_engine,
+    get_engine,
+    get_read_engine,
+    read_replica_configured,
+    warm_pool,
+)
+from sv_site.health import deep_health_response
+from sv_site.metrics import (
+    CONTENT_TYPE_LATEST,
+    MetricsMiddleware,
+    forget_dead_workers,
+    instrument_engine,
+    render_metrics,
+)
+from sv_site.request_timing import RequestTimingMiddleware
 from sv_site.routes.admin import router as admin_router
 from sv_site.routes.auth import router as auth_router
 from sv_site.routes.feedback_ingest import router as feedback_ingest_router
@@ -16,7 +36,23 @@ from sv_site.routes.projects import router as projects_router
 
 _settings = get_settings()
 
-app = FastAPI(title="Shadowedvaca Site API", docs_url=None, redoc_url=None)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    forget_dead_workers()
+    instrument_engine(get_engine(), "primary")
+    if read_replica_configured():
+        instrument_engine(get_read_engine(), "replica")
+    # Each worker runs this; fill its pool before the first request arrives
+    if _settings.db_pool_warm:
+        await warm_pool()
+        if read_replica_configured():
+            await warm_pool(engine=get_read_engine())
+    yield
+    await dispose_engine()
+
+
+app = FastAPI(title="Shadowedvaca Site API", docs_url=None, redoc_url=None, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +61,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadPinMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Added last so it wraps everything: Server-Timing and the request log
+app.add_middleware(RequestTimingMiddleware)
 
 app.include_router(auth_router, prefix="/api")
 app.include_router(admin_router, prefix="/api")
@@ -38,5 +79,17 @@ app.include_router(projects_router, prefix="/api")
 
 
 @app.get("/api/health")
-async def health():
+async def health() -> dict:
     return {"ok": True}
+
+
+@app.get("/api/health/deep")
+async def health_deep() -> Response:
+    """Probe the database, sv-tools and pool headroom; 503 if any fails."""
+    return await deep_health_response()
+
+
+@app.get("/api/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape target (see sv_site.metrics); nginx keeps it internal."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,238 @@
+"""
+Prometheus metrics, served in text format at GET /api/metrics.
+
+What's recorded:
+
+- sv_http_requests_total / sv_http_request_duration_seconds — per method and
+  route template (/api/hub/feedback/{feedback_id}, not the raw path), by
+  MetricsMiddleware
+- sv_http_requests_in_progress
+- sv_db_connections_open / sv_db_connections_checked_out — per engine
+  (primary, replica), from SQLAlchemy pool events
+- sv_upstream_request_duration_seconds / sv_upstream_errors_total — calls
+  to sv-tools made through upstream_transport()
+- sv_cache_lookups_total — TTLCache hits and misses, copied from the cache
+  counters after requests and at scrape time
+
+The app runs 2 uvicorn workers, each with its own memory. With
+PROMETHEUS_MULTIPROC_DIR set (the Dockerfile and systemd unit do) every
+worker writes its samples to files there and a scrape — whichever worker
+answers it — adds them all up. The directory must be emptied before the
+workers start; the start commands do that. Without the variable (local
+runs, tests) metrics are per process.
+
+/api/metrics is for the local Prometheus only: nginx refuses it, so scrape
+the app port directly.
+"""
+import glob
+import os
+import time
+
+import httpx
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from sv_site.cache import all_caches
+from sv_site.request_timing import route_template
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUESTS = Counter(
+    "sv_http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "sv_http_request_duration_seconds", "Time to handle an HTTP request", ["method", "route"]
+)
+IN_PROGRESS = Gauge(
+    "sv_http_requests_in_progress", "HTTP requests being handled", multiprocess_mode="livesum"
+)
+DB_OPEN = Gauge(
+    "sv_db_connections_open", "Database connections held by the pool",
+    ["engine"], multiprocess_mode="livesum",
+)
+DB_CHECKED_OUT = Gauge(
+    "sv_db_connections_checked_out", "Pooled database connections in use",
+    ["engine"], multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "sv_upstream_request_duration_seconds", "Time until an upstream service responds",
+    ["upstream", "outcome"],
+)
+UPSTREAM_ERRORS = Counter(
+    "sv_upstream_errors_total", "Failed upstream calls: transport errors and 5xx",
+    ["upstream", "kind"],
+)
+CACHE_LOOKUPS = Counter(
+    "sv_cache_lookups_total", "In-process cache lookups", ["cache", "result"]
+)
+
+
+# ---------------------------------------------------------------------------
+# HTTP requests
+# ---------------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_capturing_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_capturing_status)
+        finally:
+            IN_PROGRESS.dec()
+            # Unmatched paths share one label so scanners can't blow up cardinality
+            route = route_template(scope) or "unmatched"
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            REQUEST_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+            sync_cache_metrics(min_interval=1.0)
+
+
+# ---------------------------------------------------------------------------
+# Database pools
+# ---------------------------------------------------------------------------
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Track open and checked-out connections of an engine's pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    open_conns = DB_OPEN.labels(name)
+    checked_out = DB_CHECKED_OUT.labels(name)
+
+    event.listen(pool, "connect", lambda *_: open_conns.inc())
+    event.listen(pool, "close", lambda *_: open_conns.dec())
+    event.listen(pool, "close_detached", lambda *_: open_conns.dec())
+    event.listen(pool, "checkout", lambda *_: checked_out.inc())
+    event.listen(pool, "checkin", lambda *_: checked_out.dec())
+
+
+# ---------------------------------------------------------------------------
+# Upstream services
+# ---------------------------------------------------------------------------
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, upstream: str, inner: httpx.AsyncBaseTransport | None = None):
+        self.upstream = upstream
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.TransportError as exc:
+            UPSTREAM_LATENCY.labels(self.upstream, "error").observe(time.perf_counter() - started)
+            UPSTREAM_ERRORS.labels(self.upstream, type(exc).__name__).inc()
+            raise
+        # Headers are in; body streaming isn't counted
+        UPSTREAM_LATENCY.labels(self.upstream, f"{response.status_code // 100}xx").observe(
+            time.perf_counter() - started
+        )
+        if response.status_code >= 500:
+            UPSTREAM_ERRORS.labels(self.upstream, "http_5xx").inc()
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def upstream_transport(
+    upstream: str, inner: httpx.AsyncBaseTransport | None = None
+) -> httpx.AsyncBaseTransport:
+    """httpx transport that records latency and errors for calls to `upstream`."""
+    return _InstrumentedTransport(upstream, inner)
+
+
+# ---------------------------------------------------------------------------
+# Caches
+# ---------------------------------------------------------------------------
+
+_cache_seen: dict[str, tuple[int, int]] = {}
+_cache_synced_at = 0.0
+
+
+def sync_cache_metrics(min_interval: float = 0.0) -> None:
+    """Add TTLCache hits/misses since the last sync to sv_cache_lookups_total."""
+    global _cache_synced_at
+    now = time.monotonic()
+    if now - _cache_synced_at < min_interval:
+        return
+    _cache_synced_at = now
+    for name, cache in all_caches().items():
+        hits, misses = cache.hits, cache.misses
+        seen_hits, seen_misses = _cache_seen.get(name, (0, 0))
+        # A cache rebuilt under the same name starts counting from zero again
+        if hits < seen_hits or misses < seen_misses:
+            seen_hits = seen_misses = 0
+        if hits > seen_hits:
+            CACHE_LOOKUPS.labels(name, "hit").inc(hits - seen_hits)
+        if misses > seen_misses:
+            CACHE_LOOKUPS.labels(name, "miss").inc(misses - seen_misses)
+        _cache_seen[name] = (hits, misses)
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+
+def _multiproc_dir() -> str | None:
+    return os.environ.get(MULTIPROC_DIR_ENV) or None
+
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition — every worker's samples in multiprocess mode."""
+    sync_cache_metrics()
+    path = _multiproc_dir()
+    if path is None:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def forget_dead_workers() -> None:
+    """Drop live-gauge files left by workers that exited (uvicorn restarts a
+    crashed worker under a new pid), so in-progress and pool gauges don't
+    keep counting them. Counters and histograms keep their totals."""
+    path = _multiproc_dir()
+    if path is None:
+        return
+    for file in glob.glob(os.path.join(path, "gauge_live*_*.db")):
+        pid = os.path.basename(file).rsplit("_", 1)[1].removesuffix(".db")
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            multiprocess.mark_process_dead(int(pid), path)
@@ -1,13 +1,15 @@
 """SQLAlchemy ORM models for sv_site.
 
-shadowedvaca schema: users, invite_codes, user_permissions
+shadowedvaca schema: users, invite_codes, user_permissions, refresh_tokens,
+customer_feedback, feedback_daily_stats, feedback_programs, idea_votes,
+idea_favorites, idea_access_overrides
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, CheckConstraint, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, Computed, Date, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -33,6 +35,8 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    # Bumped whenever the user's access changes; JWTs carry the version they were issued at
+    permissions_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
 
     invite_codes_created: Mapped[list["InviteCode"]] = relationship(
         back_populates="created_by", foreign_keys="InviteCode.created_by_user_id"
@@ -82,6 +86,29 @@ class UserPermission(Base):
     user: Mapped[User] = relationship(back_populates="permissions")
 
 
+# ---------------------------------------------------------------------------
+# shadowedvaca.refresh_tokens
+# ---------------------------------------------------------------------------
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    __table_args__ = {"schema": "shadowedvaca"}
+
+    id:         Mapped[int]      = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id:    Mapped[int]      = mapped_column(
+        Integer, ForeignKey("shadowedvaca.users.id", ondelete="CASCADE"), nullable=False
+    )
+    token_hash: Mapped[str]      = mapped_column(String(64), nullable=False, unique=True)  # sha256 hex
+    family_id:  Mapped[str]      = mapped_column(String(32), nullable=False)  # one login's rotation chain
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    used_at:    Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True))
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True))
+
+
 # ---------------------------------------------------------------------------
 # shadowedvaca.customer_feedback
 # ---------------------------------------------------------------------------
@@ -109,6 +136,73 @@ class CustomerFeedback(Base):
     tags:                  Mapped[Optional[dict]]  = mapped_column(JSONB)
     processed_at:          Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True))
     processing_error:      Mapped[Optional[str]]   = mapped_column(Text)
+    prompt_version:        Mapped[Optional[int]]   = mapped_column(Integer)
+    # Generated by Postgres (scripts/migrations/add_feedback_search.sql); never loaded by default
+    search_vector:         Mapped[Optional[str]]   = mapped_column(
+                               TSVECTOR,
+                               Computed(
+                                   "setweight(to_tsvector('english', coalesce(summary, '')), 'A') || "
+                                   "setweight(to_tsvector('english', raw_feedback), 'B')",
+                                   persisted=True,
+                               ),
+                               deferred=True,
+                           )
+
+
+# ---------------------------------------------------------------------------
+# shadowedvaca.feedback_daily_stats  (rollup — see sv_site.feedback_rollups)
+# ---------------------------------------------------------------------------
+
+
+class FeedbackDailyStat(Base):
+    __tablename__ = "feedback_daily_stats"
+    __table_args__ = {"schema": "shadowedvaca"}
+
+    program_name:     Mapped[str]      = mapped_column(String(80), primary_key=True)
+    day:              Mapped[date]     = mapped_column(Date, primary_key=True)
+    feedback_count:   Mapped[int]      = mapped_column(Integer, nullable=False, server_default="0")
+    score_sum:        Mapped[int]      = mapped_column(BigInteger, nullable=False, server_default="0")
+    score_count:      Mapped[int]      = mapped_column(Integer, nullable=False, server_default="0")
+    sentiment_counts: Mapped[dict]     = mapped_column(JSONB, nullable=False, server_default="{}")
+    tag_counts:       Mapped[dict]     = mapped_column(JSONB, nullable=False, server_default="{}")
+    updated_at:       Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
+    )
+
+
+# ---------------------------------------------------------------------------
+# shadowedvaca.feedback_programs
+# ---------------------------------------------------------------------------
+
+
+class FeedbackProgram(Base):
+    __tablename__ = "feedback_programs"
+    __table_args__ = {"schema": "shadowedvaca"}
+
+    program_name:   Mapped[str]      = mapped_column(String(80), primary_key=True)
+    first_seen:     Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_seen:      Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    feedback_count: Mapped[int]      = mapped_column(Integer, nullable=False, server_default="0")
+
+
+# ---------------------------------------------------------------------------
+# shadowedvaca.feedback_version  (change counter — see sv_site.feedback_counts)
+# ---------------------------------------------------------------------------
+
+
+class FeedbackVersion(Base):
+    __tablename__ = "feedback_version"
+    __table_args__ = (
+        CheckConstraint("id", name="ck_fv_single_row"),
+        {"schema": "shadowedvaca"},
+    )
+
+    id:      Mapped[bool] = mapped_column(Boolean, primary_key=True, default=True)
+    version: Mapped[int]  = mapped_column(BigInteger, nullable=False, server_default="0")
 
 
 # ---------------------------------------------------------------------------
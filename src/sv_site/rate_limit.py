@@ -0,0 +1,145 @@
+"""
+Token-bucket rate limiting for POST /api/auth/login.
+
+Each attempt takes one token from two buckets: one per client IP (X-Real-IP,
+set by nginx) and one per username. Buckets hold `burst` tokens and refill at
+`per_minute`; an empty bucket means 429 with Retry-After. The check runs
+before the user lookup and bcrypt, so a credential-stuffing burst costs
+almost nothing.
+
+LOGIN_RATE_LIMIT picks where bucket state lives:
+
+- memory   (default) a TTLCache per uvicorn worker — no I/O, but each worker
+           counts separately, so the effective limit is burst × workers
+- postgres shadowedvaca.rate_limit_buckets, shared by every worker; one
+           upsert per bucket on its own short transaction
+- off      no limiting
+"""
+import hashlib
+import math
+import random
+import time
+
+from fastapi import HTTPException, Request
+from sqlalchemy import text
+
+from sv_site.cache import TTLCache
+from sv_site.config import Settings
+from sv_site.database import get_session_factory
+
+
+class TokenBucket:
+    """In-memory buckets keyed by string. A bucket idle long enough to refill
+    completely is indistinguishable from a new one, so entries expire then."""
+
+    def __init__(self, name: str, burst: int, per_minute: float, maxsize: int = 10_000):
+        self.burst = burst
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self._state = TTLCache(f"rate_limit:{name}", maxsize=maxsize, ttl=burst / self.rate)
+
+    def take(self, key: str) -> float:
+        """Take a token. Returns 0.0 if allowed, else seconds until one is available."""
+        now = time.time()
+        tokens, updated = self._state.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens < 1.0:
+            self._state.set(key, (tokens, now))
+            return (1.0 - tokens) / self.rate
+        self._state.set(key, (tokens - 1.0, now))
+        return 0.0
+
+
+# Tokens after refilling for the time since the last attempt, capped at burst
+_REFILLED = (
+    "LEAST(CAST(:burst AS FLOAT8), "
+    "b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * CAST(:rate AS FLOAT8))"
+)
+
+# Take a token only if a whole one is available; `allowed` records which branch
+# ran so RETURNING can report it.
+_TAKE_SQL = text(f"""
+    INSERT INTO shadowedvaca.rate_limit_buckets AS b (bucket_key, tokens, allowed, updated_at)
+    VALUES (:key, CAST(:burst AS FLOAT8) - 1, TRUE, clock_timestamp())
+    ON CONFLICT (bucket_key) DO UPDATE SET
+        tokens     = CASE WHEN {_REFILLED} >= 1 THEN {_REFILLED} - 1 ELSE {_REFILLED} END,
+        allowed    = {_REFILLED} >= 1,
+        updated_at = clock_timestamp()
+    RETURNING tokens, allowed
+""")
+
+# Idle buckets are full again — drop them now and then to keep the table small
+_PRUNE_SQL = text("""
+    DELETE FROM shadowedvaca.rate_limit_buckets
+    WHERE updated_at < clock_timestamp() - make_interval(secs => :idle)
+""")
+_PRUNE_PROBABILITY = 0.01
+
+
+_MAX_KEY_LENGTH = 200  # rate_limit_buckets.bucket_key is VARCHAR(200)
+
+
+def _shared_key(name: str, key: str) -> str:
+    """Row key for a bucket; keys too long for the column are hashed."""
+    full = f"{name}:{key}"
+    if len(full) > _MAX_KEY_LENGTH:
+        full = f"{name}:sha256:{hashlib.sha256(key.encode()).hexdigest()}"
+    return full
+
+
+async def take_shared(bucket: TokenBucket, name: str, key: str) -> float:
+    """TokenBucket.take() against the shared Postgres table."""
+    params = {"key": _shared_key(name, key), "burst": float(bucket.burst), "rate": bucket.rate}
+    async with get_session_factory()() as db:
+        tokens, allowed = (await db.execute(_TAKE_SQL, params)).one()
+        if random.random() < _PRUNE_PROBABILITY:
+            await db.execute(_PRUNE_SQL, {"idle": bucket.burst / bucket.rate})
+        await db.commit()
+    return 0.0 if allowed else (1.0 - tokens) / bucket.rate
+
+
+_buckets: dict[str, TokenBucket] = {}
+
+
+def _bucket(name: str, burst: int, per_minute: float) -> TokenBucket:
+    bucket = _buckets.get(name)
+    if bucket is None or (bucket.burst, bucket.per_minute) != (burst, per_minute):
+        bucket = _buckets[name] = TokenBucket(name, burst, per_minute)
+    return bucket
+
+
+def client_ip(request: Request) -> str:
+    """nginx overwrites X-Real-IP with the peer address; fall back for local runs."""
+    ip = request.headers.get("x-real-ip")
+    if ip:
+        return ip.strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def check_login_rate(request: Request, username: str, settings: Settings) -> None:
+    """Raise 429 if this IP or username has no login attempts left."""
+    mode = settings.login_rate_limit
+    if mode == "off":
+        return
+
+    checks = (
+        ("login_ip", client_ip(request),
+         settings.login_ip_burst, settings.login_ip_per_minute),
+        ("login_user", username.lower().strip(),
+         settings.login_user_burst, settings.login_user_per_minute),
+    )
+    retry_after = 0.0
+    for name, key, burst, per_minute in checks:
+        bucket = _bucket(name, burst, per_minute)
+        if mode == "postgres":
+            wait = await take_shared(bucket, name, key)
+        else:
+            wait = bucket.take(key)
+        retry_after = max(retry_after, wait)
+
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts; try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
@@ -0,0 +1,289 @@
+"""
+Bulk re-enrichment of customer feedback.
+
+Usage:
+    python -m sv_site.reprocess_feedback                     # failed + never-processed rows
+    python -m sv_site.reprocess_feedback --prompt-version 2  # everything not yet on prompt v2
+    python -m sv_site.reprocess_feedback --concurrency 8 --rate 4 --batch-size 100
+    python -m sv_site.reprocess_feedback --dry-run           # count candidates only
+
+Candidates are walked in id order using keyset pagination (WHERE id > :last),
+so each batch is an index range scan no matter how far into the table we are.
+Each batch is enriched concurrently (bounded by --concurrency and --rate) and
+written back with a single executemany UPDATE, and the feedback_daily_stats
+rollup is adjusted in the same transaction. The last finished id is written
+to --checkpoint after every batch, along with the --prompt-version and
+--program filters; re-running the same command resumes from there, while a
+run with different filters ignores it and starts over. The checkpoint is
+removed once a run completes.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sv_site.api_usage import flush as flush_api_usage
+from sv_site.config import get_settings
+from sv_site.database import get_session_factory
+from sv_site.feedback_processor import PROMPT_VERSION, process_feedback
+from sv_site.feedback_rollups import apply_enrichment_deltas, enrichment_deltas
+from sv_site.models import CustomerFeedback
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = ".reprocess_feedback.checkpoint"
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all concurrent callers."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def candidate_filter(prompt_version: Optional[int] = None):
+    """WHERE clause selecting rows that need (re-)enrichment."""
+    if prompt_version is not None:
+        # Failed and unprocessed rows have prompt_version NULL, so this covers them too
+        return or_(
+            CustomerFeedback.prompt_version.is_(None),
+            CustomerFeedback.prompt_version < prompt_version,
+        )
+    return or_(
+        CustomerFeedback.processed_at.is_(None),
+        CustomerFeedback.processing_error.is_not(None),
+    )
+
+
+async def fetch_batch(
+    db: AsyncSession,
+    after_id: int,
+    batch_size: int,
+    prompt_version: Optional[int] = None,
+    program_name: Optional[str] = None,
+) -> list:
+    """Next page of candidates with id > after_id — only the columns enrichment
+    and the rollup deltas need."""
+    q = (
+        select(
+            CustomerFeedback.id,
+            CustomerFeedback.program_name,
+            CustomerFeedback.received_at,
+            CustomerFeedback.score,
+            CustomerFeedback.raw_feedback,
+            CustomerFeedback.sentiment,
+            CustomerFeedback.tags,
+        )
+        .where(CustomerFeedback.id > after_id, candidate_filter(prompt_version))
+        .order_by(CustomerFeedback.id)
+        .limit(batch_size)
+    )
+    if program_name:
+        q = q.where(CustomerFeedback.program_name == program_name)
+    return (await db.execute(q)).all()
+
+
+async def enrich_batch(
+    rows: list,
+    api_key: str,
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> list[dict]:
+    """Run AI processing for each row; returns executemany-ready UPDATE params.
+    Failed rows get only id and processing_error."""
+
+    async def _one(row) -> dict:
+        async with semaphore:
+            await limiter.wait()
+            ai = await process_feedback(
+                raw_feedback=row.raw_feedback,
+                score=row.score,
+                program_name=row.program_name,
+                api_key=api_key,
+            )
+        if ai.get("error"):
+            # Leave any earlier enrichment (and processed_at) in place; only
+            # record the error so a default run picks the row up again
+            return {"id": row.id, "processing_error": ai["error"]}
+        return {
+            "id":               row.id,
+            "summary":          ai.get("summary"),
+            "sentiment":        ai.get("sentiment"),
+            "tags":             ai.get("tags"),
+            "processed_at":     datetime.now(timezone.utc),
+            "processing_error": None,
+            "prompt_version":   ai.get("prompt_version"),
+        }
+
+    return list(await asyncio.gather(*(_one(r) for r in rows)))
+
+
+async def write_batch(db: AsyncSession, rows: list, updates: list[dict]) -> None:
+    """Persist a batch with one executemany UPDATE keyed on primary key,
+    plus the matching rollup adjustments."""
+    if not updates:
+        return
+    # Bulk UPDATE issues one executemany per run of identical key sets, so
+    # keep the successes together and the failures together
+    updates = sorted(updates, key=lambda u: "summary" not in u)
+    await db.execute(update(CustomerFeedback), updates)
+    await apply_enrichment_deltas(db, enrichment_deltas(rows, updates))
+    await db.commit()
+
+
+def _read_checkpoint(path: Path, filters: dict) -> int:
+    """last_id from a checkpoint written by a run with the same filters, else 0."""
+    try:
+        saved = json.loads(path.read_text())
+        last_id = int(saved["last_id"])
+    except FileNotFoundError:
+        return 0
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Ignoring unreadable checkpoint %s", path)
+        return 0
+    if saved.get("filters") != filters:
+        # Resuming another selection's position would skip rows this one needs
+        logger.warning("Ignoring checkpoint %s: written for filters %s, this run uses %s",
+                       path, saved.get("filters"), filters)
+        return 0
+    return last_id
+
+
+def _write_checkpoint(path: Path, last_id: int, filters: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "filters": filters}))
+    tmp.replace(path)
+
+
+async def run(
+    *,
+    prompt_version: Optional[int] = None,
+    program_name: Optional[str] = None,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    batch_size: int = 50,
+    limit: Optional[int] = None,
+    checkpoint: Optional[Path] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Reprocess all candidates. Returns {"processed": n, "failed": n, "last_id": id}."""
+    api_key = get_settings().anthropic_api_key
+    if not api_key and not dry_run:
+        raise RuntimeError("ANTHROPIC_API_KEY not configured — nothing to reprocess with")
+
+    factory = get_session_factory()
+    filters = {"prompt_version": prompt_version, "program_name": program_name}
+    last_id = _read_checkpoint(checkpoint, filters) if checkpoint else 0
+    if last_id:
+        logger.info("Resuming after id=%d", last_id)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(rate)
+    stats = {"processed": 0, "failed": 0, "last_id": last_id}
+
+    while limit is None or stats["processed"] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats["processed"])
+        async with factory() as db:
+            rows = await fetch_batch(db, last_id, size, prompt_version, program_name)
+        if not rows:
+            break
+
+        if dry_run:
+            stats["processed"] += len(rows)
+            last_id = rows[-1].id
+            stats["last_id"] = last_id
+            continue
+
+        updates = await enrich_batch(rows, api_key, semaphore, limiter)
+        async with factory() as db:
+            await write_batch(db, rows, updates)
+
+        last_id = rows[-1].id
+        stats["processed"] += len(updates)
+        stats["failed"] += sum(1 for u in updates if u["processing_error"])
+        stats["last_id"] = last_id
+        if checkpoint:
+            _write_checkpoint(checkpoint, last_id, filters)
+        logger.info("Batch done: up to id=%d (%d processed, %d failed)",
+                    last_id, stats["processed"], stats["failed"])
+
+    if checkpoint and not dry_run and (limit is None or stats["processed"] < limit):
+        checkpoint.unlink(missing_ok=True)
+    await flush_api_usage()
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-run AI enrichment on customer feedback")
+    parser.add_argument("--prompt-version", type=int, nargs="?", const=PROMPT_VERSION,
+                        help="Select rows enriched by a prompt older than this version "
+                             f"(flag alone = current, {PROMPT_VERSION})")
+    parser.add_argument("--program", help="Only reprocess this program_name")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Max in-flight AI calls (default 4)")
+    parser.add_argument("--rate", type=float, default=2.0,
+                        help="Max AI calls per second, 0 = unlimited (default 2)")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="Rows per SELECT / UPDATE round trip (default 50)")
+    parser.add_argument("--limit", type=int, help="Stop after this many rows")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help=f"Resume file (default {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore any existing checkpoint and start from the beginning")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Count candidates without calling the AI or writing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%dT%H:%M:%S",
+    )
+
+    checkpoint = Path(args.checkpoint)
+    if args.restart:
+        checkpoint.unlink(missing_ok=True)
+
+    try:
+        stats = asyncio.run(run(
+            prompt_version=args.prompt_version,
+            program_name=args.program,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            batch_size=args.batch_size,
+            limit=args.limit,
+            checkpoint=None if args.dry_run else checkpoint,
+            dry_run=args.dry_run,
+        ))
+    except RuntimeError as exc:
+        logger.error("%s", exc)
+        return 2
+
+    verb = "would reprocess" if args.dry_run else "reprocessed"
+    print(f"{verb} {stats['processed']} row(s), {stats['failed']} failed, last id {stats['last_id']}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Per-request timing: Server-Timing headers and a structured request log.
+
+RequestTimingMiddleware starts a QueryStats (sv_site.database) for each HTTP
+request and, when the response starts, adds
+
+    Server-Timing: db;dur=12.4;desc="3 queries", app;dur=31.0
+
+so the browser's network panel shows how much of a request was SQL. Once
+the body is sent it logs one "sv_site.requests" line with the method, route,
+status, statement count and timings; the same values ride along as `extra`
+fields for a JSON log formatter.
+
+A streaming response (the feedback export) sends its headers before its
+queries run, so its Server-Timing covers only the handler; the log line
+covers the whole stream.
+"""
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from sv_site.database import QueryStats, start_query_stats
+
+logger = logging.getLogger("sv_site.requests")
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    queries = "query" if stats.count == 1 else "queries"
+    return (
+        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} {queries}", '
+        f"app;dur={total_seconds * 1000:.1f}"
+    )
+
+
+def route_template(scope: Scope) -> str | None:
+    """The matched route's template (/api/hub/feedback/{feedback_id}), so
+    requests group by endpoint; None if no route matched. Only set once the
+    router has run."""
+    return getattr(scope.get("route"), "path", None)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_query_stats()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            total_ms = (time.perf_counter() - started) * 1000
+            db_ms = stats.seconds * 1000
+            path = route_template(scope) or scope["path"]
+            logger.info(
+                "%s %s %d queries=%d db_ms=%.1f total_ms=%.1f",
+                scope["method"], path, status, stats.count, db_ms, total_ms,
+                extra={
+                    "method": scope["method"],
+                    "route": path,
+                    "status": status,
+                    "db_queries": stats.count,
+                    "db_ms": round(db_ms, 1),
+                    "total_ms": round(total_ms, 1),
+                },
+            )
@@ -0,0 +1,78 @@
+"""
+JSON response bodies.
+
+FastAPI turns a route's return value into bytes in one of two ways:
+
+- the route declares a return type (`-> dict`) and keeps the default
+  response class: pydantic-core serializes it straight to JSON bytes
+- anything else: jsonable_encoder walks the whole value in Python, then
+  json.dumps encodes it — about 40x slower on a 200-item page
+  (scripts/bench_json_serialization.py)
+
+So every JSON route declares its return type, and the app doesn't set a
+default_response_class: a custom one, even an orjson one, switches the
+pydantic-core path off for every route.
+
+Bodies that are encoded once and served many times — cached results, or
+sv-tools responses passed through unchanged — skip both: keep the bytes and
+return them in a JSONBytesResponse. A cached body goes in a CachedBody,
+which also keeps its gzip/brotli forms (see sv_site.compression), so a hot
+payload is compressed once per worker rather than once per request.
+"""
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from sv_site.compression import compress, request_encoding, set_encoding_headers
+
+
+def json_bytes(content: Any) -> bytes:
+    """Encode with orjson; types it doesn't know (Decimal, models) go through
+    jsonable_encoder first."""
+    return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+
+class JSONBytesResponse(Response):
+    """A body that is already JSON, sent as-is."""
+
+    media_type = "application/json"
+
+
+class CachedBody:
+    """Encoded JSON to keep in a cache, plus its compressed variants, each
+    made the first time a client asks for it."""
+
+    __slots__ = ("raw", "_variants")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._variants: dict[str, bytes] = {}
+
+    @classmethod
+    def of(cls, content: Any) -> "CachedBody":
+        return cls(json_bytes(content))
+
+    def encoded(self, encoding: str) -> bytes:
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.raw, encoding)
+        return variant
+
+
+class CachedJSONResponse(JSONBytesResponse):
+    """Sends a CachedBody in the encoding the request negotiates."""
+
+    def __init__(self, body: CachedBody, status_code: int = 200, headers: dict | None = None):
+        self.cached = body
+        super().__init__(body.raw, status_code=status_code, headers=headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = request_encoding(scope, len(self.cached.raw))
+        if encoding is not None:
+            self.body = self.cached.encoded(encoding)
+            set_encoding_headers(MutableHeaders(raw=self.raw_headers), encoding, len(self.body))
+        await super().__call__(scope, receive, send)
@@ -4,11 +4,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from sv_site.auth import require_auth
+from sv_site.auth import invalidate_permissions_version, require_auth
 from sv_site.database import get_db
 from sv_site.models import User, UserPermission
 from sv_site.tools import GRANTABLE_SLUGS, LOCKED_SLUGS, TOOLS
@@ -92,6 +92,17 @@ async def set_permissions(
     )
     for slug in clean:
         db.add(UserPermission(user_id=user_id, tool_slug=slug))
+    # Outstanding tokens carry the old permission list. Increment in SQL: a
+    # read-modify-write would let two concurrent edits both land on N+1
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(permissions_version=User.permissions_version + 1)
+    )
+
+    # Commit before invalidating so no request can re-cache the old version
+    await db.commit()
+    invalidate_permissions_version(user_id)
 
     return {"user_id": user_id, "permissions": list(LOCKED_SLUGS) + clean}
 
@@ -117,4 +128,6 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
     await db.delete(user)
+    await db.commit()
+    invalidate_permissions_version(user_id)
     return {"ok": True}
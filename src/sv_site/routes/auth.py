@@ -1,52 +1,99 @@
-"""Auth routes: login, register, invite, me, change-password."""
+"""Auth routes: login, register, refresh, logout, invite, me, change-password.
+
+Access tokens are short-lived (JWT_EXPIRE_MINUTES) so their claims can be
+trusted as-is; clients keep a session going with the rotating refresh token
+returned by login/register/refresh.
+"""
 
 from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.auth import (
+    RefreshTokenReused,
     consume_invite_code,
     create_access_token,
     generate_invite_code,
+    get_permissions_version,
     get_user_by_username,
+    issue_refresh_token,
+    load_permissions,
+    rehash_password,
     require_auth,
+    revoke_refresh_token,
+    rotate_refresh_token,
 )
-from sv_site.config import get_settings
+from sv_site.config import Settings, get_settings
 from sv_site.database import get_db
 from sv_site.models import InviteCode, User, UserPermission
+from sv_site.rate_limit import check_login_rate
 from sv_site.tools import GRANTABLE_SLUGS, LOCKED_SLUGS
-from sv_common.auth.passwords import hash_password, verify_password
+from sv_common.auth.passwords import hash_password_async, needs_rehash, verify_password_async
 
 router = APIRouter()
 
 
+def _session_response(
+    user: User, permissions: list[str], refresh: tuple[str, datetime]
+) -> dict:
+    """Body shared by login, register and refresh."""
+    refresh_token, refresh_expires_at = refresh
+    token = create_access_token(
+        user_id=user.id,
+        username=user.username,
+        is_admin=user.is_admin,
+        permissions=permissions,
+        permissions_version=user.permissions_version,
+    )
+    return {
+        "token": token,
+        "refreshToken": refresh_token,
+        "refreshExpiresAt": int(refresh_expires_at.timestamp()),
+        "username": user.username,
+        "isAdmin": user.is_admin,
+    }
+
+
 # ---------------------------------------------------------------------------
 # POST /api/auth/login
 # ---------------------------------------------------------------------------
 
 
 class LoginRequest(BaseModel):
-    username: str
+    username: str = Field(..., max_length=255)  # users.username is VARCHAR(255)
     password: str
 
 
 @router.post("/auth/login")
-async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)) -> dict:
+async def login(
+    body: LoginRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+) -> dict:
+    # Throttle before touching the DB or bcrypt
+    await check_login_rate(request, body.username, settings)
+
     user = await get_user_by_username(db, body.username)
-    if user is None or not user.is_active or not verify_password(
+    if user is None or not user.is_active or not await verify_password_async(
         body.password, user.password_hash
     ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token(
-        user_id=user.id, username=user.username, is_admin=user.is_admin
-    )
-    return {"token": token, "username": user.username, "isAdmin": user.is_admin}
+    # Upgrade (or downgrade) the stored hash to policy without making this login wait
+    if needs_rehash(user.password_hash, settings.bcrypt_rounds):
+        background_tasks.add_task(
+            rehash_password, user.id, body.password, user.password_hash, settings.bcrypt_rounds
+        )
+
+    permissions = await load_permissions(db, user.id)
+    return _session_response(user, permissions, await issue_refresh_token(db, user.id))
 
 
 # ---------------------------------------------------------------------------
@@ -83,23 +130,53 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)) ->
     username = body.username.lower().strip()
     user = User(
         username=username,
-        password_hash=hash_password(body.password),
+        password_hash=await hash_password_async(body.password, get_settings().bcrypt_rounds),
         is_admin=False,
         is_active=True,
         created_at=datetime.now(timezone.utc),
+        permissions_version=1,
     )
     db.add(user)
     await db.flush()
 
     # Apply non-locked permissions from the invite
-    for slug in granted_slugs:
-        if slug in GRANTABLE_SLUGS:
-            db.add(UserPermission(user_id=user.id, tool_slug=slug))
+    stored = [slug for slug in granted_slugs if slug in GRANTABLE_SLUGS]
+    for slug in stored:
+        db.add(UserPermission(user_id=user.id, tool_slug=slug))
 
-    token = create_access_token(
-        user_id=user.id, username=user.username, is_admin=user.is_admin
-    )
-    return {"token": token, "username": user.username, "isAdmin": user.is_admin}
+    return _session_response(user, stored, await issue_refresh_token(db, user.id))
+
+
+# ---------------------------------------------------------------------------
+# POST /api/auth/refresh
+# POST /api/auth/logout
+# ---------------------------------------------------------------------------
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+@router.post("/auth/refresh")
+async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)) -> dict:
+    """Trade a refresh token for a new access token and the next refresh token."""
+    try:
+        user, new_refresh, expires_at = await rotate_refresh_token(db, body.refresh_token)
+    except RefreshTokenReused:
+        await db.commit()  # keep the family revocation despite the error response
+        raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    permissions = await load_permissions(db, user.id)
+    return _session_response(user, permissions, (new_refresh, expires_at))
+
+
+@router.post("/auth/logout")
+async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_db)) -> dict:
+    """Revoke the refresh token's session. Outstanding access tokens lapse on their own."""
+    await revoke_refresh_token(db, body.refresh_token)
+    return {"ok": True}
 
 
 # ---------------------------------------------------------------------------
@@ -142,7 +219,22 @@ async def me(
 ) -> dict:
     user_id = _user.get("user_id")
 
-    # Fresh DB lookup for is_admin (JWT may be stale)
+    # Claims are current unless an admin changed this user since the token was issued
+    claimed_version = _user.get("pv")
+    if claimed_version is not None:
+        current_version = await get_permissions_version(db, user_id)
+        if current_version == 0:
+            raise HTTPException(status_code=401, detail="Token revoked")
+        if current_version == claimed_version:
+            return {
+                "user_id": user_id,
+                "username": _user.get("username"),
+                "isAdmin": _user.get("is_admin", False),
+                "permissions": list(LOCKED_SLUGS | set(_user.get("perms", []))),
+            }
+
+    # Token from before claims were embedded, or an admin changed this user
+    # since it was issued: read access from the DB
     user_row = await db.execute(select(User.is_admin).where(User.id == user_id))
     is_admin: bool = user_row.scalar_one_or_none() or False
 
@@ -181,8 +273,9 @@ async def change_password(
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     user = await get_user_by_username(db, _user["username"])
-    if user is None or not verify_password(body.current_password, user.password_hash):
+    if user is None or not await verify_password_async(body.current_password, user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
-    user.password_hash = hash_password(body.new_password)
+    rounds = get_settings().bcrypt_rounds
+    user.password_hash = await hash_password_async(body.new_password, rounds)
     await db.flush()
     return {"ok": True}
@@ -13,7 +13,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.config import Settings, get_settings
 from sv_site.database import get_db
+from sv_site.feedback_counts import bump_feedback_version
 from sv_site.feedback_processor import process_feedback
+from sv_site.feedback_rollups import record_ingest
 from sv_site.models import CustomerFeedback
 
 logger = logging.getLogger(__name__)
@@ -45,7 +47,7 @@ async def ingest_feedback(
     db: AsyncSession = Depends(get_db),
     _: None = Depends(_require_ingest_key),
     settings: Settings = Depends(get_settings),
-):
+) -> dict:
     """
     Receive a de-identified feedback payload from a client app.
     Stores the record, runs AI processing, returns hub_feedback_id.
@@ -79,7 +81,10 @@ async def ingest_feedback(
     record.tags             = ai.get("tags")
     record.processed_at     = datetime.now(timezone.utc) if not ai.get("error") else None
     record.processing_error = ai.get("error")
+    record.prompt_version   = ai.get("prompt_version")
 
+    await record_ingest(db, payload.program_name, payload.score, record.sentiment, record.tags)
+    await bump_feedback_version(db)  # last, so its row lock is held only for the commit
     await db.commit()
 
     logger.info("Feedback ingested: id=%d program=%s sentiment=%s",
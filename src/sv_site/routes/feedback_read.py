@@ -1,17 +1,46 @@
 """
 GET /api/hub/feedback
-Admin-only endpoint. Returns paginated feedback records from the Hub's local DB.
+GET /api/hub/feedback/export
+GET /api/hub/feedback/stats
+GET /api/hub/feedback/{id}
+Admin-only endpoints. Return paginated feedback records from the Hub's local DB,
+stream the full filtered set as CSV/NDJSON, and serve per-program trend stats
+from the feedback_daily_stats rollup.
+
+Pagination is keyset-based: pass the previous page's `next_cursor` as
+`before=<received_at>,<id>` and the next page is a single index range scan on
+(received_at DESC, id DESC). `offset` still works but costs O(offset).
+How `total` is computed is chosen with `count=` (see sv_site.feedback_counts).
+
+`q=` searches raw_feedback + summary: full-text over the generated
+search_vector column, OR'd with a pg_trgm word-similarity match for typos.
+Search results are ordered by rank and carry a highlighted `snippet`;
+they page with offset only, since rank order has no stable keyset.
+
+`view=summary` (or an explicit `fields=a,b,c`) selects just those columns as
+plain rows instead of hydrating full ORM entities; raw_feedback is left out
+of the summary view and fetched per item from GET /{id} when it is expanded.
 """
+import asyncio
+import csv
+import io
+import json
 import logging
-from typing import Optional
+import zlib
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func, desc
+from fastapi.responses import StreamingResponse
+from sqlalchemy import desc, func, literal, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.auth import require_auth
-from sv_site.database import get_db
-from sv_site.models import CustomerFeedback
+from sv_site.config import get_settings
+from sv_site.database import get_read_db, get_read_session_factory
+from sv_site.feedback_counts import CountStrategy, count_feedback
+from sv_site.models import CustomerFeedback, FeedbackDailyStat, FeedbackProgram
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
@@ -24,38 +53,95 @@ def _require_admin(user: dict = Depends(require_auth)) -> dict:
     return user
 
 
-def _serialize(record: CustomerFeedback) -> dict:
-    return {
-        "id":                    record.id,
-        "program_name":          record.program_name,
-        "received_at":           record.received_at.isoformat() if record.received_at else None,
-        "is_authenticated_user": record.is_authenticated_user,
-        "is_anonymous":          record.is_anonymous,
-        "privacy_token":         record.privacy_token[:8] + "…" if record.privacy_token else None,
-        "score":                 record.score,
-        "raw_feedback":          record.raw_feedback,
-        "summary":               record.summary,
-        "sentiment":             record.sentiment,
-        "tags":                  record.tags or [],
-        "processed_at":          record.processed_at.isoformat() if record.processed_at else None,
-        "processing_error":      record.processing_error,
-    }
+_COLUMNS = {c.key: c for c in (
+    CustomerFeedback.id,
+    CustomerFeedback.program_name,
+    CustomerFeedback.received_at,
+    CustomerFeedback.is_authenticated_user,
+    CustomerFeedback.is_anonymous,
+    CustomerFeedback.privacy_token,
+    CustomerFeedback.score,
+    CustomerFeedback.raw_feedback,
+    CustomerFeedback.summary,
+    CustomerFeedback.sentiment,
+    CustomerFeedback.tags,
+    CustomerFeedback.processed_at,
+    CustomerFeedback.processing_error,
+)}
+_FIELDS = list(_COLUMNS)
+# Everything the grid shows; raw_feedback (up to 10k chars) comes from GET /{id}
+_SUMMARY_FIELDS = [f for f in _FIELDS if f != "raw_feedback"]
+# The keyset cursor is built from these, so projections always include them
+_CURSOR_FIELDS = ("id", "received_at")
 
 
-@router.get("")
-async def list_feedback(
-    program_name: Optional[str] = Query(None),
-    sentiment:    Optional[str] = Query(None),
-    tag:          Optional[str] = Query(None),
-    min_score:    Optional[int] = Query(None, ge=1, le=10),
-    max_score:    Optional[int] = Query(None, ge=1, le=10),
-    limit:        int           = Query(50, ge=1, le=200),
-    offset:       int           = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
-    _user=Depends(_require_admin),
-):
-    q = select(CustomerFeedback)
+def _format(field: str, value):
+    if field in ("received_at", "processed_at"):
+        return value.isoformat() if value else None
+    if field == "privacy_token":
+        return value[:8] + "…" if value else None
+    if field == "tags":
+        return value or []
+    return value
+
+
+def _serialize(record, fields: list[str] = _FIELDS) -> dict:
+    """Works on ORM entities and on column-projection rows alike."""
+    return {f: _format(f, getattr(record, f)) for f in fields}
+
+
+def _resolve_fields(view: str, fields: Optional[str]) -> Optional[list[str]]:
+    """Column list for a projected query, or None for full ORM entities."""
+    if fields:
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = sorted(wanted - set(_FIELDS))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Valid: {', '.join(_FIELDS)}",
+            )
+        wanted.update(_CURSOR_FIELDS)
+        return [f for f in _FIELDS if f in wanted]
+    if view == "summary":
+        return _SUMMARY_FIELDS
+    return None
+
+
+# Highlights are wrapped in <mark>…</mark>; everything else in a snippet is raw user text
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+
+def _encode_cursor(record: CustomerFeedback) -> str:
+    return f"{record.received_at.isoformat()},{record.id}"
+
+
+def _parse_cursor(before: str) -> tuple[datetime, int]:
+    """Parse `<received_at ISO-8601>,<id>`. A '+' in the offset may arrive as a space."""
+    try:
+        ts_raw, id_raw = before.rsplit(",", 1)
+        received_at = datetime.fromisoformat(ts_raw.strip().replace(" ", "+"))
+        feedback_id = int(id_raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor; expected before=<received_at>,<id>")
+    if received_at.tzinfo is None:
+        received_at = received_at.replace(tzinfo=timezone.utc)
+    return received_at, feedback_id
 
+
+def _tsquery(search: str):
+    return func.websearch_to_tsquery("english", search)
+
+
+def _apply_filters(
+    q,
+    program_name: Optional[str],
+    sentiment: Optional[str],
+    tag: Optional[str],
+    min_score: Optional[int],
+    max_score: Optional[int],
+    search: Optional[str],
+):
+    """WHERE clauses shared by the list and export endpoints."""
     if program_name:
         q = q.where(CustomerFeedback.program_name == program_name)
     if sentiment:
@@ -66,28 +152,302 @@ async def list_feedback(
         q = q.where(CustomerFeedback.score >= min_score)
     if max_score is not None:
         q = q.where(CustomerFeedback.score <= max_score)
+    if search:
+        q = q.where(or_(
+            CustomerFeedback.search_vector.op("@@")(_tsquery(search)),
+            literal(search).op("<%")(CustomerFeedback.raw_feedback),
+        ))
+    return q
 
-    count_q = select(func.count()).select_from(q.subquery())
-    total = (await db.execute(count_q)).scalar_one()
 
-    data_q = q.order_by(desc(CustomerFeedback.received_at)).limit(limit).offset(offset)
-    rows = (await db.execute(data_q)).scalars().all()
+async def _fetch_page(db: AsyncSession, data_q, as_rows: bool) -> list:
+    result = await db.execute(data_q)
+    # Search and projected pages are Row tuples; plain full pages are entities
+    return result.all() if as_rows else result.scalars().all()
+
+
+@router.get("")
+async def list_feedback(
+    program_name: Optional[str] = Query(None),
+    sentiment:    Optional[str] = Query(None),
+    tag:          Optional[str] = Query(None),
+    min_score:    Optional[int] = Query(None, ge=1, le=10),
+    max_score:    Optional[int] = Query(None, ge=1, le=10),
+    search:       Optional[str] = Query(None, alias="q", min_length=1, max_length=200),
+    limit:        int           = Query(50, ge=1, le=200),
+    offset:       int           = Query(0, ge=0),
+    before:       Optional[str] = Query(None, description="Keyset cursor: <received_at>,<id>"),
+    count:        CountStrategy = Query("cached"),
+    view:         Literal["full", "summary"] = Query("full"),
+    fields:       Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
+    _user=Depends(_require_admin),
+) -> dict:
+    if before and offset:
+        raise HTTPException(status_code=400, detail="Use either before or offset, not both")
+    if before and search:
+        raise HTTPException(status_code=400, detail="Search results page with offset, not before")
+
+    columns = _resolve_fields(view, fields)
+    base = select(*(_COLUMNS[f] for f in columns)) if columns else select(CustomerFeedback)
+    q = _apply_filters(base, program_name, sentiment, tag, min_score, max_score, search)
+    as_rows = bool(search or columns)
+
+    filter_key = (program_name, sentiment, tag, min_score, max_score, search)
+
+    if search:
+        tsq = _tsquery(search)
+        rank = (
+            func.ts_rank_cd(CustomerFeedback.search_vector, tsq)
+            + func.word_similarity(search, CustomerFeedback.raw_feedback)
+        ).label("rank")
+        snippet = func.ts_headline(
+            "english", CustomerFeedback.raw_feedback, tsq, _HEADLINE_OPTIONS
+        ).label("snippet")
+        data_q = q.add_columns(rank, snippet).order_by(
+            desc(rank), desc(CustomerFeedback.received_at), desc(CustomerFeedback.id)
+        )
+    else:
+        data_q = q.order_by(desc(CustomerFeedback.received_at), desc(CustomerFeedback.id))
+    data_q = data_q.limit(limit)
+
+    if before:
+        # Row-value comparison matches the (received_at DESC, id DESC) index exactly
+        data_q = data_q.where(
+            tuple_(CustomerFeedback.received_at, CustomerFeedback.id) < tuple_(*_parse_cursor(before))
+        )
+    elif offset:
+        data_q = data_q.offset(offset)
+
+    if get_settings().feedback_count_concurrent and count != "none":
+        # A session can't run two statements at once — count on a second connection
+        async def _count_on_own_session():
+            async with get_read_session_factory(readonly=True)() as count_db:
+                return await count_feedback(count_db, q, filter_key, count)
+
+        (total, estimated), rows = await asyncio.gather(
+            _count_on_own_session(), _fetch_page(db, data_q, as_rows)
+        )
+    else:
+        total, estimated = await count_feedback(db, q, filter_key, count)
+        rows = await _fetch_page(db, data_q, as_rows)
+
+    if columns:
+        feedback = [_serialize(r, columns) for r in rows]
+    elif search:
+        feedback = [_serialize(r[0]) for r in rows]
+    else:
+        feedback = [_serialize(r) for r in rows]
+    if search:
+        for item, r in zip(feedback, rows):
+            item["rank"] = round(float(r.rank), 4)
+            item["snippet"] = r.snippet
 
     return {
         "ok": True,
         "data": {
-            "feedback": [_serialize(r) for r in rows],
+            "feedback": feedback,
             "total": total,
+            "total_is_estimate": estimated,
+            "next_cursor": (
+                _encode_cursor(rows[-1]) if len(rows) == limit and not search else None
+            ),
         },
     }
 
 
+# ---------------------------------------------------------------------------
+# GET /api/hub/feedback/export
+# ---------------------------------------------------------------------------
+
+_EXPORT_BATCH = 500  # rows per cursor fetch and per response chunk
+
+
+async def _export_rows(stmt):
+    """Yield serialized rows from a server-side cursor.
+
+    The session is opened here rather than taken from get_read_db: the
+    streaming body runs after the handler returns, so it must own its connection.
+    """
+    async with get_read_session_factory(readonly=True)() as db:
+        result = await db.stream(stmt.execution_options(yield_per=_EXPORT_BATCH))
+        async for row in result:
+            yield _serialize(row)
+
+
+def _format_chunk(items: list[dict], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for item in items:
+        writer.writerow(
+            "; ".join(v) if k == "tags" else ("" if v is None else v)
+            for k, v in ((f, item[f]) for f in _FIELDS)
+        )
+    return buf.getvalue()
+
+
+async def _export_body(stmt, fmt: str, compress: bool):
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31 → gzip framing
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return gz.compress(data) if gz else data
+
+    if fmt == "csv":
+        yield encode(",".join(_FIELDS) + "\r\n")
+
+    batch: list[dict] = []
+    async for item in _export_rows(stmt):
+        batch.append(item)
+        if len(batch) >= _EXPORT_BATCH:
+            chunk = encode(_format_chunk(batch, fmt))
+            batch.clear()
+            if chunk:
+                yield chunk
+    if batch:
+        yield encode(_format_chunk(batch, fmt))
+    if gz:
+        yield gz.flush()
+
+
+@router.get("/export")
+async def export_feedback(
+    fmt:          Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    gzip:         bool          = Query(False),
+    program_name: Optional[str] = Query(None),
+    sentiment:    Optional[str] = Query(None),
+    tag:          Optional[str] = Query(None),
+    min_score:    Optional[int] = Query(None, ge=1, le=10),
+    max_score:    Optional[int] = Query(None, ge=1, le=10),
+    search:       Optional[str] = Query(None, alias="q", min_length=1, max_length=200),
+    _user=Depends(_require_admin),
+) -> StreamingResponse:
+    """
+    Stream every feedback row matching the list filters, newest first.
+    Memory stays bounded by _EXPORT_BATCH rows however large the result is.
+    `gzip=true` compresses on the fly and downloads as .gz.
+    """
+    stmt = _apply_filters(
+        select(*_COLUMNS.values()), program_name, sentiment, tag, min_score, max_score, search
+    ).order_by(desc(CustomerFeedback.received_at), desc(CustomerFeedback.id))
+
+    filename = f"feedback-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}"
+    media_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        _export_body(stmt, fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/programs")
 async def list_programs(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _user=Depends(_require_admin),
-):
-    """Distinct program names — used to populate the filter dropdown."""
-    q = select(CustomerFeedback.program_name).distinct()
+) -> dict:
+    """Program names for the filter dropdown, with per-program counts.
+    Reads the feedback_programs registry — one small row per program."""
+    q = select(FeedbackProgram).order_by(FeedbackProgram.program_name)
     rows = (await db.execute(q)).scalars().all()
-    return {"ok": True, "data": {"programs": sorted(rows)}}
+    return {
+        "ok": True,
+        "data": {
+            "programs": [r.program_name for r in rows],
+            "details": [
+                {
+                    "program_name":   r.program_name,
+                    "feedback_count": r.feedback_count,
+                    "first_seen":     r.first_seen.isoformat() if r.first_seen else None,
+                    "last_seen":      r.last_seen.isoformat() if r.last_seen else None,
+                }
+                for r in rows
+            ],
+        },
+    }
+
+
+def _empty_bucket() -> dict:
+    return {"count": 0, "score_sum": 0, "score_count": 0,
+            "sentiment": Counter(), "tags": Counter()}
+
+
+def _fold(bucket: dict, row: FeedbackDailyStat) -> None:
+    bucket["count"]       += row.feedback_count
+    bucket["score_sum"]   += row.score_sum
+    bucket["score_count"] += row.score_count
+    bucket["sentiment"].update(row.sentiment_counts or {})
+    bucket["tags"].update(row.tag_counts or {})
+
+
+def _bucket_out(bucket: dict) -> dict:
+    return {
+        "count":      bucket["count"],
+        "mean_score": (round(bucket["score_sum"] / bucket["score_count"], 2)
+                       if bucket["score_count"] else None),
+        "sentiment":  {k: v for k, v in bucket["sentiment"].items() if v},
+        "tags":       dict(t for t in bucket["tags"].most_common() if t[1]),
+    }
+
+
+@router.get("/stats")
+async def feedback_stats(
+    program_name: Optional[str]             = Query(None),
+    granularity:  Literal["day", "week"]    = Query("day"),
+    days:         int                       = Query(90, ge=1, le=730),
+    db: AsyncSession = Depends(get_read_db),
+    _user=Depends(_require_admin),
+) -> dict:
+    """
+    Counts, mean score, sentiment distribution and tag frequencies per program
+    per day (UTC) or ISO week, plus per-program totals for the window.
+    Reads the rollup only — cost scales with programs × days, not feedback rows.
+    """
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    q = select(FeedbackDailyStat).where(FeedbackDailyStat.day >= since)
+    if program_name:
+        q = q.where(FeedbackDailyStat.program_name == program_name)
+    rows = (await db.execute(q)).scalars().all()
+
+    periods: dict[tuple[str, date], dict] = {}
+    totals: dict[str, dict] = {}
+    for row in rows:
+        start = row.day - timedelta(days=row.day.weekday()) if granularity == "week" else row.day
+        _fold(periods.setdefault((row.program_name, start), _empty_bucket()), row)
+        _fold(totals.setdefault(row.program_name, _empty_bucket()), row)
+
+    return {
+        "ok": True,
+        "data": {
+            "granularity": granularity,
+            "since": since.isoformat(),
+            "series": [
+                {"program_name": prog, "period_start": start.isoformat(), **_bucket_out(b)}
+                for (prog, start), b in sorted(periods.items())
+            ],
+            "totals": {prog: _bucket_out(b) for prog, b in sorted(totals.items())},
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# GET /api/hub/feedback/{id}
+# Registered last so /programs, /stats and /export are matched first.
+# ---------------------------------------------------------------------------
+
+@router.get("/{feedback_id}")
+async def get_feedback(
+    feedback_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    _user=Depends(_require_admin),
+) -> dict:
+    """One full record, including raw_feedback — the summary view's expand."""
+    record = await db.get(CustomerFeedback, feedback_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Feedback not found")
+    return {"ok": True, "data": _serialize(record)}
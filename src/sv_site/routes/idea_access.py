@@ -11,7 +11,7 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.auth import require_auth
-from sv_site.database import get_db
+from sv_site.database import get_db, get_read_db
 from sv_site.models import IdeaAccessOverride, User
 
 router = APIRouter(prefix="/api/admin/ideas", tags=["Idea Access"])
@@ -36,7 +36,7 @@ class AccessOverrideRequest(BaseModel):
 async def get_idea_access(
     idea_id: int = Path(...),
     _admin: dict = Depends(_require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:
     """Return all non-admin active users with their override state for this idea."""
     # All non-admin active users
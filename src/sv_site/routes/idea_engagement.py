@@ -13,7 +13,7 @@ from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.config import get_settings
-from sv_site.database import get_db
+from sv_site.database import get_read_db
 from sv_site.models import IdeaAccessOverride, IdeaFavorite, IdeaVote, User
 
 router = APIRouter(prefix="/api/external/ideas", tags=["Idea Engagement (External)"])
@@ -145,7 +145,7 @@ async def _fetch_engagement(idea_ids: list[int] | None, db: AsyncSession) -> dic
 @router.get("")
 async def get_all_engagement(
     _: None = Depends(_require_callback_key),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:
     """
     Return engagement data for every idea that has votes, favorites, or access overrides.
@@ -167,7 +167,7 @@ async def get_all_engagement(
 async def get_idea_engagement(
     idea_id: int = Path(...),
     _: None = Depends(_require_callback_key),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:
     """
     Return engagement data for a single idea.
@@ -7,12 +7,12 @@ Vote/favorite data lives in sv-site's own DB; idea IDs come from sv-tools.
 
 from fastapi import APIRouter, Depends, HTTPException, Path
 from pydantic import BaseModel, Field
-from sqlalchemy import case, delete, func, select
+from sqlalchemy import and_, delete, false, func, null, select, true, union_all
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.auth import require_auth
-from sv_site.database import get_db
+from sv_site.database import get_db, get_read_db
 from sv_site.models import IdeaFavorite, IdeaVote, User
 
 router = APIRouter(prefix="/api/ideas", tags=["Idea Reactions"])
@@ -40,7 +40,7 @@ class VotePayload(BaseModel):
 @router.get("/reactions")
 async def get_reactions(
     user: dict = Depends(require_auth),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:
     """
     Return aggregated reaction data for all ideas.
@@ -65,90 +65,60 @@ async def get_reactions(
     user_id: int = user["user_id"]
     is_admin: bool = user.get("is_admin", False)
 
-    # --- Aggregate vote counts per idea ---
-    vote_agg = await db.execute(
-        select(
-            IdeaVote.idea_id,
-            func.sum(IdeaVote.vote).label("score"),
-            func.sum(case((IdeaVote.vote == 1,  1), else_=0)).label("ups"),
-            func.sum(case((IdeaVote.vote == -1, 1), else_=0)).label("downs"),
-        ).group_by(IdeaVote.idea_id)
-    )
-    vote_rows = vote_agg.all()
-
-    # --- Aggregate favorite counts per idea ---
-    fav_agg = await db.execute(
+    # Votes and favorites as one stream of reactions, so a single GROUP BY
+    # yields every idea's totals and the caller's own state together
+    reaction = union_all(
+        select(IdeaVote.idea_id, IdeaVote.user_id, IdeaVote.vote,
+               false().label("is_favorite")),
+        select(IdeaFavorite.idea_id, IdeaFavorite.user_id, null().label("vote"),
+               true().label("is_favorite")),
+    ).subquery("reaction")
+
+    mine = reaction.c.user_id == user_id
+    agg_rows = (await db.execute(
         select(
-            IdeaFavorite.idea_id,
-            func.count().label("favorites"),
-        ).group_by(IdeaFavorite.idea_id)
-    )
-    fav_rows = fav_agg.all()
-
-    # --- Current user's votes ---
-    my_votes_result = await db.execute(
-        select(IdeaVote.idea_id, IdeaVote.vote).where(IdeaVote.user_id == user_id)
-    )
-    my_votes = {row.idea_id: row.vote for row in my_votes_result.all()}
-
-    # --- Current user's favorites ---
-    my_favs_result = await db.execute(
-        select(IdeaFavorite.idea_id).where(IdeaFavorite.user_id == user_id)
-    )
-    my_favs = {row.idea_id for row in my_favs_result.all()}
+            reaction.c.idea_id,
+            func.coalesce(func.sum(reaction.c.vote), 0).label("score"),
+            func.count().filter(reaction.c.vote == 1).label("ups"),
+            func.count().filter(reaction.c.vote == -1).label("downs"),
+            func.count().filter(reaction.c.is_favorite).label("favorites"),
+            func.max(reaction.c.vote).filter(mine).label("my_vote"),
+            func.coalesce(func.bool_or(and_(reaction.c.is_favorite, mine)), False)
+                .label("my_favorite"),
+        ).group_by(reaction.c.idea_id)
+    )).all()
 
     # --- Admin breakdown (who voted what / who favorited) ---
     voter_detail: dict[int, list] = {}
     fav_detail: dict[int, list] = {}
     if is_admin:
-        all_votes_result = await db.execute(
-            select(IdeaVote.idea_id, IdeaVote.vote, User.username)
-            .join(User, User.id == IdeaVote.user_id)
-        )
-        for row in all_votes_result.all():
-            voter_detail.setdefault(row.idea_id, []).append(
-                {"username": row.username, "vote": row.vote}
-            )
-
-        all_favs_result = await db.execute(
-            select(IdeaFavorite.idea_id, User.username)
-            .join(User, User.id == IdeaFavorite.user_id)
+        detail_rows = await db.execute(
+            select(reaction.c.idea_id, reaction.c.vote, reaction.c.is_favorite, User.username)
+            .join(User, User.id == reaction.c.user_id)
         )
-        for row in all_favs_result.all():
-            fav_detail.setdefault(row.idea_id, []).append(row.username)
+        for row in detail_rows.all():
+            if row.is_favorite:
+                fav_detail.setdefault(row.idea_id, []).append(row.username)
+            else:
+                voter_detail.setdefault(row.idea_id, []).append(
+                    {"username": row.username, "vote": row.vote}
+                )
 
-    # --- Merge everything into a single dict keyed by idea_id ---
     reactions: dict[str, dict] = {}
-
-    # Seed from vote aggregates
-    for row in vote_rows:
+    for row in agg_rows:
         iid = str(row.idea_id)
         reactions[iid] = {
-            "score":    int(row.score or 0),
-            "ups":      int(row.ups   or 0),
-            "downs":    int(row.downs or 0),
-            "favorites": 0,
-            "my_vote":     my_votes.get(row.idea_id),
-            "my_favorite": row.idea_id in my_favs,
+            "score":       int(row.score),
+            "ups":         int(row.ups),
+            "downs":       int(row.downs),
+            "favorites":   int(row.favorites),
+            "my_vote":     row.my_vote,
+            "my_favorite": bool(row.my_favorite),
         }
         if is_admin:
             reactions[iid]["voters"]       = voter_detail.get(row.idea_id, [])
             reactions[iid]["favorited_by"] = fav_detail.get(row.idea_id, [])
 
-    # Merge favorite counts (some ideas may only have favorites, no votes)
-    for row in fav_rows:
-        iid = str(row.idea_id)
-        if iid not in reactions:
-            reactions[iid] = {
-                "score": 0, "ups": 0, "downs": 0,
-                "my_vote": my_votes.get(row.idea_id),
-                "my_favorite": row.idea_id in my_favs,
-            }
-            if is_admin:
-                reactions[iid]["voters"]       = voter_detail.get(row.idea_id, [])
-                reactions[iid]["favorited_by"] = fav_detail.get(row.idea_id, [])
-        reactions[iid]["favorites"] = int(row.favorites)
-
     return {"reactions": reactions}
 
 
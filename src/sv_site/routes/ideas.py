@@ -1,18 +1,30 @@
-"""Ideas proxy — fetches from sv-tools and returns to authenticated clients."""
+"""Ideas proxy — fetches from sv-tools and returns to authenticated clients.
+
+Responses that go back unchanged are sent as sv-tools' own bytes rather than
+decoded and re-encoded. The ideas list is the same for every caller before
+per-user filtering, so it is kept for SV_TOOLS_CACHE_SECONDS along with its
+compressed forms.
+"""
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sv_site.auth import require_auth
+from sv_site.cache import TTLCache
 from sv_site.config import get_settings
-from sv_site.database import get_db
+from sv_site.database import get_read_db
+from sv_site.metrics import upstream_transport
 from sv_site.models import IdeaAccessOverride
+from sv_site.responses import CachedBody, CachedJSONResponse, JSONBytesResponse, json_bytes
 
 router = APIRouter(prefix="/ideas", tags=["Ideas"])
 
+_list_cache = TTLCache("sv_tools_ideas", maxsize=64)
+
 
 def _sv_tools_url() -> str:
     return get_settings().sv_tools_url.rstrip("/")
@@ -23,15 +35,7 @@ def _admin_headers() -> dict:
     return {"X-API-Key": key} if key else {}
 
 
-@router.get("")
-async def get_ideas(
-    status: Optional[str] = Query(None),
-    limit: int = Query(50, le=200),
-    _user: dict = Depends(require_auth),
-    db: AsyncSession = Depends(get_db),
-) -> dict:
-    """Proxy to sv-tools. Admins get all ideas; others get public + override-filtered."""
-    is_admin: bool = _user.get("is_admin", False)
+async def _fetch_ideas(status: Optional[str], limit: int) -> CachedBody:
     params: dict = {"limit": limit}
     if status:
         params["status"] = status
@@ -39,21 +43,40 @@ async def get_ideas(
     url = f"{_sv_tools_url()}/api/v1/ideas"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, params=params, headers=headers)
             resp.raise_for_status()
-            data = resp.json()
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail="sv-tools error")
         except httpx.RequestError:
             raise HTTPException(status_code=503, detail="sv-tools unavailable")
 
+    body = CachedBody(resp.content)
+    ttl = get_settings().sv_tools_cache_seconds
+    if ttl > 0:
+        _list_cache.set((status, limit), body, ttl=ttl)
+    return body
+
+
+@router.get("")
+async def get_ideas(
+    status: Optional[str] = Query(None),
+    limit: int = Query(50, le=200),
+    _user: dict = Depends(require_auth),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Proxy to sv-tools. Admins get all ideas; others get public + override-filtered."""
+    is_admin: bool = _user.get("is_admin", False)
+    body = _list_cache.get((status, limit))
+    if body is None:
+        body = await _fetch_ideas(status, limit)
+
     if is_admin:
-        return data
+        return CachedJSONResponse(body)
 
     user_id: int = _user["user_id"]
-    ideas = data.get("ideas", [])
+    ideas = orjson.loads(body.raw).get("ideas", [])
 
     result = await db.execute(
         select(IdeaAccessOverride.idea_id, IdeaAccessOverride.can_view)
@@ -65,15 +88,15 @@ async def get_ideas(
         idea for idea in ideas
         if overrides_map.get(idea["id"], idea.get("public", False))
     ]
-    return {"ideas": visible}
+    return JSONBytesResponse(json_bytes({"ideas": visible}))
 
 
 @router.get("/{idea_id}")
 async def get_idea(
     idea_id: str = Path(...),
     _user: dict = Depends(require_auth),
-    db: AsyncSession = Depends(get_db),
-) -> dict:
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """Proxy to sv-tools idea detail. Admins can access non-public ideas; others filtered by overrides."""
     is_admin: bool = _user.get("is_admin", False)
     user_id: int = _user["user_id"]
@@ -81,13 +104,12 @@ async def get_idea(
     url = f"{_sv_tools_url()}/api/v1/ideas/{idea_id}"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, headers=headers)
             if resp.status_code == 404:
                 raise HTTPException(status_code=404, detail="Not found")
             resp.raise_for_status()
-            data = resp.json()
         except HTTPException:
             raise
         except httpx.HTTPStatusError as e:
@@ -96,9 +118,9 @@ async def get_idea(
             raise HTTPException(status_code=503, detail="sv-tools unavailable")
 
     if is_admin:
-        return data
+        return JSONBytesResponse(resp.content)
 
-    idea = data.get("idea", {})
+    idea = resp.json().get("idea", {})
 
     result = await db.execute(
         select(IdeaAccessOverride.can_view)
@@ -117,23 +139,23 @@ async def get_idea(
     if not can_see:
         raise HTTPException(status_code=404, detail="Not found")
 
-    return data
+    return JSONBytesResponse(resp.content)
 
 
 @router.get("/{idea_id}/artifacts")
 async def get_idea_artifacts(
     idea_id: str = Path(...),
     _user: dict = Depends(require_auth),
-) -> dict:
+) -> Response:
     """Proxy to sv-tools artifacts list for an idea."""
     url = f"{_sv_tools_url()}/api/v1/ideas/{idea_id}/artifacts"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, headers=headers)
             resp.raise_for_status()
-            return resp.json()
+            return JSONBytesResponse(resp.content)
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail="sv-tools error")
         except httpx.RequestError:
@@ -145,16 +167,16 @@ async def get_idea_artifact(
     idea_id: str = Path(...),
     artifact_id: str = Path(...),
     _user: dict = Depends(require_auth),
-) -> dict:
+) -> Response:
     """Proxy to sv-tools artifact detail. Returns full artifact content."""
     url = f"{_sv_tools_url()}/api/v1/ideas/{idea_id}/artifacts/{artifact_id}"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, headers=headers)
             resp.raise_for_status()
-            return resp.json()
+            return JSONBytesResponse(resp.content)
         except httpx.HTTPStatusError as e:
             raise HTTPException(
                 status_code=e.response.status_code, detail="sv-tools error"
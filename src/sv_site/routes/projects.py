@@ -1,13 +1,22 @@
-"""Projects proxy — fetches from sv-tools and returns to authenticated clients."""
+"""Projects proxy — fetches from sv-tools and returns to authenticated clients.
+
+Every caller sees the same answer, so each one is kept for
+SV_TOOLS_CACHE_SECONDS, encoded and compressed once.
+"""
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
 
 from sv_site.auth import require_auth
+from sv_site.cache import TTLCache
 from sv_site.config import get_settings
+from sv_site.metrics import upstream_transport
+from sv_site.responses import CachedBody, CachedJSONResponse
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+_cache = TTLCache("sv_tools_projects", maxsize=256)
+
 
 def _sv_tools_url() -> str:
     return get_settings().sv_tools_url.rstrip("/")
@@ -18,19 +27,30 @@ def _admin_headers() -> dict:
     return {"X-API-Key": key} if key else {}
 
 
+def _cache_response(key: str, payload: dict) -> CachedJSONResponse:
+    body = CachedBody.of(payload)
+    ttl = get_settings().sv_tools_cache_seconds
+    if ttl > 0:
+        _cache.set(key, body, ttl=ttl)
+    return CachedJSONResponse(body)
+
+
 @router.get("")
 async def get_projects(
     _user: dict = Depends(require_auth),
-) -> dict:
+) -> Response:
     """Proxy to sv-tools active projects list."""
+    cached = _cache.get("projects")
+    if cached is not None:
+        return CachedJSONResponse(cached)
     url = f"{_sv_tools_url()}/api/v1/projects"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, params={"active_only": "true"}, headers=headers)
             resp.raise_for_status()
-            return {"projects": resp.json()}
+            return _cache_response("projects", {"projects": resp.json()})
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail="sv-tools error")
         except httpx.RequestError:
@@ -41,18 +61,21 @@ async def get_projects(
 async def get_project_documents(
     name: str = Path(...),
     _user: dict = Depends(require_auth),
-) -> dict:
+) -> Response:
     """Proxy to sv-tools project documents list."""
+    cached = _cache.get(f"{name}/documents")
+    if cached is not None:
+        return CachedJSONResponse(cached)
     url = f"{_sv_tools_url()}/api/v1/projects/{name}/documents"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, headers=headers)
             if resp.status_code == 404:
                 raise HTTPException(status_code=404, detail="Project not found")
             resp.raise_for_status()
-            return {"documents": resp.json()}
+            return _cache_response(f"{name}/documents", {"documents": resp.json()})
         except HTTPException:
             raise
         except httpx.HTTPStatusError as e:
@@ -65,18 +88,21 @@ async def get_project_documents(
 async def get_project_phases(
     name: str = Path(...),
     _user: dict = Depends(require_auth),
-) -> dict:
+) -> Response:
     """Proxy to sv-tools project phases list."""
+    cached = _cache.get(f"{name}/phases")
+    if cached is not None:
+        return CachedJSONResponse(cached)
     url = f"{_sv_tools_url()}/api/v1/projects/{name}/phases"
     headers = _admin_headers()
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("sv-tools")) as client:
         try:
             resp = await client.get(url, headers=headers)
             if resp.status_code == 404:
                 raise HTTPException(status_code=404, detail="Project not found")
             resp.raise_for_status()
-            return {"phases": resp.json()}
+            return _cache_response(f"{name}/phases", {"phases": resp.json()})
         except HTTPException:
             raise
         except httpx.HTTPStatusError as e:
@@ -1,20 +1,35 @@
-"""Shared test fixtures for sv_site tests."""
+"""Shared test fixtures for sv_site tests.
+
+Most tests mock the database. The pg_* fixtures at the bottom run routes
+against a real Postgres instead, for tests that must see actual SQL — query
+budgets above all. Point SV_TEST_DATABASE_URL at a local, disposable
+database (the fixtures drop and recreate its shadowedvaca schema); without
+it those tests are skipped.
+"""
+
+import os
 
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from sv_site import database
+from sv_site.cache import clear_all_caches
 from sv_site.config import Settings, get_settings
-from sv_site.database import get_db
+from sv_site.database import get_db, get_read_db
 from sv_site.main import app
+from sv_site.models import Base
 
 
 TEST_INGEST_KEY = "test-ingest-key-32-bytes-minimum!!"
 
 
 def make_test_settings(**overrides):
+    overrides.setdefault("bcrypt_rounds", 4)  # matches the fast hashes tests create
     return Settings(
         database_url="postgresql+asyncpg://localhost/test",
         secret_key="test-secret-key",
@@ -25,6 +40,14 @@ def make_test_settings(**overrides):
     )
 
 
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    """In-process caches must not leak state between tests."""
+    clear_all_caches()
+    yield
+    clear_all_caches()
+
+
 @pytest.fixture
 def test_settings():
     return make_test_settings()
@@ -54,6 +77,7 @@ async def mock_db():
 async def async_client(mock_db, test_settings):
     """FastAPI test client with overridden dependencies."""
     app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_read_db] = lambda: mock_db
     app.dependency_overrides[get_settings] = lambda: test_settings
 
     async with AsyncClient(
@@ -62,3 +86,91 @@ async def async_client(mock_db, test_settings):
         yield client
 
     app.dependency_overrides.clear()
+
+
+# ---------------------------------------------------------------------------
+# Real Postgres and query budgets
+# ---------------------------------------------------------------------------
+
+PG_URL = os.environ.get("SV_TEST_DATABASE_URL", "")
+
+# @query_budget(n): every request made through pg_client may run at most n
+# SQL statements, or the test fails listing what ran.
+query_budget = pytest.mark.query_budget
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(n): fail if a pg_client request runs more than n SQL statements"
+    )
+
+
+@pytest_asyncio.fixture
+async def pg_engine():
+    """Engine on SV_TEST_DATABASE_URL with a freshly created schema."""
+    if not PG_URL:
+        pytest.skip("set SV_TEST_DATABASE_URL to a local Postgres database")
+    engine = create_async_engine(PG_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS shadowedvaca CASCADE"))
+        await conn.execute(text("CREATE SCHEMA shadowedvaca"))
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA shadowedvaca CASCADE"))
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def pg_session(pg_engine):
+    """Session for seeding and inspecting the pg_engine database."""
+    async with async_sessionmaker(pg_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def pg_client(request, pg_engine, test_settings, monkeypatch):
+    """AsyncClient whose routes use real sessions on pg_engine.
+
+    client.statements holds the SQL the most recent request ran; a
+    query_budget marker on the test is checked after every response.
+    """
+    monkeypatch.setattr(database, "get_settings", lambda: test_settings)
+    monkeypatch.setattr(database, "_engine", pg_engine)
+    monkeypatch.setattr(
+        database, "_session_factory", async_sessionmaker(pg_engine, expire_on_commit=False)
+    )
+    monkeypatch.setattr(database, "_readonly_factories", {})
+    app.dependency_overrides[get_settings] = lambda: test_settings
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(pg_engine.sync_engine, "after_cursor_execute", record)
+
+    marker = request.node.get_closest_marker("query_budget")
+    budget = marker.args[0] if marker else None
+
+    async def reset(_request):
+        statements.clear()
+
+    async def check(response):
+        if budget is not None and len(statements) > budget:
+            listing = "\n".join(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(statements, 1))
+            pytest.fail(
+                f"{response.request.method} {response.request.url.path} ran "
+                f"{len(statements)} statements, budget is {budget}:\n{listing}"
+            )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        event_hooks={"request": [reset], "response": [check]},
+    ) as client:
+        client.statements = statements
+        yield client
+
+    event.remove(pg_engine.sync_engine, "after_cursor_execute", record)
+    app.dependency_overrides.clear()
@@ -0,0 +1,90 @@
+"""Tests for AI usage/cost logging (sv_site.api_usage)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sv_site import api_usage
+
+from tests.conftest import make_test_settings
+
+USAGE = SimpleNamespace(
+    input_tokens=1_000,
+    output_tokens=200,
+    cache_read_input_tokens=None,
+    cache_creation_input_tokens=0,
+)
+
+
+def test_estimate_cost_uses_pricing_table():
+    tokens = api_usage.usage_tokens(USAGE)
+    # 1000 * 0.80 + 200 * 4.00 per 1M tokens
+    assert api_usage.estimate_cost("anthropic", "claude-haiku-4-5-20251001", tokens) == 0.0016
+
+
+def test_estimate_cost_unknown_model_is_zero():
+    tokens = api_usage.usage_tokens(USAGE)
+    assert api_usage.estimate_cost("anthropic", "no-such-model", tokens) == 0.0
+
+
+def test_pricing_read_from_configured_file(tmp_path):
+    path = tmp_path / "thresholds.yaml"
+    path.write_text("pricing:\n  anthropic:\n    claude-haiku-4-5-20251001:\n      input: 1.0\n      output: 2.0\n")
+    tokens = api_usage.usage_tokens(USAGE)
+    with patch("sv_site.api_usage.get_settings", return_value=make_test_settings(ai_pricing_path=str(path))):
+        assert api_usage.estimate_cost("anthropic", "claude-haiku-4-5-20251001", tokens) == 0.0014
+    with patch("sv_site.api_usage.get_settings",
+               return_value=make_test_settings(ai_pricing_path=str(tmp_path / "missing.yaml"))):
+        assert api_usage.estimate_cost("anthropic", "claude-haiku-4-5-20251001", tokens) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_record_api_call_appends_jsonl(tmp_path):
+    path = tmp_path / "api_calls.jsonl"
+    settings = make_test_settings(api_calls_log_path=str(path))
+
+    with patch("sv_site.api_usage.get_settings", return_value=settings):
+        api_usage.record_api_call(
+            service="anthropic",
+            model="claude-haiku-4-5-20251001",
+            operation="feedback_enrichment",
+            usage=USAGE,
+            metadata={"program_name": "test-app"},
+        )
+        await api_usage.flush()
+
+    row = json.loads(path.read_text().strip())
+    assert row["input_tokens"] == 1000
+    assert row["output_tokens"] == 200
+    assert row["cache_read_tokens"] == 0
+    assert row["estimated_cost_usd"] == 0.0016
+    assert row["source"] == "sv-site"
+    assert json.loads(row["metadata"]) == {"program_name": "test-app"}
+
+
+@pytest.mark.asyncio
+async def test_process_feedback_records_usage():
+    """Each enrichment call reports its usage tagged with the program name."""
+    from sv_site.feedback_processor import process_feedback
+
+    mock_message = MagicMock()
+    mock_message.usage = USAGE
+    mock_message.content = [
+        MagicMock(text='{"summary": "Good.", "sentiment": "positive", "tags": ["praise"]}')
+    ]
+    mock_client = AsyncMock()
+    mock_client.messages.create = AsyncMock(return_value=mock_message)
+
+    with patch("anthropic.AsyncAnthropic", return_value=mock_client), \
+         patch("sv_site.feedback_processor.record_api_call") as record:
+        await process_feedback(
+            raw_feedback="Nice tool!", score=9, program_name="test-app", api_key="fake-key",
+        )
+
+    record.assert_called_once()
+    kwargs = record.call_args.kwargs
+    assert kwargs["usage"] is USAGE
+    assert kwargs["operation"] == "feedback_enrichment"
+    assert kwargs["metadata"]["program_name"] == "test-app"
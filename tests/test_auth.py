@@ -0,0 +1,521 @@
+"""Tests for /api/auth routes and password hashing."""
+
+import asyncio
+import time
+
+import bcrypt
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sv_site.auth import create_access_token, decode_access_token
+from sv_common.auth.passwords import hash_password_async, verify_password, verify_password_async
+
+# Cost 4 keeps hashing fast in tests
+HASHED = bcrypt.hashpw(b"hunter22", bcrypt.gensalt(4)).decode()
+
+
+def make_user(**kwargs):
+    user = MagicMock()
+    user.id = kwargs.get("id", 7)
+    user.username = kwargs.get("username", "mike")
+    user.is_admin = kwargs.get("is_admin", False)
+    user.is_active = kwargs.get("is_active", True)
+    user.password_hash = kwargs.get("password_hash", HASHED)
+    user.permissions_version = kwargs.get("permissions_version", 1)
+    return user
+
+
+def slugs_result(slugs):
+    """db.execute() result for a `select(UserPermission.tool_slug)` query."""
+    result = MagicMock()
+    result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=slugs)))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Password helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_async_password_roundtrip():
+    hashed = await hash_password_async("s3cret!")
+    assert verify_password("s3cret!", hashed)
+    assert await verify_password_async("s3cret!", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_async_verify_does_not_block_event_loop():
+    """Other coroutines keep running while bcrypt works on the pool."""
+    slow_hash = bcrypt.hashpw(b"pw", bcrypt.gensalt(10)).decode()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await verify_password_async("pw", slow_hash)
+    elapsed = time.perf_counter() - started
+    task.cancel()
+
+    # A blocked loop would yield ~0 ticks; allow generous scheduler slack
+    assert ticks >= (elapsed / 0.001) * 0.2
+
+
+# ---------------------------------------------------------------------------
+# POST /api/auth/login
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_login_success(async_client, mock_db):
+    mock_db.execute = AsyncMock(return_value=slugs_result(["ideas", "book-club"]))
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=make_user())):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "hunter22"}
+        )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["username"] == "mike"
+
+    claims = decode_access_token(body["token"])
+    assert claims["perms"] == ["book-club", "ideas"]
+    assert claims["pv"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(async_client):
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=make_user())):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "nope"}
+        )
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_inactive_user(async_client):
+    user = make_user(is_active=False)
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=user)):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "hunter22"}
+        )
+    assert resp.status_code == 401
+
+
+# ---------------------------------------------------------------------------
+# Login throttling
+# ---------------------------------------------------------------------------
+
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    from sv_site.rate_limit import TokenBucket
+
+    bucket = TokenBucket("test", burst=3, per_minute=6)  # refill 1 token / 10 s
+    assert [bucket.take("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.take("k")
+    assert 9.0 < wait <= 10.0
+    assert bucket.take("other") == 0.0  # keys are independent
+
+
+@pytest.mark.asyncio
+async def test_login_throttled_per_username_before_db(async_client, test_settings):
+    test_settings.login_user_burst = 2
+    lookup = AsyncMock(return_value=make_user())
+    with patch("sv_site.routes.auth.get_user_by_username", lookup):
+        for _ in range(2):
+            resp = await async_client.post(
+                "/api/auth/login", json={"username": "Mike", "password": "nope"}
+            )
+            assert resp.status_code == 401
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike ", "password": "hunter22"}
+        )
+
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert lookup.await_count == 2  # the throttled attempt never reached the DB
+
+
+@pytest.mark.asyncio
+async def test_login_throttled_per_ip(async_client, test_settings):
+    test_settings.login_ip_burst = 1
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=None)):
+        first = await async_client.post(
+            "/api/auth/login", json={"username": "a", "password": "x"},
+            headers={"X-Real-IP": "203.0.113.7"},
+        )
+        same_ip = await async_client.post(
+            "/api/auth/login", json={"username": "b", "password": "x"},
+            headers={"X-Real-IP": "203.0.113.7"},
+        )
+        other_ip = await async_client.post(
+            "/api/auth/login", json={"username": "c", "password": "x"},
+            headers={"X-Real-IP": "198.51.100.2"},
+        )
+    assert first.status_code == 401
+    assert same_ip.status_code == 429
+    assert other_ip.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limit_postgres_mode(async_client, test_settings):
+    """Shared mode reads the bucket verdict from the upsert's RETURNING row."""
+    test_settings.login_rate_limit = "postgres"
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=(0.5, False))))
+    factory = MagicMock(return_value=MagicMock(
+        __aenter__=AsyncMock(return_value=session), __aexit__=AsyncMock(return_value=False)
+    ))
+    lookup = AsyncMock()
+    with patch("sv_site.rate_limit.get_session_factory", return_value=factory), \
+         patch("sv_site.routes.auth.get_user_by_username", lookup):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "hunter22"}
+        )
+
+    assert resp.status_code == 429
+    lookup.assert_not_awaited()
+    sql = str(session.execute.await_args_list[0].args[0])
+    assert "rate_limit_buckets" in sql
+
+
+def test_shared_bucket_keys_fit_column():
+    from sv_site.rate_limit import _shared_key
+
+    assert _shared_key("login_user", "mike") == "login_user:mike"
+    long_a, long_b = _shared_key("login_user", "a" * 255), _shared_key("login_user", "b" * 255)
+    assert len(long_a) <= 200 and long_a != long_b
+
+
+@pytest.mark.asyncio
+async def test_login_rejects_overlong_username(async_client):
+    lookup = AsyncMock()
+    with patch("sv_site.routes.auth.get_user_by_username", lookup):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "x" * 256, "password": "hunter22"}
+        )
+    assert resp.status_code == 422
+    lookup.assert_not_awaited()
+
+
+def test_login_rate_limit_mode_validated():
+    """A typo must fail at startup, not quietly fall back to per-worker buckets."""
+    from pydantic import ValidationError
+
+    from sv_site.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(login_rate_limit="postgresql")
+
+
+@pytest.mark.parametrize("rounds", [3, 32])
+def test_bcrypt_rounds_validated(rounds):
+    """bcrypt only accepts 4-31; anything else must fail at startup, not on first login."""
+    from pydantic import ValidationError
+
+    from sv_site.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(bcrypt_rounds=rounds)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/auth/me — permission claims
+# ---------------------------------------------------------------------------
+
+
+def claims_token(version=3, perms=("ideas",), user_id=7):
+    return create_access_token(
+        user_id=user_id, username="mike", is_admin=False,
+        permissions=list(perms), permissions_version=version,
+    )
+
+
+def version_result(version, is_active=True):
+    result = MagicMock()
+    row = MagicMock(permissions_version=version, is_active=is_active)
+    result.one_or_none = MagicMock(return_value=row)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_me_serves_claims_with_one_version_lookup(async_client, mock_db):
+    """Steady state: first call checks the version, later calls make no queries."""
+    from sv_site.tools import LOCKED_SLUGS
+
+    mock_db.execute = AsyncMock(return_value=version_result(3))
+    headers = {"Authorization": f"Bearer {claims_token()}"}
+
+    for _ in range(3):
+        resp = await async_client.get("/api/auth/me", headers=headers)
+        assert resp.status_code == 200
+    assert mock_db.execute.await_count == 1
+    assert set(resp.json()["permissions"]) == LOCKED_SLUGS | {"ideas"}
+
+
+@pytest.mark.asyncio
+async def test_me_stale_claims_fall_back_to_db(async_client, mock_db):
+    is_admin = MagicMock(scalar_one_or_none=MagicMock(return_value=False))
+    stored = MagicMock(all=MagicMock(return_value=[("book-club",)]))
+    mock_db.execute = AsyncMock(side_effect=[version_result(4), is_admin, stored])
+
+    resp = await async_client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {claims_token(version=3)}"}
+    )
+    assert resp.status_code == 200
+    assert "book-club" in resp.json()["permissions"]
+    assert "ideas" not in resp.json()["permissions"]
+
+
+@pytest.mark.asyncio
+async def test_me_rejects_token_of_deleted_user(async_client, mock_db):
+    gone = MagicMock(one_or_none=MagicMock(return_value=None))
+    mock_db.execute = AsyncMock(return_value=gone)
+    resp = await async_client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {claims_token()}"}
+    )
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_set_permissions_bumps_version_and_invalidates_cache(async_client, mock_db):
+    from sv_site.auth import _permissions_versions
+
+    _permissions_versions.set(7, 3)
+    target = MagicMock(id=7, is_admin=False, permissions_version=3)
+    found = MagicMock(scalar_one_or_none=MagicMock(return_value=target))
+    mock_db.execute = AsyncMock(return_value=found)
+    admin = create_access_token(user_id=1, username="admin", is_admin=True)
+
+    resp = await async_client.put(
+        "/api/admin/users/7/permissions",
+        json={"permissions": ["ideas"]},
+        headers={"Authorization": f"Bearer {admin}"},
+    )
+    assert resp.status_code == 200
+    bump = str(mock_db.execute.await_args_list[-1].args[0])
+    assert "permissions_version=(shadowedvaca.users.permissions_version +" in bump
+    mock_db.commit.assert_awaited()
+    assert _permissions_versions.get(7) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_permission_edits_each_bump_version(pg_client, pg_engine, pg_session):
+    """Two overlapping edits that both read version 1 must end at 3, not 2 —
+    otherwise a token issued between them matches the final version."""
+    from sqlalchemy import text
+
+    from sv_site.models import User
+
+    target = User(username="mike", password_hash="x")
+    pg_session.add(target)
+    await pg_session.commit()
+    admin = create_access_token(user_id=999, username="admin", is_admin=True)
+
+    async def edit(perms):
+        return await pg_client.put(
+            f"/api/admin/users/{target.id}/permissions",
+            json={"permissions": perms}, headers={"Authorization": f"Bearer {admin}"},
+        )
+
+    # Hold the user row so both requests load version 1 before either can bump it
+    async with pg_engine.connect() as blocker:
+        await blocker.execute(
+            text("SELECT 1 FROM shadowedvaca.users WHERE id = :id FOR UPDATE"), {"id": target.id}
+        )
+        edits = asyncio.gather(edit(["ideas"]), edit(["book-club"]))
+        await asyncio.sleep(0.3)
+        await blocker.rollback()
+        responses = await edits
+
+    assert [r.status_code for r in responses] == [200, 200]
+    await pg_session.refresh(target)
+    assert target.permissions_version == 3
+
+
+# ---------------------------------------------------------------------------
+# Verified-token cache
+# ---------------------------------------------------------------------------
+
+
+def test_token_cache_verifies_once():
+    from sv_site import auth
+
+    token = create_access_token(user_id=7, username="mike", is_admin=False)
+    with patch("sv_site.auth.decode_access_token", wraps=auth.decode_access_token) as decode:
+        first = auth.decode_access_token_cached(token)
+        first["is_admin"] = True  # callers get a copy
+        second = auth.decode_access_token_cached(token)
+    assert decode.call_count == 1
+    assert second["is_admin"] is False
+
+
+def test_token_cache_never_serves_expired_payload():
+    """Past exp the entry is gone, so the full decode (and its exp check) runs again."""
+    from sv_site import auth
+
+    token = create_access_token(user_id=7, username="mike", is_admin=False)
+    exp = auth.decode_access_token_cached(token)["exp"]
+
+    with patch("sv_site.cache.time.time", return_value=exp), \
+         patch("sv_site.auth.decode_access_token", side_effect=RuntimeError("expired")) as decode:
+        with pytest.raises(RuntimeError):
+            auth.decode_access_token_cached(token)
+    decode.assert_called_once_with(token)
+
+
+def test_token_cache_rejects_tampered_token():
+    import jwt as pyjwt
+
+    from sv_site.auth import decode_access_token_cached
+
+    token = create_access_token(user_id=7, username="mike", is_admin=False)
+    decode_access_token_cached(token)
+    head, body, sig = token.split(".")
+    with pytest.raises(pyjwt.InvalidTokenError):
+        decode_access_token_cached(f"{head}.{body}.{sig[:-2]}AA")
+
+
+# ---------------------------------------------------------------------------
+# Refresh-token rotation
+# ---------------------------------------------------------------------------
+
+
+def stored_refresh(raw="rt-1", **kwargs):
+    from datetime import datetime, timedelta, timezone
+
+    from sv_site.auth import _refresh_hash
+    from sv_site.models import RefreshToken
+
+    defaults = {
+        "id": 1, "user_id": 7, "token_hash": _refresh_hash(raw), "family_id": "fam",
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=1),
+        "used_at": None, "revoked_at": None,
+    }
+    defaults.update(kwargs)
+    return RefreshToken(**defaults)
+
+
+def token_result(row):
+    return MagicMock(scalar_one_or_none=MagicMock(return_value=row))
+
+
+@pytest.mark.asyncio
+async def test_login_returns_refresh_token(async_client, mock_db):
+    from sv_site.models import RefreshToken
+
+    mock_db.execute = AsyncMock(return_value=slugs_result([]))
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=make_user())):
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "hunter22"}
+        )
+    body = resp.json()
+    assert body["refreshToken"]
+    assert body["refreshExpiresAt"] > time.time()
+
+    stored = mock_db.add.call_args[0][0]
+    assert isinstance(stored, RefreshToken)
+    assert stored.token_hash != body["refreshToken"]  # only the hash is kept
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_token(async_client, mock_db):
+    row = stored_refresh()
+    mock_db.execute = AsyncMock(side_effect=[token_result(row), slugs_result(["ideas"])])
+    mock_db.get = AsyncMock(return_value=make_user())
+
+    resp = await async_client.post("/api/auth/refresh", json={"refresh_token": "rt-1"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["refreshToken"] != "rt-1"
+    assert decode_access_token(body["token"])["perms"] == ["ideas"]
+    assert row.used_at is not None
+
+    successor = mock_db.add.call_args[0][0]
+    assert successor.family_id == "fam"
+
+
+@pytest.mark.asyncio
+async def test_refresh_reuse_revokes_family(async_client, mock_db):
+    from datetime import datetime, timezone
+
+    row = stored_refresh(used_at=datetime.now(timezone.utc))
+    mock_db.execute = AsyncMock(side_effect=[token_result(row), MagicMock()])
+
+    resp = await async_client.post("/api/auth/refresh", json={"refresh_token": "rt-1"})
+    assert resp.status_code == 401
+    revoke_sql = str(mock_db.execute.await_args_list[1].args[0])
+    assert revoke_sql.startswith("UPDATE shadowedvaca.refresh_tokens")
+    mock_db.commit.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejects_unknown_and_expired(async_client, mock_db):
+    from datetime import datetime, timedelta, timezone
+
+    mock_db.execute = AsyncMock(return_value=token_result(None))
+    resp = await async_client.post("/api/auth/refresh", json={"refresh_token": "nope"})
+    assert resp.status_code == 401
+
+    expired = stored_refresh(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    mock_db.execute = AsyncMock(return_value=token_result(expired))
+    resp = await async_client.post("/api/auth/refresh", json={"refresh_token": "rt-1"})
+    assert resp.status_code == 401
+    assert expired.used_at is None
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_family(async_client, mock_db):
+    mock_db.execute = AsyncMock(side_effect=[token_result("fam"), MagicMock()])
+    resp = await async_client.post("/api/auth/logout", json={"refresh_token": "rt-1"})
+    assert resp.status_code == 200
+    assert "refresh_tokens" in str(mock_db.execute.await_args_list[1].args[0])
+
+
+# ---------------------------------------------------------------------------
+# bcrypt cost policy
+# ---------------------------------------------------------------------------
+
+
+def test_needs_rehash_compares_cost():
+    from sv_common.auth.passwords import hash_password, hash_rounds, needs_rehash
+
+    hashed = hash_password("pw", rounds=5)
+    assert hash_rounds(hashed) == 5
+    assert not needs_rehash(hashed, 5)
+    assert needs_rehash(hashed, 6)
+    assert hash_rounds("not-a-hash") is None
+
+
+@pytest.mark.asyncio
+async def test_login_schedules_rehash_when_cost_differs(async_client, mock_db, test_settings):
+    test_settings.bcrypt_rounds = 5  # HASHED is cost 4
+    mock_db.execute = AsyncMock(return_value=slugs_result([]))
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=make_user())), \
+         patch("sv_site.routes.auth.rehash_password", new_callable=AsyncMock) as rehash:
+        resp = await async_client.post(
+            "/api/auth/login", json={"username": "mike", "password": "hunter22"}
+        )
+    assert resp.status_code == 200
+    rehash.assert_awaited_once_with(7, "hunter22", HASHED, 5)
+
+
+@pytest.mark.asyncio
+async def test_login_skips_rehash_at_policy_cost(async_client, mock_db):
+    mock_db.execute = AsyncMock(return_value=slugs_result([]))
+    with patch("sv_site.routes.auth.get_user_by_username", AsyncMock(return_value=make_user())), \
+         patch("sv_site.routes.auth.rehash_password", new_callable=AsyncMock) as rehash:
+        await async_client.post("/api/auth/login", json={"username": "mike", "password": "hunter22"})
+    rehash.assert_not_awaited()
+
+
+def test_calibration_recommends_highest_cost_within_target():
+    from sv_site.calibrate_bcrypt import recommend
+
+    assert recommend({10: 60.0, 11: 120.0, 12: 240.0, 13: 480.0}, 250) == 12
+    assert recommend({10: 300.0}, 250) is None
@@ -0,0 +1,143 @@
+"""Tests for sv_site.compression and compressed cache entries."""
+
+import gzip
+
+import brotli
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from sv_site import compression, metrics, responses
+from sv_site.auth import create_access_token
+from sv_site.compression import CompressionMiddleware, choose_encoding
+from sv_site.responses import CachedBody, CachedJSONResponse
+from sv_site.routes import projects
+
+BIG = {"items": [{"id": i, "summary": "export times out on large programs"} for i in range(100)]}
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/big")
+async def big() -> dict:
+    return BIG
+
+
+@app.get("/small")
+async def small() -> dict:
+    return {"ok": True}
+
+
+@app.get("/stream")
+async def stream() -> StreamingResponse:
+    async def chunks():
+        for _ in range(50):
+            yield b"x" * 100
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+_cached = {"body": CachedBody.of(BIG)}
+
+
+@app.get("/cached")
+async def cached() -> CachedJSONResponse:
+    return CachedJSONResponse(_cached["body"])
+
+
+async def _get(path: str, accept_encoding: str | None) -> httpx.Response:
+    """GET `path`; accept_encoding=None sends no Accept-Encoding header at all."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        if accept_encoding is None:
+            del client.headers["Accept-Encoding"]
+            return await client.get(path)
+        return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"),
+    ("gzip;q=0, *;q=0", None),
+    ("identity", None),
+    ("", None),
+    ("gzip;q=bogus, br;q=0", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    assert choose_encoding("br") is None
+    assert choose_encoding("br, gzip") == "gzip"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+async def test_large_json_compressed(encoding):
+    resp = await _get("/big", encoding)
+    assert resp.headers["content-encoding"] == encoding
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert int(resp.headers["content-length"]) < len(responses.json_bytes(BIG))
+    assert resp.json() == BIG  # httpx decodes it
+
+
+@pytest.mark.asyncio
+async def test_small_identity_and_streamed_responses_left_alone():
+    for path, accept in (("/small", "gzip"), ("/big", "identity"), ("/stream", "gzip")):
+        resp = await _get(path, accept)
+        assert "content-encoding" not in resp.headers, path
+    assert len((await _get("/stream", "gzip")).content) == 5000
+
+
+@pytest.mark.asyncio
+async def test_vary_on_every_compressible_response(monkeypatch):
+    monkeypatch.setitem(_cached, "body", CachedBody.of(BIG))
+    for path in ("/big", "/small", "/cached"):
+        for accept in ("gzip", "br", "identity", None):
+            resp = await _get(path, accept)
+            assert resp.headers.get("vary") == "Accept-Encoding", (path, accept)
+    assert "vary" not in (await _get("/stream", "gzip")).headers
+
+
+@pytest.mark.asyncio
+async def test_cached_body_compressed_once(monkeypatch):
+    calls = []
+    real = responses.compress
+    monkeypatch.setattr(responses, "compress", lambda body, enc: calls.append(enc) or real(body, enc))
+    monkeypatch.setitem(_cached, "body", CachedBody.of(BIG))
+
+    for accept in ("gzip", "gzip", "br", "br", "identity"):
+        resp = await _get("/cached", accept)
+        assert resp.json() == BIG
+    assert calls == ["gzip", "br"]
+    assert (await _get("/cached", "identity")).headers.get("content-encoding") is None
+    assert gzip.decompress(_cached["body"].encoded("gzip")) == _cached["body"].raw
+    assert brotli.decompress(_cached["body"].encoded("br")) == _cached["body"].raw
+
+
+@pytest.mark.asyncio
+async def test_projects_cached_with_compressed_variant(async_client, monkeypatch):
+    upstream_calls = []
+
+    def handler(request):
+        upstream_calls.append(request.url.path)
+        return httpx.Response(200, json=[{"name": f"project-{i}", "phase": "build"} for i in range(60)])
+
+    monkeypatch.setattr(
+        projects, "upstream_transport",
+        lambda name, inner=None: metrics.upstream_transport(name, httpx.MockTransport(handler)),
+    )
+    token = create_access_token(user_id=1, username="u", is_admin=False)
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+    first = await async_client.get("/api/projects", headers=headers)
+    second = await async_client.get("/api/projects", headers=headers)
+
+    assert upstream_calls == ["/api/v1/projects"]
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.content == second.content
+    assert len(second.json()["projects"]) == 60
@@ -0,0 +1,406 @@
+"""Tests for engine configuration, pool warm-up and read/write routing in sv_site.database.
+
+The two-database tests at the bottom need real Postgres: point
+SV_TEST_DATABASE_URL and SV_TEST_READ_DATABASE_URL at two local databases
+(e.g. sv_test_primary and sv_test_replica). They are skipped otherwise.
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI, Request, Response
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, select, text
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sv_site import database
+from sv_site.database import READ_PIN_COOKIE, engine_options, get_db, get_read_db
+from sv_site.models import IdeaVote
+from sv_site.responses import JSONBytesResponse
+
+from tests.conftest import make_test_settings
+
+
+def test_engine_options_expose_pool_and_asyncpg_settings():
+    settings = make_test_settings(
+        db_pool_size=8,
+        db_max_overflow=2,
+        db_pool_recycle=600,
+        db_statement_cache_size=0,
+        db_statement_timeout_ms=15000,
+        db_application_name="sv-site-test",
+    )
+    opts = engine_options(settings)
+    assert opts["pool_size"] == 8
+    assert opts["max_overflow"] == 2
+    assert opts["pool_recycle"] == 600
+    assert opts["pool_pre_ping"] is True
+    assert opts["connect_args"] == {
+        "statement_cache_size": 0,
+        "server_settings": {"application_name": "sv-site-test", "statement_timeout": "15000"},
+    }
+
+
+def test_engine_options_omit_statement_timeout_by_default():
+    opts = engine_options(make_test_settings())
+    assert "statement_timeout" not in opts["connect_args"]["server_settings"]
+
+
+def test_engine_options_skip_connect_args_for_other_drivers():
+    settings = make_test_settings()
+    settings.database_url = "sqlite+aiosqlite://"
+    opts = engine_options(settings)
+    assert "connect_args" not in opts
+
+
+async def _never(*args):
+    await asyncio.Event().wait()
+
+
+def _fake_engine(fail: int = 0, hang: int = 0):
+    """Engine whose first `fail` connects are refused and next `hang` probes never answer."""
+    opened = []
+
+    def connect():
+        conn = MagicMock()
+        conn.execute = AsyncMock()
+        conn.close = AsyncMock()
+
+        async def start():
+            if len(opened) < fail:
+                opened.append(None)
+                raise OSError("connection refused")
+            if len(opened) < fail + hang:
+                conn.execute.side_effect = _never
+            opened.append(conn)
+            return conn
+
+        conn.start = start
+        return conn
+
+    engine = MagicMock()
+    engine.connect = connect
+    return engine, opened
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_opens_and_returns_connections():
+    engine, opened = _fake_engine()
+    with patch.object(database, "get_engine", return_value=engine):
+        assert await database.warm_pool(3) == 3
+    assert len(opened) == 3
+    for conn in opened:
+        conn.execute.assert_awaited_once()
+        conn.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_tolerates_failures():
+    engine, _ = _fake_engine(fail=2)
+    with patch.object(database, "get_engine", return_value=engine):
+        assert await database.warm_pool(3) == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_timeout_returns_every_opened_connection():
+    engine, opened = _fake_engine(hang=1)
+    with patch.object(database, "get_engine", return_value=engine):
+        assert await database.warm_pool(3, timeout=0.05) == 2
+    assert len(opened) == 3
+    for conn in opened:
+        conn.close.assert_awaited_once()
+
+
+# ---------------------------------------------------------------------------
+# Read/write routing
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    """Fresh engine globals and a settings object the module reads directly."""
+    settings = make_test_settings()
+    for name in ("_engine", "_session_factory", "_read_engine", "_read_session_factory"):
+        monkeypatch.setattr(database, name, None)
+    monkeypatch.setattr(database, "_readonly_factories", {})
+    monkeypatch.setattr(database, "get_settings", lambda: settings)
+    return settings
+
+
+def _request(cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "headers": headers})
+
+
+def _fake_factory():
+    session = MagicMock()
+    session.info = {}
+    session.new = session.dirty = session.deleted = ()
+    session.in_transaction = MagicMock(return_value=True)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(return_value=cm), session
+
+
+async def _drain(gen):
+    with pytest.raises(StopAsyncIteration):
+        await gen.__anext__()
+
+
+def test_read_factory_falls_back_to_primary(routing):
+    assert database.get_read_session_factory() is database.get_session_factory()
+    assert database.get_read_engine() is database.get_engine()
+
+
+def test_read_factory_uses_replica_engine_when_configured(routing):
+    routing.database_read_url = "postgresql+asyncpg://replica/shadowedvaca"
+    assert database.get_read_engine() is not database.get_engine()
+    assert database.get_read_engine().url.host == "replica"
+    assert database.get_read_session_factory() is not database.get_session_factory()
+
+
+@pytest.mark.parametrize("state, wrote", [
+    (SimpleNamespace(is_insert=False, is_update=False, is_delete=False,
+                     statement=select(IdeaVote)), False),
+    (SimpleNamespace(is_insert=True, is_update=False, is_delete=False,
+                     statement=insert(IdeaVote)), True),
+    (SimpleNamespace(is_insert=False, is_update=False, is_delete=True,
+                     statement=delete(IdeaVote)), True),
+    (SimpleNamespace(is_insert=False, is_update=False, is_delete=False,
+                     statement=text("  select 1")), False),
+    (SimpleNamespace(is_insert=False, is_update=False, is_delete=False,
+                     statement=text("INSERT INTO t VALUES (1)")), True),
+])
+def test_is_write(state, wrote):
+    assert database._is_write(state) is wrote
+
+
+def _pin_app(factory) -> FastAPI:
+    """Routes that write the ways handlers do, behind ReadPinMiddleware."""
+    pin_app = FastAPI()
+    pin_app.add_middleware(database.ReadPinMiddleware)
+
+    @pin_app.post("/api/own-response")
+    async def own_response(db=Depends(get_db)) -> Response:
+        database._mark_written(db)  # e.g. an executed UPDATE
+        return JSONBytesResponse(b'{"ok":true}')
+
+    @pin_app.post("/api/commit-only")
+    async def commit_only(db=Depends(get_db)) -> dict:
+        db.new = (object(),)  # db.add() with nothing flushed until the exit-time commit
+        return {"ok": True}
+
+    @pin_app.get("/api/read")
+    async def read(db=Depends(get_db)) -> dict:
+        return {"ok": True}
+
+    return pin_app
+
+
+async def _pin_cookies(factory, method: str, path: str) -> list[str]:
+    with patch.object(database, "get_session_factory", return_value=factory):
+        transport = ASGITransport(app=_pin_app(factory))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.request(method, path)
+    assert resp.status_code == 200
+    return resp.headers.get_list("set-cookie")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api/own-response", "/api/commit-only"])
+async def test_write_sets_pin_cookie(routing, path):
+    routing.database_read_url = "postgresql+asyncpg://replica/shadowedvaca"
+    factory, session = _fake_factory()
+
+    async def commit():
+        if session.new:
+            database._mark_written(session)
+            session.new = ()
+        database._on_transaction_end(session)
+
+    session.commit = AsyncMock(side_effect=commit)
+    cookies = await _pin_cookies(factory, "POST", path)
+
+    session.commit.assert_awaited_once()
+    assert len(cookies) == 1
+    assert cookies[0].startswith(f"{READ_PIN_COOKIE}=1")
+    assert "Max-Age=5" in cookies[0]
+
+
+@pytest.mark.asyncio
+async def test_no_pin_cookie_for_reads_or_without_replica(routing):
+    routing.database_read_url = "postgresql+asyncpg://replica/shadowedvaca"
+    factory, _ = _fake_factory()
+    assert await _pin_cookies(factory, "GET", "/api/read") == []
+
+    routing.database_read_url = ""
+    factory, _ = _fake_factory()
+    assert await _pin_cookies(factory, "POST", "/api/own-response") == []
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_honours_pin_cookie(routing):
+    primary, primary_session = _fake_factory()
+    replica, replica_session = _fake_factory()
+    with patch.object(database, "get_session_factory", return_value=primary), \
+         patch.object(database, "get_read_session_factory", return_value=replica):
+        gen = get_read_db(_request())
+        assert await gen.__anext__() is replica_session
+        await _drain(gen)
+
+        gen = get_read_db(_request(f"{READ_PIN_COOKIE}=1"))
+        assert await gen.__anext__() is primary_session
+        await _drain(gen)
+
+    replica_session.commit.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Lazy commit and read-only sessions
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_get_db_skips_commit_without_writes(routing):
+    factory, session = _fake_factory()
+    with patch.object(database, "get_session_factory", return_value=factory):
+        gen = get_db(_request())
+        await gen.__anext__()
+        await _drain(gen)
+    session.commit.assert_not_awaited()
+    session.rollback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_db_commits_pending_writes_once(routing):
+    factory, session = _fake_factory()
+    with patch.object(database, "get_session_factory", return_value=factory):
+        # Written and left for the dependency to commit
+        gen = get_db(_request())
+        await gen.__anext__()
+        database._mark_written(session)
+        await _drain(gen)
+        session.commit.assert_awaited_once()
+
+        # Handler committed itself — nothing left to do
+        session.commit.reset_mock()
+        session.info.clear()
+        gen = get_db(_request())
+        await gen.__anext__()
+        database._mark_written(session)
+        database._on_transaction_end(session)
+        await _drain(gen)
+        session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_db_commits_unflushed_objects(routing):
+    factory, session = _fake_factory()
+    with patch.object(database, "get_session_factory", return_value=factory):
+        gen = get_db(_request())
+        await gen.__anext__()
+        session.new = (object(),)
+        await _drain(gen)
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_db_rolls_back_on_error(routing):
+    factory, session = _fake_factory()
+    with patch.object(database, "get_session_factory", return_value=factory):
+        gen = get_db(_request())
+        await gen.__anext__()
+        database._mark_written(session)
+        with pytest.raises(RuntimeError):
+            await gen.athrow(RuntimeError("boom"))
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_opens_readonly_sessions(routing):
+    factory, _ = _fake_factory()
+    with patch.object(database, "get_read_session_factory", return_value=factory) as read:
+        gen = get_read_db(_request())
+        await gen.__anext__()
+        await _drain(gen)
+    read.assert_called_once_with(True)
+
+
+def test_readonly_factory_shares_the_pool(routing):
+    factory = database.get_session_factory()
+    readonly = database.get_session_factory(readonly=True)
+    assert readonly is database.get_session_factory(readonly=True)
+    engine = readonly.kw["bind"]
+    assert engine.get_execution_options()["postgresql_readonly"] is True
+    assert engine.sync_engine.pool is factory.kw["bind"].sync_engine.pool
+
+
+# ---------------------------------------------------------------------------
+# Two real databases
+# ---------------------------------------------------------------------------
+
+PRIMARY_URL = os.environ.get("SV_TEST_DATABASE_URL", "")
+REPLICA_URL = os.environ.get("SV_TEST_READ_DATABASE_URL", "")
+
+needs_two_databases = pytest.mark.skipif(
+    not (PRIMARY_URL and REPLICA_URL),
+    reason="set SV_TEST_DATABASE_URL and SV_TEST_READ_DATABASE_URL to two local databases",
+)
+
+
+@pytest.fixture
+async def two_databases(routing):
+    routing.database_url = PRIMARY_URL
+    routing.database_read_url = REPLICA_URL
+    yield routing
+    await database.dispose_engine()
+
+
+async def _database_name(session) -> str:
+    return (await session.execute(text("SELECT current_database()"))).scalar_one()
+
+
+@needs_two_databases
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_and_writes_to_primary(two_databases):
+    async with database.get_session_factory()() as db:
+        primary = await _database_name(db)
+    async with database.get_read_session_factory()() as db:
+        replica = await _database_name(db)
+    assert primary != replica
+
+    gen = get_read_db(_request())
+    assert await _database_name(await gen.__anext__()) == replica
+    await _drain(gen)
+
+    request = _request()
+    gen = get_db(request)
+    db = await gen.__anext__()
+    assert await _database_name(db) == primary
+    await db.execute(text("CREATE TEMP TABLE pin_probe (id int)"))
+    await _drain(gen)
+    assert database.request_wrote(request.scope["state"])
+
+    gen = get_read_db(_request(f"{READ_PIN_COOKIE}=1"))
+    assert await _database_name(await gen.__anext__()) == primary
+    await _drain(gen)
+
+
+@needs_two_databases
+@pytest.mark.asyncio
+async def test_readonly_sessions_reject_writes(two_databases):
+    from sqlalchemy.exc import DBAPIError
+
+    async with database.get_session_factory(readonly=True)() as db:
+        assert (await db.execute(text("SHOW transaction_read_only"))).scalar_one() == "on"
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await db.execute(text("CREATE TEMP TABLE readonly_probe (id int)"))
+
+    async with database.get_session_factory()() as db:
+        assert (await db.execute(text("SHOW transaction_read_only"))).scalar_one() == "off"
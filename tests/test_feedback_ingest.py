@@ -236,3 +236,18 @@ async def test_process_feedback_unknown_sentiment_defaults_neutral():
         )
 
     assert result["sentiment"] == "neutral"
+
+
+@pytest.mark.asyncio
+async def test_ingest_updates_daily_rollup(async_client, mock_db):
+    """Ingest bumps feedback_daily_stats in the same transaction as the insert."""
+    with patch("sv_site.routes.feedback_ingest.process_feedback", return_value=AI_OK), \
+         patch("sv_site.routes.feedback_ingest.record_ingest", new_callable=AsyncMock) as rollup:
+        resp = await async_client.post(
+            "/api/feedback/ingest",
+            json=VALID_PAYLOAD,
+            headers={"X-Ingest-Key": TEST_INGEST_KEY},
+        )
+
+    assert resp.status_code == 200
+    rollup.assert_awaited_once_with(mock_db, "test-app", 8, "positive", ["praise"])
@@ -6,11 +6,12 @@ from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timezone
 
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, text
 
 from sv_site.auth import create_access_token
-from sv_site.database import get_db
+from sv_site.database import get_db, get_read_db
 from sv_site.main import app
-from sv_site.models import CustomerFeedback
+from sv_site.models import CustomerFeedback, FeedbackProgram
 
 
 # ---------------------------------------------------------------------------
@@ -55,6 +56,7 @@ async def admin_client():
     db.commit = AsyncMock()
 
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
 
     token = make_jwt(is_admin=True)
     async with AsyncClient(
@@ -72,6 +74,7 @@ async def user_client():
     """AsyncClient with non-admin JWT."""
     db = AsyncMock()
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
 
     token = make_jwt(is_admin=False)
     async with AsyncClient(
@@ -92,6 +95,7 @@ def _mock_execute(records=None, total=None):
         if total is not None and hasattr(result, 'scalar_one'):
             result.scalar_one = MagicMock(return_value=total)
         result.scalar_one = MagicMock(return_value=total if total is not None else 0)
+        result.scalar = result.scalar_one  # table version (feedback_counts)
         # Rows query (scalars().all())
         scalars_mock = MagicMock()
         scalars_mock.all = MagicMock(return_value=records if records is not None else [])
@@ -118,6 +122,7 @@ async def test_feedback_read_no_auth():
     """No JWT → 401."""
     db = AsyncMock()
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
     try:
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
@@ -327,19 +332,497 @@ async def test_privacy_token_truncated_in_response(admin_client):
 
 @pytest.mark.asyncio
 async def test_programs_endpoint_returns_distinct(admin_client):
-    """Programs endpoint returns sorted distinct program names."""
+    """Programs come from the feedback_programs registry, with counts."""
+    seen = datetime(2026, 3, 10, tzinfo=timezone.utc)
+    registry = [
+        FeedbackProgram(program_name="patt-guild-portal", feedback_count=3,
+                        first_seen=seen, last_seen=seen),
+        FeedbackProgram(program_name="salt-podcast", feedback_count=12,
+                        first_seen=seen, last_seen=seen),
+    ]
+    queries = []
+
     async def execute(query):
+        queries.append(str(query))
         result = MagicMock()
-        result.scalars = MagicMock(
-            return_value=MagicMock(
-                all=MagicMock(return_value=["salt-podcast", "patt-guild-portal"])
-            )
-        )
+        result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=registry)))
         return result
 
     admin_client._test_db.execute = execute
 
     resp = await admin_client.get("/api/hub/feedback/programs")
     assert resp.status_code == 200
-    programs = resp.json()["data"]["programs"]
-    assert programs == ["patt-guild-portal", "salt-podcast"]  # sorted
+    data = resp.json()["data"]
+    assert data["programs"] == ["patt-guild-portal", "salt-podcast"]
+    assert data["details"][1]["feedback_count"] == 12
+    assert "feedback_programs" in queries[0]
+    assert "customer_feedback" not in queries[0]
+
+
+@pytest.mark.asyncio
+async def test_record_ingest_bumps_program_registry():
+    from sv_site.feedback_rollups import record_ingest
+
+    db = AsyncMock()
+    await record_ingest(db, "salt-podcast", 9, "positive", ["praise"])
+    sql = [str(c.args[0]) for c in db.execute.await_args_list]
+    assert any("feedback_programs" in q and "ON CONFLICT (program_name)" in q for q in sql)
+    assert any("feedback_daily_stats" in q for q in sql)
+
+
+# ---------------------------------------------------------------------------
+# Keyset pagination
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_feedback_read_full_page_returns_next_cursor(admin_client):
+    """A full page yields next_cursor = last row's <received_at>,<id>."""
+    rec1 = make_record(id=7, received_at=datetime(2026, 3, 10, 12, 0, 0, tzinfo=timezone.utc))
+    rec2 = make_record(id=5, received_at=datetime(2026, 3, 9, 12, 0, 0, tzinfo=timezone.utc))
+    admin_client._test_db.execute = _mock_execute(records=[rec1, rec2], total=10)
+
+    resp = await admin_client.get("/api/hub/feedback?limit=2")
+    assert resp.status_code == 200
+    assert resp.json()["data"]["next_cursor"] == "2026-03-09T12:00:00+00:00,5"
+
+
+@pytest.mark.asyncio
+async def test_feedback_read_short_page_has_no_cursor(admin_client):
+    admin_client._test_db.execute = _mock_execute(records=[make_record()], total=1)
+
+    resp = await admin_client.get("/api/hub/feedback?limit=2")
+    assert resp.json()["data"]["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_feedback_read_before_cursor_uses_keyset(admin_client):
+    """before= adds a row-value comparison instead of OFFSET."""
+    queries = []
+
+    async def execute(query):
+        queries.append(str(query))
+        return await _mock_execute(records=[], total=0)(query)
+
+    admin_client._test_db.execute = execute
+
+    resp = await admin_client.get(
+        "/api/hub/feedback", params={"before": "2026-03-09T12:00:00+00:00,5"}
+    )
+    assert resp.status_code == 200
+    data_sql = queries[-1]
+    assert "(shadowedvaca.customer_feedback.received_at, shadowedvaca.customer_feedback.id) <" in data_sql
+    assert "OFFSET" not in data_sql
+
+
+@pytest.mark.asyncio
+async def test_feedback_read_invalid_cursor(admin_client):
+    admin_client._test_db.execute = _mock_execute(records=[], total=0)
+
+    resp = await admin_client.get("/api/hub/feedback?before=not-a-cursor")
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_feedback_read_before_and_offset_conflict(admin_client):
+    resp = await admin_client.get(
+        "/api/hub/feedback", params={"before": "2026-03-09T12:00:00+00:00,5", "offset": 10}
+    )
+    assert resp.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Count strategies
+# ---------------------------------------------------------------------------
+
+
+def _recording_execute(records, total):
+    queries = []
+    inner = _mock_execute(records=records, total=total)
+
+    async def execute(query):
+        queries.append(query)
+        return await inner(query)
+
+    return execute, queries
+
+
+@pytest.mark.asyncio
+async def test_feedback_count_cached_per_filter(admin_client):
+    """Second identical request finds the table version unchanged and reuses
+    the cached total — no second count(*)."""
+    execute, queries = _recording_execute([make_record()], 3)
+    admin_client._test_db.execute = execute
+
+    first = await admin_client.get("/api/hub/feedback?sentiment=positive")
+    second = await admin_client.get("/api/hub/feedback?sentiment=positive")
+
+    assert first.json()["data"]["total"] == 3
+    assert second.json()["data"]["total"] == 3
+    assert len(queries) == 5  # version + count + page, then version + page
+    assert sum("count(*)" in str(q) for q in queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_feedback_count_recounted_when_table_version_changes(admin_client):
+    """Any change to customer_feedback, in any worker, moves feedback_version,
+    so a cached total from before it is not reused."""
+    versions = iter([41, 42])
+    totals = iter([3, 4])
+
+    async def execute(query):
+        sql = str(query)
+        result = MagicMock()
+        if "feedback_version" in sql:
+            result.scalar = MagicMock(return_value=next(versions))
+        elif "count(*)" in sql:
+            result.scalar_one = MagicMock(return_value=next(totals))
+        else:
+            result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[make_record()])))
+        return result
+
+    admin_client._test_db.execute = execute
+
+    first = await admin_client.get("/api/hub/feedback")
+    second = await admin_client.get("/api/hub/feedback")
+    assert first.json()["data"]["total"] == 3
+    assert second.json()["data"]["total"] == 4
+
+
+async def _apply_version_migration(engine) -> None:
+    sql = open("scripts/migrations/add_feedback_version.sql").read()
+    sql = "\n".join(line for line in sql.splitlines() if not line.startswith("GRANT"))
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.execute(sql)  # asyncpg runs multi-statement scripts
+
+
+def _pg_feedback(id_: int, **kwargs) -> CustomerFeedback:
+    return CustomerFeedback(
+        id=id_, program_name="test-app", score=5, raw_feedback=f"fb {id_}",
+        is_authenticated_user=False, is_anonymous=True, **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_feedback_count_cache_sees_late_commits_and_deletes(pg_client, pg_engine, pg_session):
+    """A lower id committing after a higher one, with failed enrichment
+    (processed_at NULL), moves neither max(id) nor max(processed_at) — the
+    change counter still moves. So does a delete made outside the app."""
+    from sv_site.feedback_counts import bump_feedback_version
+
+    await _apply_version_migration(pg_engine)
+    pg_session.add(_pg_feedback(2, processed_at=datetime(2026, 3, 10, tzinfo=timezone.utc)))
+    await pg_session.commit()
+    headers = {"Authorization": f"Bearer {make_jwt(is_admin=True)}"}
+
+    async def total() -> int:
+        resp = await pg_client.get("/api/hub/feedback", headers=headers)
+        return resp.json()["data"]["total"]
+
+    async with pg_engine.connect() as late:
+        # An ingest that got id 1 but is still waiting on its AI call
+        await late.execute(insert(CustomerFeedback).values(
+            id=1, program_name="test-app", score=5, raw_feedback="fb 1",
+            is_authenticated_user=False, is_anonymous=True, processing_error="timeout",
+        ))
+        await bump_feedback_version(late)
+        assert await total() == 1  # cached while the ingest is in flight
+        await late.commit()
+
+    assert await total() == 2
+
+    async with pg_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM shadowedvaca.customer_feedback WHERE id = 2"))
+    assert await total() == 1
+
+
+@pytest.mark.asyncio
+async def test_feedback_count_none_skips_count(admin_client):
+    execute, queries = _recording_execute([make_record()], 3)
+    admin_client._test_db.execute = execute
+
+    resp = await admin_client.get("/api/hub/feedback?count=none")
+    assert resp.json()["data"]["total"] is None
+    assert len(queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_feedback_count_estimate_uses_explain(admin_client):
+    """count=estimate reads Plan Rows from EXPLAIN instead of counting."""
+    rec = make_record()
+    call_count = [0]
+
+    async def execute(query):
+        call_count[0] += 1
+        result = MagicMock()
+        if call_count[0] == 1:
+            result.scalar_one = MagicMock(return_value='[{"Plan": {"Plan Rows": 12345}}]')
+        else:
+            result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[rec])))
+        return result
+
+    admin_client._test_db.execute = execute
+
+    resp = await admin_client.get("/api/hub/feedback?count=estimate")
+    data = resp.json()["data"]
+    assert data["total"] == 12345
+    assert data["total_is_estimate"] is True
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_feedback_search_returns_rank_and_snippet(admin_client):
+    """?q= matches via search_vector / trigram and returns ranked rows with snippets."""
+    rec = make_record(id=3, raw_feedback="The export button crashes")
+    queries = []
+
+    async def execute(query):
+        queries.append(str(query))
+        result = MagicMock()
+        result.scalar_one = MagicMock(return_value=1)
+        row = MagicMock()
+        row.__getitem__ = MagicMock(return_value=rec)
+        row.rank = 0.42
+        row.snippet = "The export button <mark>crashes</mark>"
+        result.all = MagicMock(return_value=[row])
+        return result
+
+    admin_client._test_db.execute = execute
+
+    resp = await admin_client.get("/api/hub/feedback", params={"q": "crash"})
+    assert resp.status_code == 200
+    item = resp.json()["data"]["feedback"][0]
+    assert item["id"] == 3
+    assert item["rank"] == 0.42
+    assert "<mark>crashes</mark>" in item["snippet"]
+    assert resp.json()["data"]["next_cursor"] is None
+
+    data_sql = queries[-1]
+    assert "@@ websearch_to_tsquery" in data_sql
+    assert "<%" in data_sql
+    assert "ts_headline" in data_sql
+
+
+@pytest.mark.asyncio
+async def test_feedback_search_rejects_cursor(admin_client):
+    resp = await admin_client.get(
+        "/api/hub/feedback", params={"q": "crash", "before": "2026-03-09T12:00:00+00:00,5"}
+    )
+    assert resp.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Column projection + detail endpoint
+# ---------------------------------------------------------------------------
+
+
+def _projection_execute(rows, queries):
+    async def execute(query):
+        queries.append(str(query))
+        result = MagicMock()
+        result.scalar_one = MagicMock(return_value=len(rows))
+        result.all = MagicMock(return_value=rows)
+        return result
+
+    return execute
+
+
+@pytest.mark.asyncio
+async def test_feedback_summary_view_skips_raw_feedback(admin_client):
+    """view=summary selects columns as rows — raw_feedback is never read."""
+    row = MagicMock(spec=[])
+    for k, v in make_record(privacy_token="abcdef1234567890").__dict__.items():
+        if not k.startswith("_") and k != "raw_feedback":
+            setattr(row, k, v)
+    queries = []
+    admin_client._test_db.execute = _projection_execute([row], queries)
+
+    resp = await admin_client.get("/api/hub/feedback", params={"view": "summary", "count": "none"})
+    assert resp.status_code == 200
+    item = resp.json()["data"]["feedback"][0]
+    assert "raw_feedback" not in item
+    assert item["summary"] == "User found the tool useful."
+    assert item["privacy_token"] == "abcdef12…"
+    assert "raw_feedback" not in queries[-1]
+
+
+@pytest.mark.asyncio
+async def test_feedback_fields_always_include_cursor_columns(admin_client):
+    row = MagicMock(spec=[])
+    row.id, row.received_at, row.score = 4, datetime(2026, 3, 9, tzinfo=timezone.utc), 7
+    queries = []
+    admin_client._test_db.execute = _projection_execute([row], queries)
+
+    resp = await admin_client.get(
+        "/api/hub/feedback", params={"fields": "score", "limit": 1, "count": "none"}
+    )
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["feedback"] == [{"id": 4, "received_at": "2026-03-09T00:00:00+00:00", "score": 7}]
+    assert data["next_cursor"] == "2026-03-09T00:00:00+00:00,4"
+
+
+@pytest.mark.asyncio
+async def test_feedback_fields_rejects_unknown(admin_client):
+    resp = await admin_client.get("/api/hub/feedback", params={"fields": "score,password"})
+    assert resp.status_code == 400
+    assert "password" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_feedback_detail_returns_raw_feedback(admin_client):
+    admin_client._test_db.get = AsyncMock(return_value=make_record(id=9, raw_feedback="x" * 5000))
+    resp = await admin_client.get("/api/hub/feedback/9")
+    assert resp.status_code == 200
+    assert resp.json()["data"]["raw_feedback"] == "x" * 5000
+
+
+@pytest.mark.asyncio
+async def test_feedback_detail_not_found(admin_client):
+    admin_client._test_db.get = AsyncMock(return_value=None)
+    resp = await admin_client.get("/api/hub/feedback/404")
+    assert resp.status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# Stats endpoint (rollup-backed)
+# ---------------------------------------------------------------------------
+
+
+def _stat(program, day, count, score_sum, score_count, sentiments, tags):
+    from sv_site.models import FeedbackDailyStat
+
+    return FeedbackDailyStat(
+        program_name=program, day=day, feedback_count=count, score_sum=score_sum,
+        score_count=score_count, sentiment_counts=sentiments, tag_counts=tags,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stats_requires_admin(user_client):
+    resp = await user_client.get("/api/hub/feedback/stats")
+    assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_stats_weekly_folds_daily_rollups(admin_client):
+    """Mon + Wed of the same ISO week merge into one bucket; totals span the window."""
+    from datetime import date
+
+    rows = [
+        _stat("app", date(2026, 3, 9), 2, 15, 2, {"positive": 2}, {"praise": 2}),
+        _stat("app", date(2026, 3, 11), 1, 3, 1, {"negative": 1}, {"bug report": 1, "praise": 0}),
+        _stat("app", date(2026, 3, 16), 1, 9, 1, {"positive": 1}, {}),
+    ]
+    admin_client._test_db.execute = _mock_execute(records=rows)
+
+    resp = await admin_client.get("/api/hub/feedback/stats?granularity=week&days=730")
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert [s["period_start"] for s in data["series"]] == ["2026-03-09", "2026-03-16"]
+    week1 = data["series"][0]
+    assert week1["count"] == 3
+    assert week1["mean_score"] == 6.0
+    assert week1["sentiment"] == {"positive": 2, "negative": 1}
+    assert week1["tags"] == {"praise": 2, "bug report": 1}
+    assert data["totals"]["app"]["count"] == 4
+
+
+def test_enrichment_deltas_move_counts_from_old_to_new():
+    from types import SimpleNamespace
+    from sv_site.feedback_rollups import enrichment_deltas
+
+    before = [SimpleNamespace(
+        id=1, program_name="app", received_at=datetime(2026, 3, 10, 23, 30, tzinfo=timezone.utc),
+        sentiment="neutral", tags=["other"],
+    )]
+    updates = [{"id": 1, "sentiment": "negative", "tags": ["bug report", "other"]}]
+
+    deltas = enrichment_deltas(before, updates)
+    (key, (sentiments, tags)), = deltas.items()
+    assert key == ("app", datetime(2026, 3, 10).date())
+    assert dict(sentiments) == {"neutral": -1, "negative": 1}
+    assert {k: v for k, v in tags.items() if v} == {"bug report": 1}
+
+
+# ---------------------------------------------------------------------------
+# Streaming export
+# ---------------------------------------------------------------------------
+
+
+def _streaming_factory(records):
+    """get_read_session_factory() stand-in whose session.stream() yields records."""
+    statements = []
+
+    class _Result:
+        def __aiter__(self):
+            async def gen():
+                for r in records:
+                    yield r
+            return gen()
+
+    def factory():
+        db = AsyncMock()
+
+        async def stream(stmt):
+            statements.append(stmt)
+            return _Result()
+
+        db.stream = stream
+        db.__aenter__ = AsyncMock(return_value=db)
+        db.__aexit__ = AsyncMock(return_value=False)
+        return db
+
+    factory.statements = statements
+    return lambda readonly=False: factory
+
+
+@pytest.mark.asyncio
+async def test_export_requires_admin(user_client):
+    resp = await user_client.get("/api/hub/feedback/export")
+    assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_filtered_rows(admin_client):
+    import json
+    from unittest.mock import patch
+
+    records = [make_record(id=2), make_record(id=1, tags=None)]
+    factory = _streaming_factory(records)
+    with patch("sv_site.routes.feedback_read.get_read_session_factory", factory):
+        resp = await admin_client.get("/api/hub/feedback/export?format=ndjson&sentiment=positive")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(l) for l in resp.text.splitlines()]
+    assert [l["id"] for l in lines] == [2, 1]
+    assert lines[1]["tags"] == []
+    stmt = str(factory().statements[0])
+    assert "customer_feedback.sentiment =" in stmt
+    assert "search_vector" not in stmt
+
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip(admin_client):
+    import csv
+    import gzip
+    import io
+    from unittest.mock import patch
+
+    records = [make_record(id=1, tags=["praise", "ui/ux"], raw_feedback='Says "hi",\nthen leaves')]
+    with patch("sv_site.routes.feedback_read.get_read_session_factory", _streaming_factory(records)):
+        resp = await admin_client.get("/api/hub/feedback/export?format=csv&gzip=true")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/gzip"
+    assert resp.headers["content-disposition"].endswith('.csv.gz"')
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(resp.content).decode())))
+    assert rows[0]["id"] == "1"
+    assert rows[0]["tags"] == "praise; ui/ux"
+    assert rows[0]["raw_feedback"] == 'Says "hi",\nthen leaves'
@@ -0,0 +1,120 @@
+"""Tests for GET /api/health/deep (sv_site.health)."""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sv_site import health, metrics
+
+from tests.conftest import make_test_settings
+
+
+def _engine(checked_out: int = 1, delay: float = 0.0, fail: bool = False):
+    conn = MagicMock()
+
+    async def execute(_stmt):
+        if fail:
+            raise OSError("connection refused to db.internal:5432")
+        await asyncio.sleep(delay)
+
+    conn.execute = execute
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=conn)
+    cm.__aexit__ = AsyncMock(return_value=False)
+
+    engine = MagicMock()
+    engine.connect = MagicMock(return_value=cm)
+    pool = engine.sync_engine.pool
+    pool.checkedout.return_value = checked_out
+    pool.size.return_value = 5
+    pool.overflow.return_value = -4
+    return engine
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Fake primary engine and sv-tools; returns a dict to tweak them."""
+    state = {"engine": _engine(), "sv_tools_status": 200, "sv_tools_calls": 0}
+    settings = make_test_settings(health_probe_timeout=0.2, health_cache_seconds=30)
+
+    def handler(request):
+        state["sv_tools_calls"] += 1
+        return httpx.Response(state["sv_tools_status"])
+
+    monkeypatch.setattr(health, "get_settings", lambda: settings)
+    monkeypatch.setattr(health, "get_engine", lambda: state["engine"])
+    monkeypatch.setattr(health, "read_replica_configured", lambda: False)
+    monkeypatch.setattr(
+        health, "upstream_transport",
+        lambda name, inner=None: metrics.upstream_transport(name, httpx.MockTransport(handler)),
+    )
+    return state
+
+
+@pytest.mark.asyncio
+async def test_deep_health_reports_each_dependency(async_client, probes):
+    resp = await async_client.get("/api/health/deep")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["ok"] is True
+    assert body["cached"] is False
+    checks = body["checks"]
+    assert set(checks) == {"database", "sv_tools", "db_pool"}
+    assert checks["database"]["ok"] and checks["database"]["latency_ms"] >= 0
+    assert checks["sv_tools"] == {"ok": True, "status": 200, "latency_ms": checks["sv_tools"]["latency_ms"]}
+    assert checks["db_pool"] == {
+        "ok": True, "size": 5, "checked_out": 1, "overflow": 0, "capacity": 15, "saturation": 0.067,
+    }
+
+
+@pytest.mark.asyncio
+async def test_slow_database_times_out_and_fails(async_client, probes):
+    probes["engine"] = _engine(delay=1.0)
+    resp = await async_client.get("/api/health/deep")
+    assert resp.status_code == 503
+    db = resp.json()["checks"]["database"]
+    assert db["ok"] is False
+    assert db["error"] == "timed out after 0.2s"
+    assert db["latency_ms"] < 1000
+
+
+@pytest.mark.asyncio
+async def test_errors_report_class_name_only(async_client, probes):
+    probes["engine"] = _engine(fail=True)
+    probes["sv_tools_status"] = 502
+    body = (await async_client.get("/api/health/deep")).json()
+    assert body["checks"]["database"]["error"] == "OSError"
+    assert body["checks"]["sv_tools"]["error"] == "HTTPStatusError"
+    assert "db.internal" not in str(body)
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_fails(async_client, probes):
+    probes["engine"] = _engine(checked_out=14)
+    resp = await async_client.get("/api/health/deep")
+    assert resp.status_code == 503
+    assert resp.json()["checks"]["db_pool"]["ok"] is False
+    assert resp.json()["checks"]["database"]["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_results_cached_and_shared_between_concurrent_callers(probes):
+    first, second = await asyncio.gather(health.deep_health(), health.deep_health())
+    third = await health.deep_health()
+    assert probes["sv_tools_calls"] == 1
+    assert [first["cached"], second["cached"], third["cached"]].count(False) == 1
+    assert third["checked_at"] == first["checked_at"]
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_reuse_the_encoded_body(async_client, probes, monkeypatch):
+    first = await async_client.get("/api/health/deep")
+    monkeypatch.setattr(health, "json_bytes", lambda _: pytest.fail("cache hit re-encoded"))
+    second = await async_client.get("/api/health/deep")
+    third = await async_client.get("/api/health/deep")
+    assert first.json()["cached"] is False
+    assert second.json() == {**first.json(), "cached": True}
+    assert second.content == third.content
+    assert probes["sv_tools_calls"] == 1
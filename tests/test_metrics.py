@@ -0,0 +1,114 @@
+"""Tests for sv_site.metrics and GET /api/metrics."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from sv_site import metrics
+from sv_site.cache import TTLCache
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_requests_counted_by_route_template(async_client):
+    before = sample("sv_http_requests_total", method="GET", route="/api/health", status="200")
+    await async_client.get("/api/health")
+    await async_client.get("/api/no/such/thing")
+
+    resp = await async_client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert sample("sv_http_requests_total", method="GET", route="/api/health", status="200") == before + 1
+    assert sample("sv_http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert 'sv_http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/health"}' in resp.text
+    assert "sv_http_requests_in_progress" in resp.text
+
+
+def test_cache_lookups_synced_from_cache_counters():
+    cache = TTLCache("metrics_test", maxsize=4)
+    metrics.sync_cache_metrics()
+    base_hit = sample("sv_cache_lookups_total", cache="metrics_test", result="hit")
+    base_miss = sample("sv_cache_lookups_total", cache="metrics_test", result="miss")
+
+    cache.set("k", 1)
+    cache.get("k")
+    cache.get("k")
+    cache.get("missing")
+    metrics.sync_cache_metrics()
+    metrics.sync_cache_metrics()  # nothing new — no double counting
+
+    assert sample("sv_cache_lookups_total", cache="metrics_test", result="hit") == base_hit + 2
+    assert sample("sv_cache_lookups_total", cache="metrics_test", result="miss") == base_miss + 1
+
+
+def test_pool_gauges_follow_checkouts():
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(engine, "pool_test")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert sample("sv_db_connections_checked_out", engine="pool_test") == 1
+        assert sample("sv_db_connections_open", engine="pool_test") == 1
+    assert sample("sv_db_connections_checked_out", engine="pool_test") == 0
+    engine.dispose()
+    assert sample("sv_db_connections_open", engine="pool_test") == 0
+
+
+@pytest.mark.asyncio
+async def test_upstream_transport_records_latency_and_errors():
+    def handler(request):
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(503 if request.url.path == "/busy" else 200)
+
+    transport = metrics.upstream_transport("upstream_test", httpx.MockTransport(handler))
+    before_ok = sample("sv_upstream_request_duration_seconds_count", upstream="upstream_test", outcome="2xx")
+    async with httpx.AsyncClient(transport=transport, base_url="http://upstream") as client:
+        await client.get("/ok")
+        await client.get("/busy")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("/down")
+
+    assert sample("sv_upstream_request_duration_seconds_count",
+                  upstream="upstream_test", outcome="2xx") == before_ok + 1
+    assert sample("sv_upstream_errors_total", upstream="upstream_test", kind="http_5xx") >= 1
+    assert sample("sv_upstream_errors_total", upstream="upstream_test", kind="ConnectError") >= 1
+
+
+_WORKER = """
+import os
+from sv_site import metrics
+metrics.REQUESTS.labels("GET", "/api/health", "200").inc(int(os.environ["N"]))
+metrics.IN_PROGRESS.inc()
+"""
+
+
+def test_multiprocess_samples_add_up_across_workers(tmp_path, monkeypatch):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": SRC}
+    for n in (2, 3):
+        subprocess.run([sys.executable, "-c", _WORKER], env={**env, "N": str(n)}, check=True)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    labels = {"method": "GET", "route": "/api/health", "status": "200"}
+    assert registry.get_sample_value("sv_http_requests_total", labels) == 5
+
+    # Both "workers" have exited: their in-progress gauge files are dropped
+    assert registry.get_sample_value("sv_http_requests_in_progress", {}) == 2
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    metrics.forget_dead_workers()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    assert not registry.get_sample_value("sv_http_requests_in_progress", {})
+    assert registry.get_sample_value("sv_http_requests_total", labels) == 5
@@ -0,0 +1,89 @@
+"""
+Query budgets for routes that are easy to regress into N+1 patterns.
+
+These run against real Postgres (see the pg_* fixtures in conftest) and are
+skipped without SV_TEST_DATABASE_URL.
+"""
+
+import pytest
+
+from sv_site.auth import create_access_token
+from sv_site.models import IdeaFavorite, IdeaVote, User, UserPermission
+
+from tests.conftest import query_budget
+
+
+@pytest.fixture
+async def seeded(pg_session):
+    """Three users with votes and favorites spread over three ideas."""
+    alice = User(username="alice", password_hash="x", is_admin=True)
+    bob = User(username="bob", password_hash="x")
+    carol = User(username="carol", password_hash="x")
+    pg_session.add_all([alice, bob, carol])
+    await pg_session.flush()
+    pg_session.add_all([
+        IdeaVote(idea_id=1, user_id=alice.id, vote=1),
+        IdeaVote(idea_id=1, user_id=bob.id, vote=1),
+        IdeaVote(idea_id=1, user_id=carol.id, vote=-1),
+        IdeaVote(idea_id=2, user_id=bob.id, vote=-1),
+        IdeaFavorite(idea_id=1, user_id=carol.id),
+        IdeaFavorite(idea_id=3, user_id=bob.id),
+        IdeaFavorite(idea_id=3, user_id=alice.id),
+        UserPermission(user_id=bob.id, tool_slug="ideas"),
+        UserPermission(user_id=carol.id, tool_slug="ideas"),
+        UserPermission(user_id=carol.id, tool_slug="feedback"),
+    ])
+    await pg_session.commit()
+    return {"alice": alice, "bob": bob, "carol": carol}
+
+
+def _auth(user: User) -> dict:
+    token = create_access_token(user.id, user.username, user.is_admin)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@query_budget(1)
+@pytest.mark.asyncio
+async def test_get_reactions_single_query(pg_client, seeded):
+    resp = await pg_client.get("/api/ideas/reactions", headers=_auth(seeded["bob"]))
+    assert resp.status_code == 200
+    assert resp.json()["reactions"] == {
+        "1": {"score": 1, "ups": 2, "downs": 1, "favorites": 1,
+              "my_vote": 1, "my_favorite": False},
+        "2": {"score": -1, "ups": 0, "downs": 1, "favorites": 0,
+              "my_vote": -1, "my_favorite": False},
+        "3": {"score": 0, "ups": 0, "downs": 0, "favorites": 2,
+              "my_vote": None, "my_favorite": True},
+    }
+
+
+@query_budget(2)
+@pytest.mark.asyncio
+async def test_get_reactions_admin_breakdown(pg_client, seeded):
+    resp = await pg_client.get("/api/ideas/reactions", headers=_auth(seeded["alice"]))
+    assert resp.status_code == 200
+    idea1 = resp.json()["reactions"]["1"]
+    assert sorted(idea1["voters"], key=lambda v: v["username"]) == [
+        {"username": "alice", "vote": 1},
+        {"username": "bob", "vote": 1},
+        {"username": "carol", "vote": -1},
+    ]
+    assert idea1["favorited_by"] == ["carol"]
+    assert sorted(resp.json()["reactions"]["3"]["favorited_by"]) == ["alice", "bob"]
+
+
+@query_budget(2)
+@pytest.mark.asyncio
+async def test_list_users_loads_permissions_in_one_batch(pg_client, seeded):
+    resp = await pg_client.get("/api/admin/users", headers=_auth(seeded["alice"]))
+    assert resp.status_code == 200
+    perms = {u["username"]: set(u["permissions"]) for u in resp.json()}
+    assert {"ideas"} <= perms["bob"]
+    assert {"ideas", "feedback"} <= perms["carol"]
+
+
+@query_budget(1)
+@pytest.mark.asyncio
+async def test_budget_overrun_fails_with_statement_list(pg_client, seeded):
+    with pytest.raises(pytest.fail.Exception, match=r"GET /api/admin/users ran 2 statements, budget is 1"):
+        await pg_client.get("/api/admin/users", headers=_auth(seeded["alice"]))
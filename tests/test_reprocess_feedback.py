@@ -0,0 +1,177 @@
+"""Tests for the bulk feedback reprocessing CLI (sv_site.reprocess_feedback)."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from sv_site import reprocess_feedback as rp
+from sv_site.models import CustomerFeedback
+
+from tests.conftest import make_test_settings
+
+AI_OK = {"summary": "Useful.", "sentiment": "positive", "tags": ["praise"],
+         "prompt_version": 1, "error": None}
+
+AI_FAIL = {"summary": None, "sentiment": None, "tags": None, "error": "boom"}
+
+
+def _row(id_: int, sentiment=None, tags=None):
+    return SimpleNamespace(
+        id=id_, program_name="test-app", score=7, raw_feedback=f"fb {id_}",
+        received_at=datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc),
+        sentiment=sentiment, tags=tags,
+    )
+
+
+def _compile(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def _fake_factory(batches):
+    """Session factory whose execute() hands out the given row batches in order."""
+    pending = list(batches)
+    sessions = []
+
+    def factory():
+        db = AsyncMock()
+
+        async def execute(query, params=None):
+            result = MagicMock()
+            if params is None:  # SELECT; the executemany UPDATE passes params
+                result.all = MagicMock(return_value=pending.pop(0) if pending else [])
+            return result
+
+        db.execute = AsyncMock(side_effect=execute)
+        db.__aenter__ = AsyncMock(return_value=db)
+        db.__aexit__ = AsyncMock(return_value=False)
+        sessions.append(db)
+        return db
+
+    factory.sessions = sessions
+    return factory
+
+
+# ---------------------------------------------------------------------------
+# Candidate selection
+# ---------------------------------------------------------------------------
+
+
+def test_default_filter_selects_failed_and_unprocessed():
+    sql = _compile(rp.candidate_filter())
+    assert "processed_at IS NULL" in sql
+    assert "processing_error IS NOT NULL" in sql
+
+
+def test_prompt_version_filter_selects_older_prompts():
+    sql = _compile(rp.candidate_filter(prompt_version=2))
+    assert "prompt_version IS NULL" in sql
+    assert "prompt_version <" in sql
+
+
+# ---------------------------------------------------------------------------
+# Enrichment + write-back
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_builds_update_params():
+    results = iter([AI_OK, AI_FAIL])
+
+    async def fake_process(**kwargs):
+        return next(results)
+
+    with patch("sv_site.reprocess_feedback.process_feedback", side_effect=fake_process):
+        updates = await rp.enrich_batch(
+            [_row(1), _row(2)], "key", asyncio.Semaphore(2), rp.RateLimiter(0)
+        )
+
+    assert [u["id"] for u in updates] == [1, 2]
+    assert updates[0]["processed_at"] is not None
+    assert updates[0]["prompt_version"] == 1
+    # A failure records the error and nothing else
+    assert updates[1] == {"id": 2, "processing_error": "boom"}
+
+
+@pytest.mark.asyncio
+async def test_run_writes_batches_and_clears_checkpoint(tmp_path):
+    checkpoint = tmp_path / "ckpt"
+    factory = _fake_factory([[_row(1), _row(2)], [_row(5)], []])
+
+    with patch("sv_site.reprocess_feedback.get_settings", return_value=make_test_settings()), \
+         patch("sv_site.reprocess_feedback.get_session_factory", return_value=factory), \
+         patch("sv_site.reprocess_feedback.process_feedback", AsyncMock(return_value=AI_OK)):
+        stats = await rp.run(batch_size=2, rate=0, checkpoint=checkpoint)
+
+    assert stats == {"processed": 3, "failed": 0, "last_id": 5}
+    # One executemany UPDATE per batch, each followed by a commit
+    writes = [s for s in factory.sessions if s.commit.await_count]
+    assert len(writes) == 2
+    assert [u["id"] for u in writes[0].execute.await_args_list[0].args[1]] == [1, 2]
+    assert not checkpoint.exists()
+
+
+@pytest.mark.asyncio
+async def test_run_resumes_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "ckpt"
+    saved = json.dumps({"last_id": 40, "filters": {"prompt_version": 2, "program_name": None}})
+    seen_after = []
+
+    async def fake_fetch(db, after_id, batch_size, prompt_version=None, program_name=None):
+        seen_after.append(after_id)
+        return []
+
+    with patch("sv_site.reprocess_feedback.get_settings", return_value=make_test_settings()), \
+         patch("sv_site.reprocess_feedback.get_session_factory", return_value=_fake_factory([])), \
+         patch("sv_site.reprocess_feedback.fetch_batch", side_effect=fake_fetch):
+        for filters in ({"prompt_version": 2},
+                        {"prompt_version": 3},
+                        {"prompt_version": 2, "program_name": "test-app"}):
+            checkpoint.write_text(saved)
+            await rp.run(checkpoint=checkpoint, **filters)
+
+    # Only the run with matching filters resumes; the others start over
+    assert seen_after == [40, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_failed_rerun_keeps_existing_enrichment(pg_session):
+    """A transient AI error during a --prompt-version re-run must not wipe
+    the enrichment the row already has."""
+    processed = datetime(2026, 3, 10, 12, 0, 5, tzinfo=timezone.utc)
+    row = CustomerFeedback(
+        program_name="test-app", score=7, raw_feedback="export is slow",
+        is_authenticated_user=False, is_anonymous=True,
+        summary="Export is slow.", sentiment="negative", tags=["performance"],
+        processed_at=processed, prompt_version=1,
+    )
+    pg_session.add(row)
+    await pg_session.commit()
+
+    factory = async_sessionmaker(pg_session.bind, expire_on_commit=False)
+    with patch("sv_site.reprocess_feedback.get_settings", return_value=make_test_settings()), \
+         patch("sv_site.reprocess_feedback.get_session_factory", return_value=factory), \
+         patch("sv_site.reprocess_feedback.process_feedback", AsyncMock(return_value=AI_FAIL)):
+        stats = await rp.run(prompt_version=2, rate=0)
+
+    assert stats["failed"] == 1
+    await pg_session.refresh(row)
+    assert (row.summary, row.sentiment, row.tags) == ("Export is slow.", "negative", ["performance"])
+    assert row.processed_at == processed
+    assert row.prompt_version == 1
+    assert row.processing_error == "boom"
+
+
+@pytest.mark.asyncio
+async def test_run_requires_api_key():
+    """No API key → refuse to start rather than stamping every row with an error."""
+    settings = make_test_settings()
+    settings.anthropic_api_key = ""
+    with patch("sv_site.reprocess_feedback.get_settings", return_value=settings):
+        with pytest.raises(RuntimeError):
+            await rp.run()
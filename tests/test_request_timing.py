@@ -0,0 +1,99 @@
+"""Tests for query instrumentation (sv_site.database) and RequestTimingMiddleware."""
+
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from sv_site import database
+from sv_site.database import current_query_stats, param_shape, start_query_stats
+from sv_site.main import app as main_app
+from sv_site.request_timing import RequestTimingMiddleware
+
+from tests.conftest import make_test_settings
+
+# Any Engine fires the hooks; in-memory SQLite stands in for Postgres here
+engine = create_engine("sqlite://")
+
+
+def _run(*statements):
+    with engine.connect() as conn:
+        for sql, params in statements:
+            conn.execute(text(sql), params or {})
+
+
+def test_hooks_count_statements_and_time():
+    stats = start_query_stats()
+    _run(("SELECT 1", None), ("SELECT :a", {"a": 2}))
+    assert stats.count == 2
+    assert stats.seconds > 0
+    assert current_query_stats() is stats
+
+
+def test_hooks_survive_failed_statements():
+    stats = start_query_stats()
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_started"] == []
+    assert stats.count == 1
+
+
+def test_slow_queries_logged_with_parameter_shapes(monkeypatch, caplog):
+    monkeypatch.setattr(database, "get_settings", lambda: make_test_settings(slow_query_ms=1e-6))
+    with caplog.at_level(logging.WARNING, logger="sv_site.slow_query"):
+        _run(("SELECT :name,\n       :n", {"name": "secret", "n": 3}))
+    [record] = caplog.records
+    assert "params=('str', 'int')" in record.getMessage()
+    assert "sql=SELECT ?, ?" in record.getMessage()
+    assert "secret" not in record.getMessage()
+    assert record.duration_ms >= 0
+
+
+def test_fast_queries_not_logged(monkeypatch, caplog):
+    monkeypatch.setattr(database, "get_settings", lambda: make_test_settings(slow_query_ms=0))
+    with caplog.at_level(logging.WARNING, logger="sv_site.slow_query"):
+        _run(("SELECT 1", None))
+    assert caplog.records == []
+
+
+def test_param_shape():
+    assert param_shape({"a": 1, "b": None}) == {"a": "int", "b": "NoneType"}
+    assert param_shape((1, "x")) == ("int", "str")
+    assert param_shape([(1,), (2,)]) == "2 × ('int',)"
+
+
+@pytest.mark.asyncio
+async def test_middleware_adds_server_timing_and_logs(caplog):
+    mini = FastAPI()
+    mini.add_middleware(RequestTimingMiddleware)
+
+    @mini.get("/items/{item_id}")
+    async def item(item_id: int):
+        _run(("SELECT 1", None), ("SELECT 2", None), ("SELECT 3", None))
+        return {"id": item_id}
+
+    with caplog.at_level(logging.INFO, logger="sv_site.requests"):
+        async with AsyncClient(transport=ASGITransport(app=mini), base_url="http://test") as client:
+            resp = await client.get("/items/7")
+
+    assert resp.status_code == 200
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d;desc="3 queries", app;dur=\d+\.\d', resp.headers["server-timing"]
+    )
+    [record] = caplog.records
+    assert record.route == "/items/{item_id}"
+    assert (record.status, record.db_queries) == (200, 3)
+    assert record.getMessage().startswith("GET /items/{item_id} 200 queries=3")
+
+
+@pytest.mark.asyncio
+async def test_app_responses_carry_server_timing():
+    async with AsyncClient(transport=ASGITransport(app=main_app), base_url="http://test") as client:
+        resp = await client.get("/api/health")
+    assert resp.headers["server-timing"].startswith('db;dur=0.0;desc="0 queries"')
@@ -0,0 +1,114 @@
+"""Tests for sv_site.responses and the JSON fast paths it documents."""
+
+import ast
+import inspect
+import textwrap
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import httpx
+import orjson
+import pytest
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+from sv_site import metrics
+from sv_site.auth import create_access_token
+from sv_site.main import app
+from sv_site.responses import JSONBytesResponse, json_bytes
+from sv_site.routes import ideas
+
+
+def _api_routes(routes):
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        elif hasattr(route, "original_router"):
+            yield from _api_routes(route.original_router.routes)
+
+
+def _is_response_type(obj) -> bool:
+    return inspect.isclass(obj) and issubclass(obj, Response)
+
+
+def _returned_responses(endpoint):
+    """Names of Response classes, or helpers annotated to build one, that the endpoint returns."""
+    tree = ast.parse(textwrap.dedent(inspect.getsource(endpoint)))
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Return) and isinstance(node.value, ast.Call)):
+            continue
+        func = node.value.func
+        if not isinstance(func, ast.Name):
+            continue
+        target = endpoint.__globals__.get(func.id)
+        if _is_response_type(target) or (
+            callable(target) and _is_response_type(inspect.signature(target).return_annotation)
+        ):
+            yield func.id
+
+
+def test_every_json_route_takes_the_pydantic_fast_path():
+    # Without a declared return type FastAPI falls back to jsonable_encoder
+    for route in _api_routes(app.router.routes):
+        returns = inspect.signature(route.endpoint).return_annotation
+        if _is_response_type(returns):
+            continue
+        assert route.response_field is not None, f"{route.path} has no return type"
+        # A route declaring a model but returning a Response would skip the check above
+        assert not list(_returned_responses(route.endpoint)), f"{route.path} returns a Response"
+
+
+def test_json_bytes_handles_what_routes_return():
+    body = json_bytes({
+        "at": datetime(2026, 3, 1, tzinfo=timezone.utc),
+        "mean": Decimal("7.5"),
+        "by_idea": {3: "x"},
+        "snippet": "café <mark>",
+    })
+    assert orjson.loads(body) == {
+        "at": "2026-03-01T00:00:00+00:00", "mean": 7.5, "by_idea": {"3": "x"}, "snippet": "café <mark>",
+    }
+
+
+@pytest.fixture
+def sv_tools(monkeypatch):
+    """sv-tools answering with a fixed, oddly formatted body."""
+    body = b'{"ideas": [{"id": 1, "public": true}, {"id": 2, "public": false}],  "extra": 1.50}'
+
+    def handler(request):
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    monkeypatch.setattr(
+        ideas, "upstream_transport",
+        lambda name, inner=None: metrics.upstream_transport(name, httpx.MockTransport(handler)),
+    )
+    return body
+
+
+@pytest.mark.asyncio
+async def test_admin_ideas_list_passes_sv_tools_bytes_through(async_client, sv_tools):
+    token = create_access_token(user_id=1, username="admin", is_admin=True)
+    resp = await async_client.get("/api/ideas", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.content == sv_tools
+    assert resp.headers["content-type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_filtered_ideas_list_is_still_reencoded(async_client, mock_db, sv_tools):
+    result = MagicMock()
+    result.all.return_value = []
+    mock_db.execute.return_value = result
+
+    token = create_access_token(user_id=2, username="user", is_admin=False)
+    resp = await async_client.get("/api/ideas", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.json() == {"ideas": [{"id": 1, "public": True}]}
+
+
+def test_json_bytes_response_sends_body_as_is():
+    resp = JSONBytesResponse(b'{"a":1}', status_code=503)
+    assert resp.body == b'{"a":1}'
+    assert resp.status_code == 503
+    assert resp.headers["content-type"] == "application/json"